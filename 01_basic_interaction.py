@@ -1,19 +1,40 @@
-import os
+import sys
+import json
+import time
+import asyncio
+import argparse
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from factory import default_api_key, genai_client, shared_response_cache
+from response_cache import CachedAsyncModels, CachedModels
+from rate_limit import TokenBucket, retry_with_backoff
+from streaming import print_stream
+from tracing import traced_models
 
 # Load environment variables (GEMINI_API_KEY)
 load_dotenv()
 
-# Initialize Gemini Client
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("❌ Error: GEMINI_API_KEY not found in .env file.")
-    exit(1)
-
-client = genai.Client(api_key=api_key)
+# The Gemini client, models and response cache are built on first use (see
+# factory.py); assign to `client` / `models` / `response_cache` to replace them
+client = None
+models = None
+response_cache = None
 MODEL_ID = "gemini-flash-latest"
+# A plain dict is accepted wherever a GenerateContentConfig is, without importing the SDK types
+CONFIG = {"system_instruction": "You are a helpful AI assistant explaining concepts simply."}
+
+def get_client():
+    return client if client is not None else genai_client()
+
+def get_response_cache():
+    # Identical prompts are answered from the response cache (see response_cache.py)
+    return response_cache if response_cache is not None else shared_response_cache()
+
+def get_models():
+    global models
+    if models is None:
+        # Latency and tokens per call are recorded when TRACING is on (see tracing.py)
+        models = traced_models(CachedModels(get_client().models, get_response_cache()))
+    return models
 
 def get_response(user_input):
     """
@@ -22,18 +43,138 @@ def get_response(user_input):
     print(f"\nSending request to Gemini ({MODEL_ID})...")
 
     try:
-        response = client.models.generate_content(
+        response = get_models().generate_content(
             model=MODEL_ID,
             contents=user_input,
-            config=types.GenerateContentConfig(
-                system_instruction="You are a helpful AI assistant explaining concepts simply."
-            )
+            config=CONFIG
         )
         return response.text
     except Exception as e:
         return f"Error from Gemini: {str(e)}"
 
+def stream_response(user_input):
+    """
+    Streams the response, printing tokens as they arrive.
+    Streamed answers bypass the response cache.
+    """
+    print(f"\nStreaming from Gemini ({MODEL_ID})...")
+
+    try:
+        result = print_stream(traced_models(get_client().models).generate_content_stream(
+            model=MODEL_ID,
+            contents=user_input,
+            config=CONFIG
+        ))
+        print(result.timing())
+    except Exception as e:
+        print(f"Error from Gemini: {str(e)}")
+
+# --- Batch mode ---
+
+def read_prompts(path):
+    """
+    Read prompts from a JSONL file ('-' for stdin).
+    Each line is either {"prompt": "...", "id": ...} or a plain JSON string.
+    A line that isn't valid JSON becomes an item carrying its error, so it
+    is reported as that line's result instead of stopping the batch.
+    """
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"invalid": f"invalid JSON on line {number}: {e.msg}"}
+                continue
+            yield item if isinstance(item, dict) else {"prompt": str(item)}
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+async def run_batch(aio_models, prompts, concurrency=8, requests_per_minute=None, ordered=True, max_retries=5):
+    """
+    Send prompts concurrently and yield one result dict per prompt.
+
+    At most `concurrency` requests are in flight, a token bucket keeps the
+    request rate under `requests_per_minute`, and 429/5xx errors are retried
+    with exponential backoff. Results come back in input order, or as soon as
+    they complete when `ordered` is False.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+
+    def log_retry(error, attempt, delay):
+        print(f"⚠️  {error} - retry {attempt} in {delay:.1f}s", file=sys.stderr)
+
+    async def call(prompt):
+        if bucket:
+            await bucket.acquire()
+        return await aio_models.generate_content(model=MODEL_ID, contents=prompt, config=CONFIG)
+
+    async def process(index, item):
+        async with semaphore:
+            start = time.perf_counter()
+            result = {"index": index, "id": item.get("id", index), "prompt": item.get("prompt")}
+            try:
+                # A bad line or a line without a prompt is an error for that line only
+                if "invalid" in item:
+                    raise ValueError(item["invalid"])
+                if not item.get("prompt"):
+                    raise ValueError('missing "prompt"')
+                response = await retry_with_backoff(
+                    call, item["prompt"], max_retries=max_retries, on_retry=log_retry
+                )
+                result["response"] = response.text
+            except Exception as e:
+                result["error"] = str(e)
+            result["latency"] = round(time.perf_counter() - start, 3)
+            return result
+
+    tasks = [asyncio.create_task(process(i, item)) for i, item in enumerate(prompts)]
+    try:
+        for task in (tasks if ordered else asyncio.as_completed(tasks)):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def batch_main(args):
+    aio_models = traced_models(CachedAsyncModels(get_client().aio.models, get_response_cache()))
+    start = time.perf_counter()
+    count = errors = 0
+    async for result in run_batch(
+        aio_models,
+        list(read_prompts(args.batch)),
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        ordered=not args.unordered,
+    ):
+        count += 1
+        errors += "error" in result
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} prompts ({errors} errors) in {elapsed:.2f}s", file=sys.stderr)
+
 def main():
+    parser = argparse.ArgumentParser(description="01 Basic Gemini Interaction")
+    parser.add_argument("--stream", action="store_true", help="Print tokens as they arrive (interactive mode)")
+    parser.add_argument("--batch", metavar="FILE", help="Run non-interactively over a JSONL file of prompts ('-' for stdin)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight (batch mode)")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests-per-minute limit (batch mode)")
+    parser.add_argument("--unordered", action="store_true", help="Emit results as they complete (batch mode)")
+    args = parser.parse_args()
+
+    if not default_api_key():
+        print("❌ Error: GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env file.")
+        exit(1)
+
+    if args.batch:
+        asyncio.run(batch_main(args))
+        return
+
     print("--- 01 Basic Gemini Interaction ---")
     print("Type 'exit' to quit.\n")
 
@@ -41,7 +182,12 @@ def main():
         user_input = input("You: ")
         if user_input.lower() in ["exit", "quit"]:
             break
-        
+
+        if args.stream:
+            stream_response(user_input)
+            print()
+            continue
+
         reply = get_response(user_input)
         print(f"AI: {reply}\n")
 
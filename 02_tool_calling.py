@@ -1,22 +1,33 @@
-import os
 import json
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from factory import default_api_key, genai_client, shared_response_cache
+from response_cache import CachedModels
+from safe_eval import SafeEvalError, safe_eval
+from tool_cache import TOOL_CACHE, memoize
+from tracing import traced, traced_models
 
 load_dotenv()
 
-# Initialize Gemini Client
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("❌ Error: GEMINI_API_KEY not found in .env file.")
-    exit(1)
-
-client = genai.Client(api_key=api_key)
+# The Gemini client and models are built on first use (see factory.py);
+# assign to `client` / `models` to replace them
+client = None
+models = None
 MODEL_ID = "gemini-flash-latest"
 
+def get_models():
+    global models
+    if models is None:
+        # Identical prompts are answered from the response cache (see response_cache.py)
+        # Latency and tokens per call are recorded when TRACING is on (see tracing.py)
+        gemini_client = client if client is not None else genai_client()
+        models = traced_models(CachedModels(gemini_client.models, shared_response_cache()))
+    return models
+
 # --- 1. Define Tools (Plain Python Functions) ---
 
+# Weather changes slowly: reuse answers for 10 minutes, but never cache errors
+@traced
+@memoize(ttl=600, casefold=True, cache_if=lambda result: not result.startswith("Error"))
 def get_current_weather(location: str, unit: str = "celsius"):
     """
     Get the current weather in a given location.
@@ -38,6 +49,7 @@ def get_current_weather(location: str, unit: str = "celsius"):
     else:
         return json.dumps({"location": location, "temperature": "72", "unit": "fahrenheit"})
 
+@traced
 def calculate(expression: str):
     """
     Evaluate a simple mathematical expression.
@@ -47,14 +59,16 @@ def calculate(expression: str):
     """
     print(f"DEBUG [Tool]: calculate('{expression}')")
     try:
-        # In a real app, use a safer parser like 'numexpr' or 'simpleeval'
-        return str(eval(expression))
-    except Exception as e:
+        # Only arithmetic is allowed, with limits on number size and run time (see safe_eval.py)
+        return str(safe_eval(expression))
+    except SafeEvalError as e:
         return f"Error: {e}"
 
 # --- 2. Main execution ---
 
 def run_demo():
+    from google.genai import types
+
     print("--- 02 Gemini Tool Calling Demo ---")
     
     question = "What is the temperature in Paris and Tokyo added together?"
@@ -66,7 +80,7 @@ def run_demo():
     try:
         # We use automatic_function_calling=True by default in the SDK's high-level API
         # but here we pass it in the config to be explicit.
-        response = client.models.generate_content(
+        response = get_models().generate_content(
             model=MODEL_ID,
             contents=question,
             config=types.GenerateContentConfig(
@@ -85,8 +99,14 @@ def run_demo():
         print("\n--- Final Result ---")
         print(response.text)
 
+        if TOOL_CACHE.stats():
+            print(f"\n--- Tool Cache ---\n{TOOL_CACHE.summary()}")
+
     except Exception as e:
         print(f"Error: {e}")
 
 if __name__ == "__main__":
+    if not default_api_key():
+        print("❌ Error: GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env file.")
+        exit(1)
     run_demo()
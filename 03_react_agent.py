@@ -1,25 +1,35 @@
-import os
 import json
+import argparse
+import contextvars
+import sys
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from factory import default_api_key, genai_client
+from streaming import DISCARD, print_stream
+from safe_eval import SafeEvalError, safe_eval
+from tool_cache import TOOL_CACHE, memoize
+from chat_sessions import ChatSessions, gemini_summarizer
+from tracing import traced, tracer
 
 load_dotenv()
 
-# Initialize Gemini Client
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("❌ Error: GEMINI_API_KEY not found in .env file.")
-    exit(1)
-
-client = genai.Client(api_key=api_key)
+# The shared Gemini client is built on first use (see factory.py); assign one here to replace it
+client = None
 MODEL_ID = "gemini-flash-latest"
 
+# The tools run inside GeminiAgent.ask; a quiet agent silences their debug lines
+_verbose = contextvars.ContextVar("verbose", default=True)
+
+def debug(message):
+    if _verbose.get():
+        print(message)
+
 # --- Tools ---
 
+@traced
+@memoize(ttl=600, casefold=True)
 def get_weather(location: str):
     """Get the weather for a location."""
-    print(f"DEBUG [Agent Action]: get_weather('{location}')")
+    debug(f"DEBUG [Agent Action]: get_weather('{location}')")
     if "london" in location.lower():
         return "15°C, rainy"
     elif "paris" in location.lower():
@@ -27,37 +37,103 @@ def get_weather(location: str):
     else:
         return "25°C, clear skies"
 
+@traced
 def calculate(expression: str):
     """Evaluate a mathematical expression expression."""
-    print(f"DEBUG [Agent Action]: calculate('{expression}')")
+    debug(f"DEBUG [Agent Action]: calculate('{expression}')")
     try:
-        return str(eval(expression))
-    except Exception as e:
+        return str(safe_eval(expression))
+    except SafeEvalError as e:
         return f"Error: {e}"
 
 class GeminiAgent:
-    def __init__(self):
+    def __init__(self, max_sessions=100, token_budget=8000, summarize=True, gemini_client=None, verbose=True):
+        from google.genai import types
+
+        # verbose=False: nothing is printed (the API server streams to its clients instead)
+        self.verbose = verbose
+        self.out = sys.stdout if verbose else DISCARD
+
+        # Pass a client to share one (or a fake); defaults to the module's client
+        gemini_client = gemini_client or client or genai_client()
         self.tools = [get_weather, calculate]
-        
-    def ask(self, user_input):
-        print(f"\nUser: {user_input}")
+        # Built once and shared by every conversation
+        self.config = types.GenerateContentConfig(
+            tools=self.tools,
+            system_instruction="You are a helpful ReAct agent. Solve the user's request. If multiple tools are needed, use them sequentially."
+        )
+        # One long-lived chat per conversation ID (LRU-capped, history kept under the token budget)
+        self.sessions = ChatSessions(
+            gemini_client,
+            MODEL_ID,
+            config=self.config,
+            max_sessions=max_sessions,
+            token_budget=token_budget,
+            summarize=gemini_summarizer(gemini_client, MODEL_ID) if summarize else None,
+        )
+
+    def ask(self, user_input, conversation_id="default", stream=False, on_text=None, on_function_call=None):
+        """
+        Returns the final answer. With stream=True tokens are printed as they
+        arrive, and also passed to `on_text` / `on_function_call` if given.
+        """
+        token = _verbose.set(self.verbose)
+        try:
+            return self._ask(user_input, conversation_id, stream, on_text, on_function_call)
+        finally:
+            _verbose.reset(token)
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def _ask(self, user_input, conversation_id, stream, on_text, on_function_call):
+        self._log(f"\nUser: {user_input}")
         
         # Gemini 'chats' automatically manage history and tool loops
-        chat_session = client.chats.create(
-            model=MODEL_ID,
-            config=types.GenerateContentConfig(
-                tools=self.tools,
-                system_instruction="You are a helpful ReAct agent. Solve the user's request. If multiple tools are needed, use them sequentially."
-            )
-        )
+        chat_session = self.sessions.get(conversation_id)
         
-        print("--- Agent is thinking/acting ---")
-        response = chat_session.send_message(user_input)
+        self._log("--- Agent is thinking/acting ---")
+        if stream:
+            # Tool calls are printed the moment they arrive; the SDK runs them
+            # and keeps streaming the follow-up answer.
+            with tracer.span("gemini.send_message_stream", "llm", model=MODEL_ID) as span:
+                result = print_stream(
+                    chat_session.send_message_stream(user_input),
+                    prefix="\nFinal Answer: ",
+                    on_text=on_text,
+                    on_function_call=on_function_call,
+                    out=self.out,
+                )
+                span.first_token(result.time_to_first_token)
+                span.record_usage(result.usage_metadata)
+            self._log(result.timing())
+            self.sessions.compact(conversation_id, result.usage_metadata)
+            return result.text
+
+        # Covers the whole tool loop; the tool calls show up as child spans
+        with tracer.span("gemini.send_message", "llm", model=MODEL_ID) as span:
+            response = chat_session.send_message(user_input)
+            span.record_usage(response.usage_metadata)
+        self.sessions.compact(conversation_id, response.usage_metadata)
         
-        print(f"\nFinal Answer: {response.text}")
+        self._log(f"\nFinal Answer: {response.text}")
+        return response.text
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="03 ReAct Agent")
+    parser.add_argument("--stream", action="store_true", help="Print tokens and tool calls as they arrive")
+    args = parser.parse_args()
+
+    if not default_api_key():
+        print("❌ Error: GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env file.")
+        exit(1)
+
     agent = GeminiAgent()
     
     # This query forces the agent to use weather twice and math once
-    agent.ask("What is the weather in London and Paris? Then add the temperatures together.")
+    agent.ask("What is the weather in London and Paris? Then add the temperatures together.", stream=args.stream)
+    # Follow-up in the same conversation: the earlier answer is already in the session
+    agent.ask("Which of the two cities was warmer?", stream=args.stream)
+
+    print(f"\n--- Tool Cache ---\n{TOOL_CACHE.summary()}")
@@ -0,0 +1,93 @@
+"""
+In-memory full-text index for notes with BM25 ranking.
+
+The index is updated incrementally: `add` and `remove` touch only the
+postings of the note's own terms, so `add_note` never rebuilds anything.
+SQLite-backed stores use FTS5 instead (see notes_store.py); this is the
+equivalent for the in-memory store.
+"""
+import heapq
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def make_snippet(text: str, terms, width: int = 12, mark: str = "**") -> str:
+    """A window of `width` words around the first matching term, matches highlighted."""
+    words = text.split()
+    terms = set(terms)
+    hits = [i for i, w in enumerate(words) if set(tokenize(w)) & terms]
+    start = max(0, hits[0] - width // 3) if hits else 0
+    window = words[start:start + width]
+    highlighted = [f"{mark}{w}{mark}" if set(tokenize(w)) & terms else w for w in window]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(words) else ""
+    return prefix + " ".join(highlighted) + suffix
+
+
+class InvertedIndex:
+    """term -> {note_id: term frequency}, plus document lengths for BM25."""
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, note_id: int, text: str):
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[note_id] = tf
+        self.doc_lengths[note_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, note_id: int, text: str):
+        length = self.doc_lengths.pop(note_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in set(tokenize(text)):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(note_id, None)
+                if not docs:
+                    del self.postings[term]
+
+    def snapshot(self, query: str) -> tuple:
+        """
+        Copies of what `search` reads for `query`. Taking one under a lock
+        and scoring it after releasing the lock keeps writers from waiting
+        on a long ranking (dict copies run at C speed).
+        """
+        postings = {term: dict(docs) for term in set(tokenize(query)) if (docs := self.postings.get(term))}
+        return len(self.doc_lengths), self.total_length, postings
+
+    def search(self, query: str, limit: int = 10, snapshot: tuple | None = None) -> list[tuple[int, float]]:
+        """Return (note_id, score) pairs, best first. Any query term may match."""
+        n_docs, total_length, postings = snapshot or self.snapshot(query)
+        if not n_docs:
+            return []
+        avg_length = total_length / n_docs
+        scores = {}
+        for docs in postings.values():
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for note_id, tf in docs.items():
+                length = self.doc_lengths.get(note_id)
+                if length is None:
+                    # Removed since the snapshot was taken
+                    continue
+                norm = tf + K1 * (1 - B + B * length / avg_length)
+                scores[note_id] = scores.get(note_id, 0.0) + idf * tf * (K1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
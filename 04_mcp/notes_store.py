@@ -0,0 +1,304 @@
+"""
+Storage backends for the Notes server.
+
+Both backends give every note a stable integer ID and support keyset
+pagination (`after` = last ID of the previous page), so listing stays cheap
+no matter how many notes exist.
+
+- MemoryNotesStore: the original in-process list, lost on restart.
+- SQLiteNotesStore: persistent, WAL mode so several server processes can
+  share one database file and reads never wait for writes.
+
+Both are safe to call from several threads at once (the HTTP server runs
+SQLite calls on a thread pool).
+
+Both also keep a full-text index up to date on every add/delete and rank
+`search` results with BM25: an inverted index in memory, FTS5 in SQLite.
+
+Pick one with the NOTES_DB environment variable (see `store_from_env`).
+"""
+import bisect
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from notes_index import InvertedIndex, make_snippet, tokenize
+
+
+@dataclass
+class Note:
+    id: int
+    content: str
+    created_at: float
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class SearchHit:
+    id: int
+    score: float
+    snippet: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class MemoryNotesStore:
+    """Notes kept in a dict, with a sorted ID list for pagination."""
+
+    def __init__(self):
+        self._notes = {}
+        self._ids = []
+        self._next_id = 1
+        self._index = InvertedIndex()
+        self._lock = threading.Lock()
+
+    def add(self, content: str) -> Note:
+        with self._lock:
+            note = Note(self._next_id, content, time.time())
+            self._next_id += 1
+            self._notes[note.id] = note
+            self._ids.append(note.id)
+            self._index.add(note.id, content)
+            return note
+
+    def add_many(self, contents) -> int:
+        count = 0
+        for content in contents:
+            self.add(content)
+            count += 1
+        return count
+
+    def get(self, note_id: int) -> Note | None:
+        return self._notes.get(note_id)
+
+    def delete(self, note_id: int) -> bool:
+        with self._lock:
+            note = self._notes.pop(note_id, None)
+            if note is None:
+                return False
+            del self._ids[bisect.bisect_left(self._ids, note_id)]
+            self._index.remove(note_id, note.content)
+            return True
+
+    def page(self, after: int = 0, limit: int = 20) -> list[Note]:
+        with self._lock:
+            start = bisect.bisect_right(self._ids, after)
+            return [self._notes[i] for i in self._ids[start:start + limit]]
+
+    def latest(self, limit: int) -> list[Note]:
+        if limit <= 0:
+            return []
+        with self._lock:
+            return [self._notes[i] for i in self._ids[-limit:]]
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """BM25-ranked full-text search; any query word may match."""
+        terms = tokenize(query)
+        # Only the copy is made under the lock; add_note runs on the server's
+        # event loop and must not wait for a ranking over a common term
+        with self._lock:
+            snapshot = self._index.snapshot(query)
+        hits = []
+        for note_id, score in self._index.search(query, limit, snapshot):
+            note = self._notes.get(note_id)
+            if note is not None:
+                hits.append(SearchHit(note_id, float(f"{score:.4g}"), make_snippet(note.content, terms)))
+        return hits
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def chunk_stats(self, chunk_size: int) -> dict:
+        """chunk index -> (count, sum of IDs, max ID) for notes grouped by ID range."""
+        stats = {}
+        with self._lock:
+            ids = list(self._ids)
+        for note_id in ids:
+            chunk = (note_id - 1) // chunk_size
+            count, total, _ = stats.get(chunk, (0, 0, 0))
+            stats[chunk] = (count + 1, total + note_id, note_id)
+        return stats
+
+    def close(self):
+        pass
+
+
+class SQLiteNotesStore:
+    """
+    Notes in a SQLite database with an FTS5 index.
+
+    Writes go through one connection behind a lock. Reads borrow one of a
+    pool of read connections: in WAL mode a reader sees the last committed
+    state and neither blocks nor waits for the writer. At most `readers`
+    idle connections are kept (the server's thread limit), so worker
+    threads coming and going don't pile up connections.
+    """
+
+    def __init__(self, path: str, readers: int = 8):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._readers = queue.LifoQueue(maxsize=readers)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Set before switching to WAL, which needs a moment of exclusive access
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Several servers may open a fresh database at once (MCP_POOL_SIZE):
+        # create the schema in one write transaction so only one of them does
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " content TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._create_fts()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _create_fts(self):
+        """External-content FTS5 table kept in sync by triggers (runs inside the schema transaction)."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'"
+        ).fetchone()
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(content, content='notes', content_rowid='id')"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN"
+            " INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content); END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN"
+            " INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN"
+            " INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content);"
+            " INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content); END"
+        )
+        if not exists:
+            # Index notes written before the FTS table existed
+            self._conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+    @contextlib.contextmanager
+    def _reader(self):
+        """Borrow an idle read connection, or open one; surplus ones are closed on return."""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA query_only=ON")
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _execute(self, sql, params=()):
+        """Run a read-only query on a pooled read connection."""
+        if self.path == ":memory:":
+            # Every connection to :memory: is a different database
+            with self._lock:
+                return self._conn.execute(sql, params).fetchall()
+        with self._reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def add(self, content: str) -> Note:
+        created_at = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO notes (content, created_at) VALUES (?, ?)", (content, created_at)
+            )
+            return Note(cursor.lastrowid, content, created_at)
+
+    def add_many(self, contents) -> int:
+        """Bulk insert in a single transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.executemany(
+                    "INSERT INTO notes (content, created_at) VALUES (?, ?)",
+                    ((content, now) for content in contents),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+    def get(self, note_id: int) -> Note | None:
+        rows = self._execute("SELECT id, content, created_at FROM notes WHERE id = ?", (note_id,))
+        return Note(*rows[0]) if rows else None
+
+    def delete(self, note_id: int) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM notes WHERE id = ?", (note_id,)).rowcount > 0
+
+    def page(self, after: int = 0, limit: int = 20) -> list[Note]:
+        rows = self._execute(
+            "SELECT id, content, created_at FROM notes WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+        )
+        return [Note(*row) for row in rows]
+
+    def latest(self, limit: int) -> list[Note]:
+        rows = self._execute(
+            "SELECT id, content, created_at FROM notes ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return [Note(*row) for row in reversed(rows)]
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """BM25-ranked full-text search; any query word may match."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quote every word so user input can't inject FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in terms)
+        rows = self._execute(
+            "SELECT rowid, -bm25(notes_fts), snippet(notes_fts, 0, '**', '**', '…', 12)"
+            " FROM notes_fts WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts) LIMIT ?",
+            (match, limit),
+        )
+        return [SearchHit(note_id, float(f"{score:.4g}"), snippet) for note_id, score, snippet in rows]
+
+    def count(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM notes")[0][0]
+
+    def chunk_stats(self, chunk_size: int) -> dict:
+        """chunk index -> (count, sum of IDs, max ID) for notes grouped by ID range."""
+        rows = self._execute(
+            "SELECT (id - 1) / ? AS chunk, COUNT(*), SUM(id), MAX(id) FROM notes GROUP BY chunk",
+            (chunk_size,),
+        )
+        return {chunk: (count, total, max_id) for chunk, count, total, max_id in rows}
+
+    def close(self):
+        with self._lock:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._conn.close()
+
+
+def store_from_env():
+    """NOTES_DB=<path> selects SQLite; unset keeps notes in memory."""
+    path = os.getenv("NOTES_DB")
+    if path:
+        # As many idle read connections as the server runs store threads
+        return SQLiteNotesStore(path, readers=int(os.getenv("NOTES_STORE_THREADS", "8")))
+    return MemoryNotesStore()
@@ -0,0 +1,86 @@
+"""
+Incremental, windowed summaries for the summarize_notes prompt.
+
+Inlining every note makes the prompt (and the model's latency) grow with
+the note count. Instead, notes are grouped into fixed ID ranges ("chunks")
+and each chunk gets its own summary. Notes are never edited, so a chunk only
+changes when a note in its ID range is added or deleted; the summarizer
+compares a cheap per-chunk fingerprint and re-summarizes only those chunks.
+The final prompt takes the newest chunk summaries that fit in a token budget,
+and only those chunks are ever summarized: older ones wait until (if ever)
+they fit again.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def extractive_summary(notes, max_chars: int = 600) -> str:
+    """
+    Default summarizer: one bullet per note, each cut to its share of
+    `max_chars` (at least 40 characters), so small chunks come out verbatim.
+    Swap in an LLM call for real summaries.
+    """
+    per_note = max(40, max_chars // max(1, len(notes)))
+    lines = []
+    for note in notes:
+        text = note.content if len(note.content) <= per_note else note.content[:per_note - 1] + "…"
+        lines.append(f"- {text}")
+    return "\n".join(lines)
+
+
+class RollingSummarizer:
+    """Per-chunk summaries cached by fingerprint, assembled under a token budget."""
+
+    def __init__(self, summarize=extractive_summary, chunk_size: int = 50, token_budget: int = 2000):
+        self.summarize = summarize
+        self.chunk_size = chunk_size
+        self.token_budget = token_budget
+        # chunk index -> (fingerprint, summary)
+        self._summaries = {}
+        self.resummarized = 0
+        # Chunks in the last rendered prompt
+        self.included = 0
+
+    def _summary(self, store, chunk, fingerprint) -> str:
+        cached = self._summaries.get(chunk)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        start = chunk * self.chunk_size
+        notes = [n for n in store.page(after=start, limit=self.chunk_size) if n.id <= start + self.chunk_size]
+        summary = self.summarize(notes)
+        self._summaries[chunk] = (fingerprint, summary)
+        self.resummarized += 1
+        return summary
+
+    def render(self, store) -> str:
+        """
+        Walk the chunks newest first, summarizing the ones that changed, until
+        the token budget is used up; the result is in chronological order.
+        """
+        stats = store.chunk_stats(self.chunk_size)
+        for chunk in list(self._summaries):
+            if chunk not in stats:
+                del self._summaries[chunk]
+        included, used = [], 0
+        for chunk in sorted(stats, reverse=True):
+            summary = self._summary(store, chunk, stats[chunk])
+            cost = estimate_tokens(summary)
+            if used + cost > self.token_budget:
+                if included:
+                    break
+                # Even the newest chunk alone is too big: cut it to the budget
+                summary = summary[:self.token_budget * 4 - 4]
+                cost = self.token_budget
+            included.append(summary)
+            used += cost
+            if used >= self.token_budget:
+                break
+        self.included = len(included)
+        omitted = len(stats) - len(included)
+        parts = list(reversed(included))
+        if omitted:
+            parts.insert(0, f"({omitted} older groups of notes omitted to stay within the prompt budget)")
+        return "\n".join(parts)
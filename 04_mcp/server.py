@@ -1,27 +1,133 @@
+import argparse
+import functools
+import os
+import sys
+import threading
+
+import anyio
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+from notes_store import MemoryNotesStore, store_from_env
+from notes_summary import RollingSummarizer
 
 # Create an MCP server named "Notes App"
 mcp = FastMCP("Notes App")
 
-# Global state to simulate a database
-notes = []
+# Notes live in memory by default, or in SQLite when NOTES_DB is set
+store = store_from_env()
+
+# Clients (e.g. mcp_pool.py) may safely resend calls to tools with these hints
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+IDEMPOTENT = ToolAnnotations(destructiveHint=True, idempotentHint=True)
+
+# How many of the most recent notes the note://list resource shows
+RESOURCE_LIMIT = 100
+
+# summarize_notes keeps one summary per group of notes and only redoes the
+# groups that changed; the prompt is capped at SUMMARY_TOKEN_BUDGET tokens
+summarizer = RollingSummarizer(
+    chunk_size=int(os.getenv("SUMMARY_CHUNK_SIZE", "50")),
+    token_budget=int(os.getenv("SUMMARY_TOKEN_BUDGET", "2000")),
+)
+
+# Over HTTP many clients share this process, so a blocking call on the event
+# loop would stall every session. SQLite calls run on worker threads instead,
+# at most STORE_THREADS at a time. The in-memory store answers lookups in
+# microseconds and is called directly, except for work that grows with the
+# number of notes (search, summaries): pass scan=True for those.
+STORE_THREADS = int(os.getenv("NOTES_STORE_THREADS", "8"))
+store_limiter = anyio.CapacityLimiter(STORE_THREADS)
+
+async def run_store(fn, *args, scan: bool = False):
+    if isinstance(store, MemoryNotesStore) and not scan:
+        return fn(*args)
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args), limiter=store_limiter)
+
+# The summarizer's chunk cache isn't thread-safe
+summary_lock = threading.Lock()
+
+def render_summary() -> str:
+    with summary_lock:
+        return summarizer.render(store)
+
+def format_notes(notes) -> str:
+    return "\n".join(f"- {note.content}" for note in notes)
 
 @mcp.resource("note://list")
-def list_notes() -> str:
-    """Return a list of all notes."""
-    return "\n".join(f"- {note}" for note in notes)
+async def notes_resource() -> str:
+    """Return the most recent notes."""
+    return format_notes(await run_store(store.latest, RESOURCE_LIMIT))
 
 @mcp.tool()
-def add_note(content: str) -> str:
+async def add_note(content: str) -> str:
     """Add a new note to the list."""
-    notes.append(content)
-    return f"Added note: {content}"
+    note = await run_store(store.add, content)
+    return f"Added note #{note.id}: {content}"
+
+@mcp.tool(annotations=READ_ONLY)
+async def get_note(note_id: int) -> dict:
+    """Get a single note by its ID."""
+    note = await run_store(store.get, note_id)
+    if note is None:
+        raise ValueError(f"Note #{note_id} not found")
+    return note.to_dict()
+
+@mcp.tool(annotations=IDEMPOTENT)
+async def delete_note(note_id: int) -> str:
+    """Delete a note by its ID."""
+    if not await run_store(store.delete, note_id):
+        raise ValueError(f"Note #{note_id} not found")
+    return f"Deleted note #{note_id}"
+
+@mcp.tool(annotations=READ_ONLY)
+async def list_notes(cursor: int = 0, limit: int = 20) -> dict:
+    """
+    List notes in the order they were added, one page at a time.
+    Pass the returned next_cursor to get the following page.
+    """
+    limit = max(1, min(limit, 100))
+    notes = await run_store(store.page, cursor, limit)
+    next_cursor = notes[-1].id if len(notes) == limit else None
+    return {"notes": [n.to_dict() for n in notes], "next_cursor": next_cursor}
+
+@mcp.tool(annotations=READ_ONLY)
+async def search_notes(query: str, limit: int = 10) -> dict:
+    """
+    Full-text search over all notes. Returns the best matching notes
+    (BM25-ranked) with a highlighted snippet; use get_note for the full text.
+    """
+    limit = max(1, min(limit, 100))
+    hits = await run_store(store.search, query, limit, scan=True)
+    return {"results": [hit.to_dict() for hit in hits]}
 
 @mcp.prompt()
-def summarize_notes() -> str:
+async def summarize_notes() -> str:
     """Create a prompt to summarize all notes."""
-    return f"Here are the user's notes:\n{list_notes()}\n\nPlease summarize them."
+    summary = await run_store(render_summary, scan=True)
+    return f"Here are the user's notes:\n{summary}\n\nPlease summarize them."
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notes MCP server")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"],
+                        default=os.getenv("MCP_TRANSPORT", "stdio"),
+                        help="stdio serves one client; sse/streamable-http serve many clients over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--stateless", action="store_true",
+                        help="streamable-http without sessions: no per-client state kept between requests")
+    args = parser.parse_args()
+
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    mcp.settings.stateless_http = args.stateless
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        # FastMCP only allows localhost Host headers when it was built for a localhost host
+        mcp.settings.transport_security = None
+    if args.transport != "stdio":
+        # No per-request access log: it costs more than a note lookup
+        mcp.settings.log_level = "WARNING"
+        path = mcp.settings.streamable_http_path if args.transport == "streamable-http" else mcp.settings.sse_path
+        print(f"📝 Notes server on http://{args.host}:{args.port}{path} ({args.transport})", file=sys.stderr)
     # Run the server
-    mcp.run()
+    mcp.run(transport=args.transport)
@@ -1,11 +1,47 @@
+import functools
+import os
+
+import anyio
 from mcp.server import Server
-from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
+from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource, ToolAnnotations
 from mcp.server.stdio import stdio_server
 
+from notes_store import store_from_env
+
 # Create a server instance
 app = Server("simple-notes")
 
-notes = []
+# Notes live in memory by default, or in SQLite when NOTES_DB is set
+store = store_from_env()
+
+# Over streamable HTTP many sessions share the event loop: store calls run on
+# worker threads so a slow query doesn't stall the others
+store_limiter = anyio.CapacityLimiter(int(os.getenv("NOTES_STORE_THREADS", "8")))
+
+async def run_store(fn, *args, **kwargs):
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=store_limiter)
+
+PAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "cursor": {"type": "integer", "description": "ID of the last note of the previous page"},
+        "limit": {"type": "integer", "minimum": 1, "maximum": 100}
+    }
+}
+NOTE_ID_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "note_id": {"type": "integer"}
+    },
+    "required": ["note_id"]
+}
+
+def format_notes(notes):
+    return "\n".join(f"#{note.id}: {note.content}" for note in notes)
+
+# Clients (e.g. mcp_pool.py) may safely resend calls to tools with these hints
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+IDEMPOTENT = ToolAnnotations(destructiveHint=True, idempotentHint=True)
 
 @app.list_tools()
 async def list_tools():
@@ -21,10 +57,36 @@ async def list_tools():
                 "required": ["content"]
             }
         ),
+        Tool(
+            name="get_note",
+            description="Get a note by ID",
+            inputSchema=NOTE_ID_SCHEMA,
+            annotations=READ_ONLY
+        ),
+        Tool(
+            name="delete_note",
+            description="Delete a note by ID",
+            inputSchema=NOTE_ID_SCHEMA,
+            annotations=IDEMPOTENT
+        ),
         Tool(
             name="list_notes",
-            description="List all notes",
-            inputSchema={"type": "object"}
+            description="List notes one page at a time",
+            inputSchema=PAGE_SCHEMA,
+            annotations=READ_ONLY
+        ),
+        Tool(
+            name="search_notes",
+            description="Full-text search over all notes, best matches first",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string"},
+                    "limit": {"type": "integer", "minimum": 1, "maximum": 100}
+                },
+                "required": ["query"]
+            },
+            annotations=READ_ONLY
         )
     ]
 
@@ -32,10 +94,29 @@ async def list_tools():
 async def call_tool(name: str, arguments: dict):
     if name == "add_note":
         content = arguments["content"]
-        notes.append(content)
-        return [TextContent(type="text", text=f"Added note: {content}")]
+        note = await run_store(store.add, content)
+        return [TextContent(type="text", text=f"Added note #{note.id}: {content}")]
+    elif name == "get_note":
+        note = await run_store(store.get, arguments["note_id"])
+        if note is None:
+            raise ValueError(f"Note #{arguments['note_id']} not found")
+        return [TextContent(type="text", text=format_notes([note]))]
+    elif name == "delete_note":
+        if not await run_store(store.delete, arguments["note_id"]):
+            raise ValueError(f"Note #{arguments['note_id']} not found")
+        return [TextContent(type="text", text=f"Deleted note #{arguments['note_id']}")]
     elif name == "list_notes":
-        return [TextContent(type="text", text="\n".join(notes))]
+        limit = max(1, min(arguments.get("limit", 20), 100))
+        notes = await run_store(store.page, after=arguments.get("cursor", 0), limit=limit)
+        text = format_notes(notes)
+        if len(notes) == limit:
+            text += f"\n(next cursor: {notes[-1].id})"
+        return [TextContent(type="text", text=text)]
+    elif name == "search_notes":
+        limit = max(1, min(arguments.get("limit", 10), 100))
+        hits = await run_store(store.search, arguments["query"], limit)
+        text = "\n".join(f"#{hit.id} (score {hit.score}): {hit.snippet}" for hit in hits)
+        return [TextContent(type="text", text=text)]
     else:
         raise ValueError(f"Unknown tool: {name}")
 
@@ -48,6 +129,35 @@ async def main():
             app.create_initialization_options()
         )
 
+def http_app(stateless: bool = False):
+    """Streamable HTTP on /mcp: one server process shared by many clients."""
+    import contextlib
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    manager = StreamableHTTPSessionManager(app=app, stateless=stateless)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with manager.run():
+            yield
+
+    return Starlette(routes=[Mount("/mcp", app=manager.handle_request)], lifespan=lifespan)
+
 if __name__ == "__main__":
+    import argparse
     import asyncio
-    asyncio.run(main())
+
+    parser = argparse.ArgumentParser(description="Low-level notes MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--stateless", action="store_true")
+    args = parser.parse_args()
+
+    if args.transport == "stdio":
+        asyncio.run(main())
+    else:
+        import uvicorn
+        uvicorn.run(http_app(args.stateless), host=args.host, port=args.port, log_level="warning")
@@ -1,131 +1,166 @@
 import asyncio
+import argparse
 import os
 import sys
-import json
+import time
 from dotenv import load_dotenv
 
 # MCP Imports
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-
-# Gemini Imports
-from google import genai
-from google.genai import types
+from mcp import StdioServerParameters
+from mcp.client.stdio import get_default_environment
+from mcp_pool import MCPSessionPool
+from mcp_schema import ToolRegistry
+from streaming import aprint_stream
+from tracing import traced_models, tracer
+from factory import default_api_key, genai_client
 
 load_dotenv()
 
 # We need to run the server script from Prototype 04
 SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), "04_mcp", "server.py")
+# Number of long-lived MCP server processes kept warm for tool calls
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+# URL of a shared Notes server started with `server.py --transport streamable-http`
+# (e.g. http://127.0.0.1:8000/mcp); unset spawns private stdio servers
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL")
+# Pooled servers share one SQLite notes database so they all see the same notes
+NOTES_DB = os.getenv("NOTES_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "notes.sqlite"))
+# Gemini declarations compiled from the MCP tool list, shared across runs
+TOOL_REGISTRY = ToolRegistry()
 
-async def run_agent():
-    print("--- 05 Gemini + MCP Bridge Demo ---")
-    
-    # 1. Initialize Gemini
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
-    if not gemini_api_key:
-        print("Error: GEMINI_API_KEY not found.")
-        return
-    
-    # Note: Using the sync client but we'll call it carefully, 
-    # or we can use the async patterns if needed. 
-    # The google-genai SDK 1.x is primarily sync.
-    gemini_client = genai.Client(api_key=gemini_api_key)
-    MODEL_ID = "gemini-flash-latest"
-
-    # 2. Connect to MCP Server
-    server_params = StdioServerParameters(
+def make_server_params():
+    if MCP_SERVER_URL:
+        return MCP_SERVER_URL
+    return StdioServerParameters(
         command=sys.executable,
         args=[SERVER_SCRIPT],
-        env=None
+        env={**get_default_environment(), "NOTES_DB": NOTES_DB}
     )
 
-    print(f"Connecting to MCP Server at {SERVER_SCRIPT}...")
-    
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as mcp_session:
-            # Initialize MCP
-            await mcp_session.initialize()
-            
-            # List tools from MCP
-            mcp_tools = await mcp_session.list_tools()
-            print(f"MCP Server connected. Found {len(mcp_tools.tools)} tools.")
-
-            # --- BRIDGE LOGIC ---
-            # We want Gemini to use these tools. 
-            # In a real system, we'd dynamically convert MCP tool schemas to Gemini tool schemas.
-            # For this demo, we'll manually bridge 'add_note'.
-            
-            async def call_mcp_tool(name, args):
-                print(f"DEBUG: Redirecting tool call '{name}' to MCP Server...")
-                result = await mcp_session.call_tool(name, arguments=args)
-                return result.content[0].text
-
-            # Gemini doesn't know how to "await" internally in its auto-loop.
-            # So we'll use a manual ReAct loop for the MCP bridge.
-            
-            messages = [{"role": "user", "content": "Keep a note that I need to learn about MCP Agents today."}]
-            print(f"\nUser: {messages[0]['content']}")
-
-            # Define the tool for Gemini (Manually matching the MCP server's add_note)
-            # The google-genai SDK expects tools to be a list of Tool objects,
-            # which contain a list of function_declarations.
-            gemini_tools = [
-                types.Tool(
-                    function_declarations=[
-                        types.FunctionDeclaration(
-                            name="add_note",
-                            description="Add a new note to the list.",
-                            parameters=types.Schema(
-                                type="OBJECT",
-                                properties={
-                                    "content": types.Schema(
-                                        type="STRING", 
-                                        description="The text of the note"
-                                    )
-                                },
-                                required=["content"]
-                            )
-                        )
-                    ]
-                )
-            ]
-
-            # We use the generate_content call
-            response = gemini_client.models.generate_content(
+MODEL_ID = "gemini-flash-latest"
+# Maximum number of model turns before the loop gives up
+MAX_STEPS = int(os.getenv("MAX_AGENT_STEPS", "5"))
+
+async def run_agent(pool, gemini_client, user_message, max_steps=MAX_STEPS, stream=False):
+    """
+    Async ReAct loop: ask Gemini, run every function call it emits in parallel
+    on the MCP pool, hand all observations back in one request and repeat until
+    the model answers or the step budget runs out. With `stream=True` tokens
+    are printed as they arrive.
+    """
+    from google.genai import types
+
+    # 1. The MCP servers are already running and initialized in the pool,
+    # so the tool list comes from the cached handshake.
+    mcp_tools = pool.tools
+    print(f"MCP Server connected. Found {len(mcp_tools.tools)} tools.")
+
+    # --- BRIDGE LOGIC ---
+    # We want Gemini to use these tools, so every MCP tool schema is converted
+    # into a Gemini function declaration. The registry caches the result until
+    # the server's tool list changes.
+    gemini_tools = TOOL_REGISTRY.get(mcp_tools)
+    config = types.GenerateContentConfig(tools=gemini_tools)
+
+    async def call_mcp_tool(name, args):
+        print(f"DEBUG: Redirecting tool call '{name}' to MCP Server...")
+        with tracer.span(f"mcp.call_tool.{name}", "tool"):
+            result = await pool.call_tool(name, arguments=args)
+        text = "\n".join(c.text for c in result.content if getattr(c, "text", None))
+        if result.isError:
+            return {"error": text}
+        return {"result": text}
+
+    async def observe(function_call):
+        try:
+            return await call_mcp_tool(function_call.name, function_call.args or {})
+        except Exception as e:
+            # One failing tool shouldn't sink the others; the model sees the error
+            return {"error": str(e)}
+
+    # 2. Manual ReAct loop. Gemini can't await MCP calls inside its own
+    # automatic function calling, so we drive the turns ourselves.
+    print(f"\nUser: {user_message}")
+    contents = [types.Content(role="user", parts=[types.Part(text=user_message)])]
+    # Latency, TTFT and tokens per model turn are recorded when TRACING is on
+    aio_models = traced_models(gemini_client.aio.models)
+
+    async def ask_model():
+        """One model turn -> (model content, function calls, observation tasks, text)."""
+        if not stream:
+            # The async client keeps the event loop free while we wait on Gemini
+            response = await aio_models.generate_content(
                 model=MODEL_ID,
-                contents=messages[0]['content'],
-                config=types.GenerateContentConfig(
-                    tools=gemini_tools,
-                )
+                contents=contents,
+                config=config,
             )
+            function_calls = response.function_calls or []
+            # Independent calls run at the same time on the pool
+            tasks = [asyncio.create_task(observe(fc)) for fc in function_calls]
+            return response.candidates[0].content, function_calls, tasks, response.text
+
+        # Streaming: each function call is sent to MCP the moment its part
+        # arrives, while the rest of the turn is still streaming in.
+        tasks = []
+        started = time.perf_counter()
+        result = await aprint_stream(
+            await aio_models.generate_content_stream(
+                model=MODEL_ID,
+                contents=contents,
+                config=config,
+            ),
+            prefix="\nAI: ",
+            on_function_call=lambda fc: tasks.append(asyncio.create_task(observe(fc))),
+            start=started,
+        )
+        print(result.timing())
+        return types.Content(role="model", parts=result.parts), result.function_calls, tasks, result.text
+
+    for step in range(1, max_steps + 1):
+        model_content, function_calls, tasks, text = await ask_model()
+        if not function_calls:
+            if not stream:
+                print(f"\nFinal Answer: {text}")
+            return text
+
+        # Keep the model's function-call turn in the history
+        contents.append(model_content)
+        for fc in function_calls:
+            print(f"[Step {step}] Gemini wants to call: {fc.name} with {fc.args}")
+
+        observations = await asyncio.gather(*tasks)
+        for fc, observation in zip(function_calls, observations):
+            print(f"[Step {step}] MCP Result ({fc.name}): {observation}")
+
+        # All observations go back to the model in a single turn
+        contents.append(types.Content(role="user", parts=[
+            types.Part(function_response=types.FunctionResponse(id=fc.id, name=fc.name, response=observation))
+            for fc, observation in zip(function_calls, observations)
+        ]))
+
+    print(f"\nStopped after {max_steps} steps without a final answer.")
+    return None
+
+async def main(stream=False):
+    print("--- 05 Gemini + MCP Bridge Demo ---")
+
+    if not default_api_key():
+        print("Error: GEMINI_API_KEY (or GEMINI_API_KEYS) not found.")
+        return
+    gemini_client = genai_client()
 
-            # Check for tool call
-            if response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if part.function_call:
-                        func_name = part.function_call.name
-                        func_args = part.function_call.args
-                        
-                        print(f"Gemini wants to call: {func_name} with {func_args}")
-                        
-                        # Execute via MCP
-                        mcp_result = await call_mcp_tool(func_name, func_args)
-                        print(f"MCP Result: {mcp_result}")
-                        
-                        # Feed back to Gemini for final answer
-                        # We hand the result back as a model turn (the feedback)
-                        # The SDK expects a specific format if we aren't using ChatSession.
-                        final_response = gemini_client.models.generate_content(
-                            model=MODEL_ID,
-                            contents=[
-                                types.Content(role="user", parts=[types.Part(text=messages[0]['content'])]),
-                                response.candidates[0].content, # The function call (role: model)
-                                types.Content(role="user", parts=[types.Part(text=f"Observation from tool: {mcp_result}")])
-                            ]
-                        )
-                        print(f"\nFinal Answer: {final_response.text}")
-            else:
-                print(f"AI: {response.text}")
+    print(f"Connecting to MCP Server at {MCP_SERVER_URL or SERVER_SCRIPT} (pool size {MCP_POOL_SIZE})...")
+    async with MCPSessionPool(make_server_params(), size=MCP_POOL_SIZE) as pool:
+        await run_agent(
+            pool,
+            gemini_client,
+            "Keep a note that I need to learn about MCP Agents today, "
+            "and another one that I should review the LangGraph docs.",
+            stream=stream,
+        )
 
 if __name__ == "__main__":
-    asyncio.run(run_agent())
+    parser = argparse.ArgumentParser(description="05 Gemini + MCP Bridge")
+    parser.add_argument("--stream", action="store_true", help="Print tokens and tool calls as they arrive")
+    args = parser.parse_args()
+    asyncio.run(main(stream=args.stream))
@@ -1,62 +1,189 @@
-import os
+import asyncio
+import argparse
+import contextlib
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import create_agent
-from langchain_core.tools import tool
+
+from factory import chat_model, once
+from tool_cache import TOOL_CACHE, memoize
+from tracing import tracer
+from checkpoints import async_checkpointer, thread_config
 
 # 1. Load Environment
 load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
 
 # 2. Define Tools
-@tool
+# Plain functions; get_tools() wraps them as LangChain tools when an agent is
+# built, so importing this module doesn't import LangChain's tool machinery
 def get_system_time() -> str:
     """Returns the current system time."""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-@tool
+# Deterministic, so results are cached for good; get_system_time must never be cached
+@memoize(pure=True)
 def process_data(text: str) -> str:
     """Processes text by converting it to uppercase and counting characters."""
     return f"Upper: {text.upper()} | Count: {len(text)}"
 
-tools = [get_system_time, process_data]
+@once
+def get_tools():
+    from langchain_core.tools import tool
+
+    return [tool(get_system_time), tool(process_data)]
 
 # 3. Initialize Model
-llm = ChatGoogleGenerativeAI(model="gemini-flash-latest", google_api_key=api_key)
+# Built on first use (see factory.py); assign a chat model here to replace it
+llm = None
+
+def get_llm():
+    return llm if llm is not None else chat_model("gemini-flash-latest")
 
 # 4. Create the Agent
 # Behind the scenes, LangChain creates a graph that manages the 'messages' list state.
-agent = create_agent(model=llm, tools=tools)
+def build_agent(model=None, checkpointer=None):
+    """With a checkpointer, each conversation (thread ID) keeps its message history."""
+    from langchain.agents import create_agent
 
-if __name__ == "__main__":
+    return create_agent(model=model or get_llm(), tools=get_tools(), checkpointer=checkpointer)
+
+@once
+def default_agent():
+    """The agent without a checkpointer, compiled on first use."""
+    return build_agent()
+
+def __getattr__(name):
+    # `tools` and `agent` used to be built at import time; now they are built on first access
+    if name == "tools":
+        return get_tools()
+    if name == "agent":
+        return default_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 5. Async service mode
+class AgentService:
+    """
+    Serves many conversations concurrently on one event loop.
+
+    `astream_answer` runs the agent once with `astream` and yields events as
+    they happen: token deltas from the model, tool starts and results, and
+    the final answer taken from the streamed state (no second run). Runs on
+    the same conversation are serialized, so a conversation never has two
+    runs writing its history at once.
+    """
+
+    def __init__(self, agent, max_concurrency=32):
+        self.agent = agent
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # conversation ID -> [lock, number of runs holding or waiting for it]
+        self._locks = {}
+
+    @contextlib.asynccontextmanager
+    async def _conversation(self, conversation_id):
+        entry = self._locks.setdefault(conversation_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[conversation_id]
+
+    async def astream_answer(self, query, conversation_id="default"):
+        """Yields {"type": "token" | "tool_start" | "tool_end" | "final", ...} dicts."""
+        config = {"callbacks": tracer.langchain_callbacks()}
+        if self.agent.checkpointer is not None:
+            config = thread_config(conversation_id, **config)
+        inputs = {"messages": [{"role": "user", "content": query}]}
+
+        async with self._conversation(conversation_id), self.semaphore:
+            final = ""
+            # "messages" carries token deltas, "updates" the finished node outputs
+            async for mode, chunk in self.agent.astream(inputs, config=config, stream_mode=["messages", "updates"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if metadata.get("langgraph_node") == "model" and message.text:
+                        yield {"type": "token", "text": message.text}
+                    continue
+                for node, output in chunk.items():
+                    for msg in (output or {}).get("messages", []):
+                        if node == "model":
+                            for call in getattr(msg, "tool_calls", None) or []:
+                                yield {"type": "tool_start", "name": call["name"], "args": call["args"]}
+                            if not getattr(msg, "tool_calls", None):
+                                final = msg.text
+                        elif node == "tools":
+                            yield {"type": "tool_end", "name": msg.name, "content": msg.content}
+            yield {"type": "final", "text": final}
+
+    async def ask(self, query, conversation_id="default"):
+        """Run to completion and return the final answer."""
+        async for event in self.astream_answer(query, conversation_id):
+            if event["type"] == "final":
+                return event["text"]
+
+async def serve_demo(queries):
+    """Runs one conversation per query concurrently, printing events as they arrive."""
+    async with async_checkpointer() as saver:
+        service = AgentService(build_agent(checkpointer=saver))
+
+        async def conversation(index, query):
+            tag = f"[conv {index}]"
+            async for event in service.astream_answer(query, conversation_id=f"conv-{index}"):
+                if event["type"] == "tool_start":
+                    print(f"{tag} 🛠️ {event['name']}({event['args']})")
+                elif event["type"] == "tool_end":
+                    print(f"{tag} ✅ {event['name']} -> {event['content']}")
+                elif event["type"] == "final":
+                    print(f"{tag} 💬 {event['text']}")
+
+        await asyncio.gather(*(conversation(i, q) for i, q in enumerate(queries)))
+
+
+def run_demo():
     query = "What is the current time? Also, process 'Stitching is cool' for me."
     print(f"User: {query}\n" + "-"*30)
 
-    # --- OPTION A: Streaming (Watching the stitching happen) ---
+    # --- Streaming (Watching the stitching happen) ---
     print("\n[STEP-BY-STEP ORCHESTRATION]")
     inputs = {"messages": [{"role": "user", "content": query}]}
+    # Model and tool calls are recorded as spans when TRACING is on (see tracing.py)
+    config = {"callbacks": tracer.langchain_callbacks()}
+    final_answer = None
     
-    for chunk in agent.stream(inputs, stream_mode="updates"):
-        for node, output in chunk.items():
-            # In create_agent, nodes are named 'model' (the brain) and 'tools' (the hands)
-            if "messages" in output:
-                msg = output["messages"][-1]
-                if node == "model":
-                    if hasattr(msg, "tool_calls") and msg.tool_calls:
-                        print(f"🤖 Brain: I need to use tools: {[tc['name'] for tc in msg.tool_calls]}")
-                    if msg.content:
-                        print(f"💬 Brain (Final Answer): {msg.content}")
-                elif node == "tools":
-                    print(f"🛠️ Hands: Tool execution finished. Result: {msg.content}")
-
-    # --- OPTION B: Simple Invoke (Getting the final result directly) ---
+    with tracer.span("agent.stream", "agent"):
+        for chunk in default_agent().stream(inputs, config=config, stream_mode="updates"):
+            for node, output in chunk.items():
+                # In create_agent, nodes are named 'model' (the brain) and 'tools' (the hands)
+                if "messages" in output:
+                    msg = output["messages"][-1]
+                    if node == "model":
+                        if hasattr(msg, "tool_calls") and msg.tool_calls:
+                            print(f"🤖 Brain: I need to use tools: {[tc['name'] for tc in msg.tool_calls]}")
+                        if msg.content:
+                            print(f"💬 Brain (Final Answer): {msg.content}")
+                            final_answer = msg.content
+                    elif node == "tools":
+                        print(f"🛠️ Hands: Tool execution finished. Result: {msg.content}")
+
+    # --- The final result ---
+    # The last model message in the stream is the final stitched response,
+    # so there's no need to run the whole agent again with invoke().
     print("\n" + "-"*30)
-    print("[SIMPLE INVOKE - THE FINAL RESULT]")
-    
-    result = agent.invoke({"messages": [{"role": "user", "content": query}]})
-    
-    # The 'result' is the full final state of the graph.
-    # The last message in the 'messages' list is the final stitched response.
-    final_answer = result["messages"][-1].content
+    print("[THE FINAL RESULT]")
     print(f"Final Outcome: {final_answer}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="06 LangChain Agent")
+    parser.add_argument("--serve", nargs="*", metavar="QUERY", help="Async service mode: answer these queries as concurrent conversations")
+    args = parser.parse_args()
+
+    if args.serve is None:
+        run_demo()
+    else:
+        asyncio.run(serve_demo(args.serve or [
+            "What is the current time?",
+            "Process 'Stitching is cool' for me.",
+            "Process 'Agents run concurrently' and tell me the time.",
+        ]))
+        print(f"\n[TOOL CACHE]\n{TOOL_CACHE.summary()}")
@@ -1,71 +1,207 @@
-import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import operator
 from typing import Annotated, Sequence, TypedDict
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
+from langgraph.types import Send
+
+from factory import chat_model, once
+from checkpoints import aresume_input, async_checkpointer, thread_config
+from tracing import tracer
 
 # 1. Setup State
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Summaries from the researcher branches, merged before the writer runs
+    research: Annotated[list[str], operator.add]
+
+# What each researcher branch receives through Send
+class ResearchTask(TypedDict):
+    query: str
+    focus: str
 
 # 2. Load Environment & Model
 load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-# Testing 2.5-flash as it may have higher limits
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=api_key)
-
-# 3. Node 1: The Researcher
-def researcher_node(state: AgentState):
-    print("\n--- [AGENT: RESEARCHER] ---")
-    # Instead of calling the API twice (logic + tool), we simulate the research
-    # and only call the API once to "think" about the summary.
-    user_query = state["messages"][0].content
-    research_data = "LangChain (founded 2022) is a framework to build LLM apps by chaining components like prompts, models, and memory."
-    
-    prompt = f"Summarize this research data for the query '{user_query}': {research_data}"
-    response = llm.invoke(prompt)
-    
-    # We add the researcher's name to the message so we know who is talking
-    return {"messages": [AIMessage(content=response.content, name="Researcher")]}
-
-# 4. Node 2: The Writer
-def writer_node(state: AgentState):
-    print("\n--- [AGENT: WRITER] ---")
-    # The writer sees the Researcher's summary in the 'messages' list
-    research_summary = state["messages"][-1].content
-    
-    prompt = f"Based on this research: '{research_summary}', write a 1-line rhyming slogan."
-    response = llm.invoke(prompt)
-    
-    return {"messages": [AIMessage(content=response.content, name="Writer")]}
-
-# 5. Build the Workflow (The "Talking" logic)
-workflow = StateGraph(AgentState)
-workflow.add_node("researcher", researcher_node)
-workflow.add_node("writer", writer_node)
-
-workflow.add_edge(START, "researcher")
-workflow.add_edge("researcher", "writer")
-workflow.add_edge("writer", END)
-
-multi_agent_system = workflow.compile()
+# Built on first use (see factory.py); assign a chat model here to replace it
+llm = None
 
-if __name__ == "__main__":
+def get_llm():
+    # Testing 2.5-flash as it may have higher limits; with MODEL_POOL set, calls
+    # fall back to other models and keys on 429s (see model_router.py)
+    # Repeated prompts are answered from the response cache (see response_cache.py)
+    # Every call is recorded as a span when TRACING is on (see tracing.py)
+    return llm if llm is not None else chat_model("gemini-2.5-flash", response_cache=True, traced=True)
+
+RESEARCH_DATA = "LangChain (founded 2022) is a framework to build LLM apps by chaining components like prompts, models, and memory."
+# Angles for the researcher sub-queries when fanning out
+RESEARCH_FOCUS = ["overview", "history", "use cases", "strengths", "alternatives"]
+
+def build_graph(llm, fan_out=1, verbose=True, checkpointer=None):
+    """
+    Researcher -> Writer graph. With fan_out > 1 the query is split into
+    sub-queries (one per focus) that run as parallel researcher branches via
+    Send; their summaries are merged before the writer runs. With a
+    checkpointer, every completed node is saved under the run's thread ID.
+    """
+    def log(message):
+        if verbose:
+            print(message)
+
+    # 3. Fan-out: one Send per researcher sub-query
+    def plan_research(state: AgentState):
+        query = state["messages"][0].content
+        return [Send("researcher", {"query": query, "focus": focus}) for focus in RESEARCH_FOCUS[:max(1, fan_out)]]
+
+    # 4. Node 1: The Researcher
+    async def researcher_node(task: ResearchTask):
+        log(f"\n--- [AGENT: RESEARCHER ({task['focus']})] ---")
+        # Instead of calling the API twice (logic + tool), we simulate the research
+        # and only call the API once to "think" about the summary.
+        focus = f" (focus on {task['focus']})" if fan_out > 1 else ""
+        prompt = f"Summarize this research data for the query '{task['query']}'{focus}: {RESEARCH_DATA}"
+        response = await llm.ainvoke(prompt)
+
+        # We add the researcher's name to the message so we know who is talking
+        return {
+            "messages": [AIMessage(content=response.content, name="Researcher")],
+            "research": [response.content],
+        }
+
+    # 5. Node 2: The Writer
+    async def writer_node(state: AgentState):
+        log("\n--- [AGENT: WRITER] ---")
+        # The writer sees every researcher summary, merged in branch order
+        research_summary = "\n".join(state["research"])
+
+        prompt = f"Based on this research: '{research_summary}', write a 1-line rhyming slogan."
+        response = await llm.ainvoke(prompt)
+
+        return {"messages": [AIMessage(content=response.content, name="Writer")]}
+
+    # 6. Build the Workflow (The "Talking" logic)
+    workflow = StateGraph(AgentState)
+    workflow.add_node("researcher", researcher_node)
+    workflow.add_node("writer", writer_node)
+
+    workflow.add_conditional_edges(START, plan_research, ["researcher"])
+    workflow.add_edge("researcher", "writer")
+    workflow.add_edge("writer", END)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+@once
+def default_graph():
+    """The graph with the module's model, compiled on first use."""
+    return build_graph(get_llm())
+
+def __getattr__(name):
+    # `multi_agent_system` used to be compiled at import time; it is now compiled on first access
+    if name == "multi_agent_system":
+        return default_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 7. Batch runner
+async def run_batch(graph, queries, concurrency=8, thread_prefix=None):
+    """
+    Run the graph over many queries with at most `concurrency` in flight.
+    Returns one dict per query (in input order) with the slogan or the error
+    and the per-query latency.
+
+    If the graph has a checkpointer, query i runs on thread "<thread_prefix>-i":
+    re-running the same batch with the same prefix resumes failed queries from
+    their last completed node and returns finished ones from the checkpoint
+    without any LLM calls.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(index, query):
+        async with semaphore:
+            start = time.perf_counter()
+            result = {"index": index, "query": query}
+            inputs = {"messages": [HumanMessage(content=query)]}
+            config = thread_config(f"{thread_prefix}-{index}" if thread_prefix else None) if graph.checkpointer else None
+            try:
+                if config:
+                    inputs = await aresume_input(graph, inputs, config)
+                state = await graph.ainvoke(inputs, config=config)
+                result["slogan"] = state["messages"][-1].content
+            except Exception as e:
+                result["error"] = str(e)
+            result["latency"] = round(time.perf_counter() - start, 3)
+            return result
+
+    return await asyncio.gather(*(run_one(i, q) for i, q in enumerate(queries)))
+
+def read_queries(path):
+    """One query per line: plain text or a JSON object with a "query" field ('-' for stdin)."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)["query"] if line.startswith("{") else line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+async def batch_main(args):
+    queries = list(read_queries(args.batch))
+    start = time.perf_counter()
+    async with async_checkpointer() as saver:
+        graph = build_graph(get_llm(), fan_out=args.fan_out, verbose=False, checkpointer=saver)
+        thread_prefix = args.thread or uuid.uuid4().hex[:12]
+        if saver is not None:
+            print(f"🧵 Threads {thread_prefix}-0..{len(queries) - 1} (resume with --thread {thread_prefix})", file=sys.stderr)
+        with tracer.span("agent.batch", "agent", queries=len(queries)):
+            results = await run_batch(graph, queries, concurrency=args.concurrency, thread_prefix=thread_prefix)
+    for result in results:
+        print(json.dumps(result, ensure_ascii=False))
+    elapsed = time.perf_counter() - start
+    errors = sum("error" in r for r in results)
+    print(f"Processed {len(results)} queries ({errors} errors) in {elapsed:.2f}s", file=sys.stderr)
+
+async def main(fan_out, thread_id=None):
     print("🚀 Starting Quota-Friendly Multi-Agent System...")
-    
+
     query = "What is LangChain? I need a slogan for it."
     inputs = {"messages": [HumanMessage(content=query)]}
-    
-    # Run the graph
-    for chunk in multi_agent_system.stream(inputs, stream_mode="values"):
-        if "messages" in chunk:
-            msg = chunk["messages"][-1]
-            if isinstance(msg, AIMessage):
-                name = getattr(msg, "name", "Assistant")
-                print(f"[{name}]: {msg.content}")
+
+    # Every completed node is saved (CHECKPOINT_DB, see checkpoints.py)
+    async with async_checkpointer() as saver:
+        graph = build_graph(get_llm(), fan_out=fan_out, checkpointer=saver)
+        config = thread_config(thread_id)
+        if saver is not None:
+            print(f"🧵 Thread: {config['configurable']['thread_id']}")
+
+        # Run the graph
+        with tracer.span("agent.stream", "agent"):
+            async for chunk in graph.astream(await aresume_input(graph, inputs, config), config=config, stream_mode="updates"):
+                for update in chunk.values():
+                    for msg in (update or {}).get("messages", []):
+                        if isinstance(msg, AIMessage):
+                            name = getattr(msg, "name", "Assistant")
+                            print(f"[{name}]: {msg.content}")
 
     print("\n" + "="*40)
     print("✅ Collaboration Complete!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="07 Multi-Agent Team")
+    parser.add_argument("--fan-out", type=int, default=1, help="Parallel researcher sub-queries per query (max %d)" % len(RESEARCH_FOCUS))
+    parser.add_argument("--batch", metavar="FILE", help="Run over a file of queries, one per line ('-' for stdin)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum queries in flight (batch mode)")
+    parser.add_argument("--thread", help="Thread ID (prefix in batch mode) to save runs under; pass it again to resume")
+    args = parser.parse_args()
+
+    if args.batch:
+        asyncio.run(batch_main(args))
+    else:
+        asyncio.run(main(args.fan_out, args.thread))
@@ -1,83 +1,219 @@
 import os
+import time
+import argparse
+import operator
+from dataclasses import dataclass
 from typing import Annotated, Sequence, TypedDict, Literal
 from dotenv import load_dotenv
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
-from langgraph.graph.message import add_messages
+
+from factory import chat_model, once
+from message_compaction import compact_messages, estimate_tokens, fit_to_budget
+from checkpoints import checkpointer, resume_input, thread_config
+from routing import NEED_MORE_RESEARCH_RE, RESEARCH_COMPLETE_RE, Router, structured_route
+from tracing import tracer
 
 # 1. Shared State
+# A checkpointed thread keeps its state across queries, so the per-run fields
+# below start over when a run's input sets them to None (see new_run)
+def add_per_run(current, new):
+    return type(current)() if new is None else operator.add(current, new)
+
+def keep_first(current: float, new: float | None) -> float:
+    return 0.0 if new is None else current or new
+
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Like add_messages, but older agent turns are folded into a running summary
+    messages: Annotated[Sequence[BaseMessage], compact_messages]
+    # Per-run accounting, summed across node calls
+    steps: Annotated[int, add_per_run]
+    tokens: Annotated[int, add_per_run]
+    # Wall-clock time the run's first node started, and the latest node ended
+    started: Annotated[float, keep_first]
+    finished: float
+    # Control marker each node ended with (RESEARCH_COMPLETE, NEED_MORE_RESEARCH or "")
+    markers: Annotated[list[str], add_per_run]
+
+def new_run(query: str) -> dict:
+    """The input for a new query: the message, and a fresh budget for this run."""
+    return {"messages": [HumanMessage(content=query)],
+            "steps": None, "tokens": None, "markers": None, "started": None, "finished": None}
 
 # 2. Setup Model
 load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=api_key)
+# Built on first use (see factory.py); assign a chat model here to replace it
+llm = None
 
-# 3. Decision Router
-def supervisor_router(state: AgentState) -> Literal["researcher", "writer", "__end__"]:
-    last_message = state["messages"][-1]
-    content = last_message.content.upper()
-    
-    if "RESEARCH_COMPLETE" in content:
-        return "writer"
-    if "NEED_MORE_RESEARCH" in content:
-        return "researcher"
-    
-    # If it's a Human query, we always start with Research
-    if isinstance(last_message, HumanMessage):
-        return "researcher"
-    
-    return "__end__"
+def get_llm():
+    # Repeated prompts are answered from the response cache (see response_cache.py)
+    # Every call is recorded as a span when TRACING is on (see tracing.py)
+    return llm if llm is not None else chat_model("gemini-2.5-flash", response_cache=True, traced=True)
+
+# 3. Run Budget & Decision Router
+@dataclass
+class RunBudget:
+    """
+    Limits for one run; pass a different one per run via config["configurable"]["budget"].
+
+    max_seconds is wall time since the first node started (so it includes
+    routing, and the time between a crash and its resume). The router's
+    structured_route calls are not in the token count: a conditional edge
+    can't update the state. Router.stats() and tracing report them.
+    """
+    max_steps: int = int(os.getenv("MAX_AGENT_STEPS", "6"))
+    max_tokens: int = int(os.getenv("MAX_AGENT_TOKENS", "20000"))
+    max_seconds: float = float(os.getenv("MAX_AGENT_SECONDS", "120"))
+
+DEFAULT_BUDGET = RunBudget()
+# Prompt size cap for a single node call
+NODE_TOKEN_BUDGET = int(os.getenv("NODE_TOKEN_BUDGET", "2000"))
+# Rules decide the clear cases; ROUTER=hybrid asks the model for a typed RouteDecision
+# when they can't (see routing.py), ROUTER=rules falls back to ending the run
+ROUTER = os.getenv("ROUTER", "hybrid")
+router = Router(fallback=(lambda state: structured_route(get_llm(), state)) if ROUTER == "hybrid" else None)
+
+def get_budget(config: RunnableConfig | None) -> RunBudget:
+    return ((config or {}).get("configurable") or {}).get("budget") or DEFAULT_BUDGET
+
+def get_router(config: RunnableConfig | None) -> Router:
+    return ((config or {}).get("configurable") or {}).get("router") or router
+
+def elapsed(state: AgentState, now: float | None = None) -> float:
+    """Wall seconds since the run's first node started (0 before it)."""
+    started = state.get("started")
+    return (now or time.time()) - started if started else 0.0
+
+def stop_reason(state: AgentState, budget: RunBudget = DEFAULT_BUDGET, now: float | None = None) -> str | None:
+    """Why the run must stop now (or at `now`), or None if it may continue."""
+    if (state.get("steps") or 0) >= budget.max_steps:
+        return "max_steps"
+    if (state.get("tokens") or 0) >= budget.max_tokens:
+        return "max_tokens"
+    if state.get("started") and elapsed(state, now) >= budget.max_seconds:
+        return "max_seconds"
+    markers = state.get("markers") or []
+    # The writer asked for more research twice in a row: another bounce won't help
+    if len(markers) >= 3 and markers[-1] == markers[-3] == "NEED_MORE_RESEARCH":
+        return "repeated_marker"
+    return None
+
+def run_metrics(state: AgentState, budget: RunBudget = DEFAULT_BUDGET) -> dict:
+    """Iterations, tokens and time a finished run used, and why it stopped."""
+    finished = state.get("finished")
+    return {
+        "steps": state.get("steps") or 0,
+        "tokens": state.get("tokens") or 0,
+        "seconds": round(elapsed(state, finished), 3),
+        "stop_reason": stop_reason(state, budget, finished) or "done",
+    }
+
+def supervisor_router(state: AgentState, config: RunnableConfig = None) -> Literal["researcher", "writer", "__end__"]:
+    if stop_reason(state, get_budget(config)):
+        return "__end__"
+
+    return get_router(config).route(state).next
+
+def call_llm(messages, name: str) -> dict:
+    """Invoke the model and return the node's state update, including its usage."""
+    started = time.time()
+    response = get_llm().invoke(messages)
+    usage = getattr(response, "usage_metadata", None)
+    tokens = usage["total_tokens"] if usage else estimate_tokens(messages) + estimate_tokens([response])
+    if NEED_MORE_RESEARCH_RE.search(response.content):
+        marker = "NEED_MORE_RESEARCH"
+    elif RESEARCH_COMPLETE_RE.search(response.content):
+        marker = "RESEARCH_COMPLETE"
+    else:
+        marker = ""
+    return {
+        "messages": [AIMessage(content=response.content, name=name)],
+        "steps": 1,
+        "tokens": tokens,
+        "started": started,
+        "finished": time.time(),
+        "markers": [marker],
+    }
 
 # 4. Pure Node Functions (Direct LLM Calls for maximum reliability)
-def researcher_node(state: AgentState):
-    print("\n[Node] Researcher is gathering facts...")
+def researcher_node(state: AgentState, log=print):
+    log("\n[Node] Researcher is gathering facts...")
     system_prompt = (
         "You are a Research Specialist. List 3 key facts about the topic. "
         "End your message with RESEARCH_COMPLETE."
     )
-    # Combine system prompt with conversation history
-    messages = [AIMessage(content=system_prompt)] + list(state["messages"])
-    response = llm.invoke(messages)
-    return {"messages": [AIMessage(content=response.content, name="Researcher")]}
+    # Combine system prompt with the (compacted) conversation history
+    messages = fit_to_budget([AIMessage(content=system_prompt)] + list(state["messages"]), NODE_TOKEN_BUDGET)
+    return call_llm(messages, "Researcher")
 
-def writer_node(state: AgentState):
-    print("\n[Node] Writer is crafting the response...")
+def writer_node(state: AgentState, log=print):
+    log("\n[Node] Writer is crafting the response...")
     system_prompt = (
         "You are a Creative Writer. Turn the provided facts into a tiny 2-line rhyming poem. "
         "If there are no facts, say NEED_MORE_RESEARCH. Otherwise, just output the poem."
     )
-    # The writer sees everything the researcher found
-    messages = [AIMessage(content=system_prompt)] + list(state["messages"])
-    response = llm.invoke(messages)
-    return {"messages": [AIMessage(content=response.content, name="Writer")]}
+    # The writer sees the latest facts plus a summary of earlier turns
+    messages = fit_to_budget([AIMessage(content=system_prompt)] + list(state["messages"]), NODE_TOKEN_BUDGET)
+    return call_llm(messages, "Writer")
 
 # 5. Build the Graph
-workflow = StateGraph(AgentState)
-workflow.add_node("researcher", researcher_node)
-workflow.add_node("writer", writer_node)
+def build_graph(checkpointer=None, verbose=True):
+    """
+    With a checkpointer, runs are saved per thread ID and can resume after a
+    crash. verbose=False keeps the nodes from printing (e.g. in a server).
+    """
+    log = print if verbose else (lambda message: None)
+    workflow = StateGraph(AgentState)
+    workflow.add_node("researcher", lambda state: researcher_node(state, log))
+    workflow.add_node("writer", lambda state: writer_node(state, log))
+
+    workflow.add_conditional_edges(START, supervisor_router)
+    workflow.add_conditional_edges("researcher", supervisor_router)
+    workflow.add_conditional_edges("writer", supervisor_router)
+
+    return workflow.compile(checkpointer=checkpointer)
 
-workflow.add_conditional_edges(START, supervisor_router)
-workflow.add_conditional_edges("researcher", supervisor_router)
-workflow.add_conditional_edges("writer", supervisor_router)
+@once
+def default_graph():
+    """The graph without a checkpointer, compiled on first use."""
+    return build_graph()
 
-multi_agent_system = workflow.compile()
+def __getattr__(name):
+    # `multi_agent_system` used to be compiled at import time; it is now compiled on first access
+    if name == "multi_agent_system":
+        return default_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="08 Dynamic Multi-Agent Workflow")
+    parser.add_argument("--thread", help="Thread ID to save the run under; pass it again to resume an interrupted run")
+    args = parser.parse_args()
+
     print("🚀 Dynamic Specialist Workflow (Reliable Version)")
     
     query = "Write a poem about the discovery of Electricity."
-    inputs = {"messages": [HumanMessage(content=query)]}
+    inputs = new_run(query)
     
-    for chunk in multi_agent_system.stream(inputs, stream_mode="values"):
-        if "messages" in chunk:
-            msg = chunk["messages"][-1]
-            if not isinstance(msg, HumanMessage):
-                name = getattr(msg, "name", "Assistant")
-                print(f"\n[{name.upper()}]:\n{msg.content}")
+    # Every completed node is saved (CHECKPOINT_DB, see checkpoints.py)
+    with checkpointer() as saver:
+        graph = build_graph(saver)
+        config = thread_config(args.thread)
+        if saver is not None:
+            print(f"🧵 Thread: {config['configurable']['thread_id']}")
+
+        final_state = inputs
+        with tracer.span("agent.stream", "agent"):
+            for chunk in graph.stream(resume_input(graph, inputs, config), config=config, stream_mode="values"):
+                final_state = chunk
+                if "messages" in chunk:
+                    msg = chunk["messages"][-1]
+                    if not isinstance(msg, HumanMessage):
+                        name = getattr(msg, "name", "Assistant")
+                        print(f"\n[{name.upper()}]:\n{msg.content}")
 
     print("\n" + "="*40)
+    metrics = run_metrics(final_state)
+    print(f"📊 {metrics['steps']} steps, {metrics['tokens']} tokens, {metrics['seconds']}s (stop: {metrics['stop_reason']})")
     print("✅ Coordination Complete!")
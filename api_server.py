@@ -0,0 +1,277 @@
+"""
+HTTP front end for the agents, with server-sent-event streaming.
+
+    python api_server.py --port 8000 --workers 16 --max-in-flight 32 --max-queue 64
+
+Endpoints (POST with a JSON body; add "stream": true for server-sent events):
+    /v1/react        {"message", "conversation_id"}   03 GeminiAgent.ask
+    /v1/langchain    {"message", "conversation_id"}   06 AgentService
+    /v1/multi-agent  {"message"}                      07 multi_agent_system
+    /v1/dynamic      {"message"}                      08 multi_agent_system
+    GET /healthz                                      queue and worker stats
+
+A request without a conversation_id starts a new conversation; its id comes
+back in the answer (and in the X-Conversation-Id header of a stream), so
+clients that don't send one never share a history.
+
+The clients, agents and graphs are built once at startup. At most
+`max_in_flight` requests run at a time; up to `max_queue` more wait for a
+slot, and anything beyond that is answered at once with 503 and
+Retry-After instead of piling up. Blocking SDK calls (03, the sync nodes of
+08) run on a thread pool of `workers` threads.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from checkpoints import async_checkpointer
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdmissionQueue:
+    """Bounded admission: `max_in_flight` requests run, `max_queue` more wait, the rest are rejected."""
+
+    def __init__(self, max_in_flight: int = 32, max_queue: int = 64):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.admitted = 0  # running + waiting
+        self.running = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def reserve(self):
+        """Claim a place in the queue or raise Overloaded; pair with release()."""
+        if self.admitted >= self.max_in_flight + self.max_queue:
+            self.rejected += 1
+            raise Overloaded()
+        self.admitted += 1
+
+    def release(self):
+        self.admitted -= 1
+        self.completed += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait for one of the `max_in_flight` slots (after reserve())."""
+        async with self.slots:
+            self.running += 1
+            try:
+                yield
+            finally:
+                self.running -= 1
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        self.reserve()
+        try:
+            async with self.slot():
+                yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {"running": self.running, "waiting": self.admitted - self.running, "rejected": self.rejected,
+                "completed": self.completed, "max_in_flight": self.max_in_flight, "max_queue": self.max_queue}
+
+
+class KeyedLocks:
+    """One threading lock per key, dropped when nobody holds or waits for it."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextlib.contextmanager
+    def hold(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+
+class AdmittedStream(StreamingResponse):
+    """SSE response that holds its queue reservation until the response is done."""
+
+    def __init__(self, events, admission: AdmissionQueue, conversation_id: str):
+        super().__init__(self._run(events, admission), media_type="text/event-stream",
+                         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no",
+                                  "X-Conversation-Id": conversation_id})
+        self.admission = admission
+
+    @staticmethod
+    async def _run(events, admission):
+        async with admission.slot():
+            try:
+                async for event in events:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+# --- Agents ---
+
+def load(name):
+    return importlib.import_module(name)
+
+
+class Agents:
+    """Everything built once at startup; `chat_model` / `genai_client` replace the real models (load tests)."""
+
+    def __init__(self, genai_client=None, chat_model=None, checkpointer=None):
+        react, langchain_agent = load("03_react_agent"), load("06_langchain_agent")
+        multi_agent, dynamic = load("07_multi_agent"), load("08_dynamic_multi_agent")
+        # Quiet variants: the demos print every message and token, which a server must not
+        self.react = react.GeminiAgent(gemini_client=genai_client, verbose=False)
+        self.react_locks = KeyedLocks()
+        self.langchain = langchain_agent.AgentService(langchain_agent.build_agent(model=chat_model, checkpointer=checkpointer))
+        self.multi_agent = multi_agent.build_graph(chat_model or multi_agent.get_llm(), verbose=False)
+        if chat_model:
+            # 08's nodes call the module-level llm
+            dynamic.llm = chat_model
+        self.dynamic = dynamic.build_graph(verbose=False)
+
+    async def react_events(self, message, conversation_id, stream=True):
+        """Runs the blocking 03 agent on the worker pool and forwards its stream."""
+        loop = asyncio.get_running_loop()
+        if not stream:
+            # Plain send_message; nothing to forward but the answer
+            def answer():
+                with self.react_locks.hold(conversation_id):
+                    return self.react.ask(message, conversation_id)
+            yield {"type": "final", "text": await loop.run_in_executor(None, answer)}
+            return
+        queue = asyncio.Queue()
+
+        def emit(event):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        def run():
+            # A conversation's chat history can't take two turns at once
+            with self.react_locks.hold(conversation_id):
+                return self.react.ask(
+                    message, conversation_id, stream=True,
+                    on_text=lambda text: emit({"type": "token", "text": text}),
+                    on_function_call=lambda fc: emit({"type": "tool_start", "name": fc.name, "args": dict(fc.args or {})}),
+                )
+
+        future = loop.run_in_executor(None, run)
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+        while (event := await queue.get()) is not None:
+            yield event
+        yield {"type": "final", "text": future.result()}
+
+    @staticmethod
+    async def graph_events(graph, message):
+        """Each agent message of a 07/08 run as it's produced, then the last one as the answer."""
+        final = ""
+        inputs = {"messages": [HumanMessage(content=message)]}
+        async for chunk in graph.astream(inputs, stream_mode="updates"):
+            for update in chunk.values():
+                for msg in (update or {}).get("messages", []):
+                    if isinstance(msg, AIMessage):
+                        final = msg.content
+                        yield {"type": "message", "name": msg.name, "text": msg.content}
+        yield {"type": "final", "text": final}
+
+
+# --- App ---
+
+def create_app(genai_client=None, chat_model=None, workers: int = 16, max_in_flight: int = 32, max_queue: int = 64):
+    state = {}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # Sized pool for blocking SDK calls; LangGraph runs sync nodes on it too
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-worker")
+        asyncio.get_running_loop().set_default_executor(executor)
+        state["admission"] = AdmissionQueue(max_in_flight, max_queue)
+        async with async_checkpointer() as saver:
+            state["agents"] = Agents(genai_client, chat_model, checkpointer=saver)
+            yield
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def endpoint(events_for):
+        """POST handler: JSON answer, or SSE events when the body has "stream": true."""
+        async def handler(request):
+            try:
+                body = await request.json()
+                message = body["message"]
+            except (ValueError, KeyError, TypeError):
+                return JSONResponse({"error": 'expected a JSON body with a "message"'}, status_code=400)
+            conversation_id = str(body.get("conversation_id") or uuid.uuid4().hex)
+            stream = bool(body.get("stream"))
+            admission, agents = state["admission"], state["agents"]
+
+            if stream:
+                try:
+                    admission.reserve()
+                except Overloaded:
+                    return JSONResponse({"error": "overloaded"}, status_code=503, headers={"Retry-After": "1"})
+                return AdmittedStream(events_for(agents, message, conversation_id, stream), admission, conversation_id)
+
+            try:
+                async with admission.admit():
+                    answer = ""
+                    async for event in events_for(agents, message, conversation_id, stream):
+                        if event["type"] == "final":
+                            answer = event["text"]
+            except Overloaded:
+                return JSONResponse({"error": "overloaded"}, status_code=503, headers={"Retry-After": "1"})
+            except Exception as e:
+                return JSONResponse({"error": str(e)}, status_code=500)
+            return JSONResponse({"answer": answer, "conversation_id": conversation_id})
+        return handler
+
+    async def healthz(request):
+        return JSONResponse({"status": "ok", **state["admission"].stats()})
+
+    routes = [
+        Route("/v1/react", endpoint(lambda a, m, c, s: a.react_events(m, c, s)), methods=["POST"]),
+        Route("/v1/langchain", endpoint(lambda a, m, c, s: a.langchain.astream_answer(m, c)), methods=["POST"]),
+        Route("/v1/multi-agent", endpoint(lambda a, m, c, s: a.graph_events(a.multi_agent, m)), methods=["POST"]),
+        Route("/v1/dynamic", endpoint(lambda a, m, c, s: a.graph_events(a.dynamic, m)), methods=["POST"]),
+        Route("/healthz", healthz),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Agents over HTTP/SSE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "16")), help="Threads for blocking SDK calls")
+    parser.add_argument("--max-in-flight", type=int, default=int(os.getenv("API_MAX_IN_FLIGHT", "32")))
+    parser.add_argument("--max-queue", type=int, default=int(os.getenv("API_MAX_QUEUE", "64")), help="Requests waiting for a slot before 503s")
+    args = parser.parse_args()
+    uvicorn.run(create_app(workers=args.workers, max_in_flight=args.max_in_flight, max_queue=args.max_queue),
+                host=args.host, port=args.port)
@@ -0,0 +1,239 @@
+"""
+Offline benchmark of every prototype's agent loop.
+
+Each prototype runs against `FakeGemini` (fakes.py), a scripted Gemini REST
+backend plugged into the real `genai.Client` / `ChatGoogleGenerativeAI`, so
+the measured path is the real one: SDK request building and parsing,
+automatic function calling, chats, LangChain tool calls, LangGraph steps and
+MCP round trips. The scripted replies include the function calls each
+prototype expects, and every model call takes `--latency` seconds.
+
+Reported per scenario: time per run, model calls per run, and the
+orchestration overhead (time per run minus the simulated model latency),
+in total and per model call.
+
+    python benchmarks/bench_agents.py --runs 50
+    python benchmarks/bench_agents.py --save baseline.json
+    python benchmarks/bench_agents.py --compare baseline.json   # exit 1 on regressions
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototypes build real clients at import time; nothing here reaches the network
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ.update(RESPONSE_CACHE="off", TOOL_CACHE="off", CHECKPOINT_DB="off", TRACING="off")
+NOTES_DIR = tempfile.TemporaryDirectory()
+os.environ["NOTES_DB"] = os.path.join(NOTES_DIR.name, "notes.sqlite")
+
+from fakes import FakeGemini, call
+
+# The SDK warns about AFC use and non-text parts on every scripted call
+logging.getLogger("google_genai").setLevel(logging.ERROR)
+from mcp_pool import MCPSessionPool
+
+FACTS = "1. Franklin flew a kite. 2. Volta built a battery. 3. Faraday found induction. RESEARCH_COMPLETE"
+POEM = "Sparks in the sky, a kite flying high,\nVolta and Faraday taught currents to fly."
+
+
+def by_role(body):
+    """Researcher prompts get facts, everything else gets the poem (07/08)."""
+    text = json.dumps(body.get("contents", "")) + json.dumps(body.get("systemInstruction", ""))
+    return FACTS if "Research" in text or "research data" in text else POEM
+
+
+def load(name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return importlib.import_module(name)
+
+
+# --- Scenarios: setup(latency) -> (run(), backend) ---
+
+def basic(latency):
+    m = load("01_basic_interaction")
+    backend = FakeGemini(["Agents are programs that use a model to decide what to do next."], latency)
+    # Keep the client referenced: it closes its HTTP client when collected
+    m.client = backend.client()
+    m.models = m.client.models
+    return (lambda: m.get_response("What is an agent?")), backend
+
+
+def tool_calling(latency):
+    m = load("02_tool_calling")
+    backend = FakeGemini([
+        [call("get_current_weather", location="Paris"), call("get_current_weather", location="Tokyo")],
+        call("calculate", expression="22 + 10"),
+        "It is 32 degrees in Paris and Tokyo combined.",
+    ], latency)
+    m.client = backend.client()
+    m.models = m.client.models
+    return m.run_demo, backend
+
+
+def react_agent(latency):
+    m = load("03_react_agent")
+    backend = FakeGemini([
+        [call("get_weather", location="London"), call("get_weather", location="Paris")],
+        call("calculate", expression="15 + 20"),
+        "London is 15°C and Paris 20°C; together 35.",
+    ], latency)
+    m.client = backend.client()
+    agent = m.GeminiAgent(summarize=False)
+    counter = iter(range(10**9))
+    # A new conversation per run, so history doesn't grow across runs
+    return (lambda: agent.ask("Weather in London and Paris, added?", conversation_id=str(next(counter)))), backend
+
+
+def mcp_bridge(latency):
+    m = load("05_mcp_gemini_bridge")
+    backend = FakeGemini([
+        [call("add_note", content="Learn about MCP Agents"), call("add_note", content="Review the LangGraph docs")],
+        "Both notes are saved.",
+    ], latency)
+    client = backend.client()
+    state = {}
+
+    def run():
+        async def go():
+            if "pool" not in state:
+                devnull = state["stack"].enter_context(open(os.devnull, "w"))
+                pool = MCPSessionPool(m.make_server_params(), size=2, health_check_interval=0, errlog=devnull)
+                state["pool"] = await state["stack"].enter_async_context(pool)
+            await m.run_agent(state["pool"], client, "Keep two notes.")
+        state["loop"].run_until_complete(go())
+
+    state["loop"] = asyncio.new_event_loop()
+    state["stack"] = contextlib.AsyncExitStack()
+
+    def close():
+        state["loop"].run_until_complete(state["stack"].aclose())
+        state["loop"].close()
+    run.close = close
+    return run, backend
+
+
+def langchain_agent(latency):
+    m = load("06_langchain_agent")
+    from langchain.agents import create_agent
+    backend = FakeGemini([
+        [call("get_system_time"), call("process_data", text="Stitching is cool")],
+        "It is noon. Upper: STITCHING IS COOL | Count: 17",
+    ], latency)
+    agent = create_agent(model=backend.chat_model(), tools=m.tools)
+    return (lambda: agent.invoke({"messages": [{"role": "user", "content": "Time? Process 'Stitching is cool'."}]})), backend
+
+
+def multi_agent(latency, fan_out):
+    m = load("07_multi_agent")
+    from langchain_core.messages import HumanMessage
+    backend = FakeGemini([by_role], latency)
+    graph = m.build_graph(backend.chat_model(), fan_out=fan_out, verbose=False)
+    loop = asyncio.new_event_loop()
+    run = lambda: loop.run_until_complete(graph.ainvoke({"messages": [HumanMessage(content="What is LangChain?")]}))
+    run.close = loop.close
+    return run, backend
+
+
+def dynamic_multi_agent(latency):
+    m = load("08_dynamic_multi_agent")
+    from langchain_core.messages import HumanMessage
+    backend = FakeGemini([by_role], latency)
+    m.llm = backend.chat_model()
+    graph = m.build_graph()
+    return (lambda: graph.invoke({"messages": [HumanMessage(content="Write a poem about electricity.")]})), backend
+
+
+SCENARIOS = {
+    "01 generate_content": basic,
+    "02 tool calling (AFC)": tool_calling,
+    "03 ReAct chat": react_agent,
+    "05 MCP bridge": mcp_bridge,
+    "06 LangChain agent": langchain_agent,
+    "07 multi-agent": lambda latency: multi_agent(latency, 1),
+    "07 multi-agent fan-out 3": lambda latency: multi_agent(latency, 3),
+    "08 dynamic multi-agent": dynamic_multi_agent,
+}
+
+
+def measure(setup, runs, latency, trials=3):
+    """Best of `trials` batches of `runs` runs, after one warm-up run."""
+    run, backend = setup(latency)
+    best = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()  # warm up (connections, lazy imports, MCP pool)
+            for _ in range(trials):
+                calls_before, waiting_before = backend.calls, backend.waiting
+                start = time.perf_counter()
+                for _ in range(runs):
+                    run()
+                elapsed = time.perf_counter() - start
+                # Parallel calls (07 fan-out) overlap, so subtract the time spent waiting, not calls x latency
+                waiting = backend.waiting - waiting_before
+                if best is None or elapsed - waiting < best[0] - best[1]:
+                    best = (elapsed, waiting, backend.calls - calls_before)
+    finally:
+        if hasattr(run, "close"):
+            run.close()
+    elapsed, waiting, calls = best
+    calls /= runs
+    per_run = elapsed / runs
+    overhead = (elapsed - waiting) / runs
+    return {"ms_per_run": per_run * 1e3, "calls": calls, "overhead_ms": overhead * 1e3,
+            "overhead_ms_per_call": overhead * 1e3 / calls if calls else 0.0}
+
+
+def main(args):
+    selected = {name: setup for name, setup in SCENARIOS.items() if not args.only or args.only in name}
+    print(f"{args.runs} runs per scenario, {args.latency * 1e3:.0f} ms simulated model latency\n")
+    print(f"{'scenario':<26} {'ms/run':>9} {'calls':>6} {'overhead':>10} {'per call':>9}")
+    results = {}
+    for name, setup in selected.items():
+        r = results[name] = measure(setup, args.runs, args.latency)
+        print(f"{name:<26} {r['ms_per_run']:9.2f} {r['calls']:6.1f} {r['overhead_ms']:8.2f}ms {r['overhead_ms_per_call']:7.2f}ms")
+
+    settings = {"runs": args.runs, "latency": args.latency}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            saved = json.load(f)
+        baseline = saved["results"]
+        print(f"\nOverhead vs. {args.compare} (tolerance {args.tolerance:.0%}):")
+        if saved["settings"] != settings:
+            print(f"⚠️  baseline was measured with {saved['settings']}, this run with {settings}")
+        regressions = 0
+        for name, r in results.items():
+            if name not in baseline:
+                continue
+            before, after = baseline[name]["overhead_ms"], r["overhead_ms"]
+            change = (after - before) / before if before else 0.0
+            slower = change > args.tolerance
+            regressions += slower
+            print(f"{'❌' if slower else '✅'} {name:<26} {before:8.2f}ms -> {after:8.2f}ms ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per model call")
+    parser.add_argument("--only", help="Run scenarios whose name contains this string")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare overhead with a saved run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed overhead increase before --compare fails")
+    main(parser.parse_args())
@@ -0,0 +1,168 @@
+"""
+Load test of api_server.py against a fake model.
+
+Starts the app under uvicorn on a local port, with every agent backed by
+`FakeGemini` (each model call takes `--latency` seconds), and sends
+`--requests` requests per endpoint from `--concurrency` concurrent
+clients. Reports p50/p99 latency, time to the first SSE event (with
+--stream), requests per second and how many were turned away with 503.
+
+The conversational endpoints are then loaded once more without a
+conversation_id, which must give every request a conversation of its own.
+
+    python benchmarks/bench_api_server.py --concurrency 64 --requests 500
+    python benchmarks/bench_api_server.py --stream --endpoint react
+    python benchmarks/bench_api_server.py --max-in-flight 8 --max-queue 8   # watch the 503s
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ.update(RESPONSE_CACHE="off", TOOL_CACHE="off", TRACING="off")
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite"))
+
+import httpx
+import uvicorn
+
+from api_server import create_app
+from fakes import FakeGemini, call
+
+ENDPOINTS = ["react", "langchain", "multi-agent", "dynamic"]
+TOOL_ARGS = {"get_weather": {"location": "Paris"}, "calculate": {"expression": "20 + 15"},
+             "process_data": {"text": "load test"}, "get_system_time": {}}
+FACTS = "1. Franklin flew a kite. 2. Volta built a battery. 3. Faraday found induction. RESEARCH_COMPLETE"
+POEM = "Sparks in the sky, a kite flying high,\nVolta and Faraday taught currents to fly."
+
+
+def script(body):
+    """One tool call for the tool-using agents, then an answer; facts/poem for the graphs."""
+    last = body["contents"][-1]
+    declared = [f["name"] for tool in body.get("tools", []) for f in tool.get("functionDeclarations", [])]
+    if declared:
+        if any("functionResponse" in part for part in last["parts"]):
+            return "Paris is 20°C and sunny; the tools agree."
+        name = next(n for n in declared if n in TOOL_ARGS)
+        return call(name, **TOOL_ARGS[name])
+    text = json.dumps(body)
+    return FACTS if "Research" in text or "research data" in text else POEM
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(app, port):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+async def one_request(client, endpoint, index, stream, anonymous=False):
+    """(status, seconds, seconds to the first SSE event, conversation_id the server answered with)."""
+    body = {"message": f"Request {index}: weather in Paris?", "stream": stream}
+    if not anonymous:
+        body["conversation_id"] = f"{endpoint}-{index}"
+    start = time.perf_counter()
+    first_event = None
+    if not stream:
+        response = await client.post(f"/v1/{endpoint}", json=body)
+        conversation_id = response.json().get("conversation_id") if response.status_code == 200 else None
+        return response.status_code, time.perf_counter() - start, None, conversation_id
+    async with client.stream("POST", f"/v1/{endpoint}", json=body) as response:
+        async for line in response.aiter_lines():
+            if first_event is None and line.startswith("event:"):
+                first_event = time.perf_counter() - start
+        return response.status_code, time.perf_counter() - start, first_event, response.headers.get("x-conversation-id")
+
+
+async def load(base_url, endpoint, requests, concurrency, stream, anonymous=False):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        indexes = iter(range(requests))
+        results = []
+
+        async def worker():
+            for index in indexes:
+                results.append(await one_request(client, endpoint, index, stream, anonymous))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results, time.perf_counter() - start
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float("nan")
+
+
+def main(args):
+    backend = FakeGemini([script], latency=args.latency, chunk_latency=args.latency / 10)
+    client = backend.client()
+    app = create_app(genai_client=client, chat_model=backend.chat_model(),
+                     workers=args.workers, max_in_flight=args.max_in_flight, max_queue=args.max_queue)
+    port = free_port()
+    endpoints = ENDPOINTS if args.endpoint == "all" else [args.endpoint]
+
+    print(f"{args.requests} requests per endpoint, {args.concurrency} clients, {args.latency * 1e3:.0f} ms model latency, "
+          f"{args.workers} workers, max {args.max_in_flight} in flight + {args.max_queue} queued"
+          f"{', SSE' if args.stream else ''}\n")
+    header = f"{'endpoint':<18} {'ok':>5} {'503':>5} {'p50 ms':>8} {'p99 ms':>8} {'rps':>7}"
+    print(header + (f" {'first event p50':>16}" if args.stream else ""))
+    failures = 0
+    # The server runs the quiet variants of the agents, so nothing else prints here
+    with serve(app, port):
+        cases = [(endpoint, False) for endpoint in endpoints]
+        cases += [(endpoint, True) for endpoint in endpoints if endpoint in ("react", "langchain")]
+        for endpoint, anonymous in cases:
+            calls_before = backend.calls
+            results, elapsed = asyncio.run(load(f"http://127.0.0.1:{port}", endpoint, args.requests, args.concurrency,
+                                                args.stream, anonymous))
+            ok = [r for r in results if r[0] == 200]
+            latencies = [r[1] for r in ok]
+            label = f"{endpoint} (no id)" if anonymous else endpoint
+            line = (f"{label:<18} {len(ok):>5} {sum(r[0] == 503 for r in results):>5} "
+                    f"{percentile(latencies, 0.5) * 1e3:8.1f} {percentile(latencies, 0.99) * 1e3:8.1f} "
+                    f"{len(ok) / elapsed:7.1f}")
+            if args.stream:
+                line += f" {percentile([r[2] for r in ok if r[2] is not None], 0.5) * 1e3:14.1f}ms"
+            line += f"   ({(backend.calls - calls_before) / max(1, len(ok)):.1f} model calls/request)"
+            if anonymous:
+                distinct = len({r[3] for r in ok if r[3]})
+                failures += distinct != len(ok)
+                line += f" {'✅' if distinct == len(ok) else '❌'} {distinct} conversations"
+            print(line)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=ENDPOINTS + ["all"], default="all")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per model call")
+    parser.add_argument("--stream", action="store_true", help="Use SSE streaming requests")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--max-queue", type=int, default=64)
+    main(parser.parse_args())
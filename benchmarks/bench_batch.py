@@ -0,0 +1,64 @@
+"""
+Throughput of the batch mode in 01_basic_interaction.py against a stub client.
+
+The stub answers after `--latency` seconds and fails a fraction of calls
+with 429s (`--error-rate`) so retries and backoff are exercised too.
+
+    python benchmarks/bench_batch.py --prompts 200 --latency 0.1 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototype refuses to start without a key; the stub never uses it
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+basic = importlib.import_module("01_basic_interaction")
+
+from fakes import FakeClient
+
+
+async def run(prompts, concurrency, latency, error_rate, rpm):
+    client = FakeClient(latency=latency, error_rate=error_rate)
+    start = time.perf_counter()
+    latencies, errors = [], 0
+    async for result in basic.run_batch(
+        client.aio.models,
+        prompts,
+        concurrency=concurrency,
+        requests_per_minute=rpm,
+        ordered=True,
+    ):
+        latencies.append(result["latency"])
+        errors += "error" in result
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"concurrency={concurrency:<4} {len(prompts) / elapsed:8.1f} prompts/s  total={elapsed:6.2f} s  "
+        f"p50={latencies[len(latencies) // 2] * 1000:7.1f} ms  p99={p99 * 1000:7.1f} ms  "
+        f"429s={client.aio.models.rate_limited}  failed={errors}"
+    )
+
+
+def main(args):
+    prompts = [{"prompt": f"Explain concept number {i}"} for i in range(args.prompts)]
+    print(f"--- {args.prompts} prompts, stub latency {args.latency * 1000:.0f} ms, 429 rate {args.error_rate:.0%} ---")
+    for concurrency in args.concurrency:
+        asyncio.run(run(prompts, concurrency, args.latency, args.error_rate, args.rpm))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--rpm", type=float, default=None, help="Token bucket limit in requests per minute")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    main(parser.parse_args())
@@ -0,0 +1,156 @@
+"""
+Cost of checkpointing the LangGraph prototypes, and what resuming saves.
+
+1. Overhead: runs the 08 (sync) and 07 (async) graphs with an instant fake
+   LLM and no checkpointer, the in-memory saver and the SQLite saver, and
+   reports the extra time per checkpoint write.
+2. Resume: a fake LLM fails with a quota error on the writer call; the run
+   is retried from scratch (no checkpointer) and resumed from its thread
+   (SQLite), counting how many LLM calls each needed.
+
+    python benchmarks/bench_checkpoint.py --runs 200
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototypes build a real LLM client at import time; the fake never uses it
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+multi_agent = importlib.import_module("07_multi_agent")
+dynamic = importlib.import_module("08_dynamic_multi_agent")
+
+from langchain_core.messages import HumanMessage
+
+from checkpoints import async_checkpointer, checkpointer, resume_input, thread_config
+from fakes import FakeChatModel
+
+FACTS = "1. Franklin flew a kite. 2. Volta built a battery. 3. Faraday found induction. RESEARCH_COMPLETE"
+POEM = "Sparks in the sky, a kite flying high,\nVolta and Faraday taught currents to fly."
+
+
+class FlakyChatModel(FakeChatModel):
+    """
+    Answers the researcher with FACTS and the writer with POEM, and fails the
+    attempts whose (1-based) numbers are in `fail_on`, like a 429 mid-run.
+    """
+
+    fail_on: set = set()
+    attempts: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.attempts += 1
+        if self.attempts in self.fail_on:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED (fake)")
+        self.responses = [FACTS if "Research Specialist" in messages[0].content else POEM]
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def inputs(i):
+    return {"messages": [HumanMessage(content=f"Write a poem about electricity #{i}.")]}
+
+
+def time_sync(saver, runs, trials=3):
+    """Best of `trials` timings; every trial uses fresh thread IDs."""
+    dynamic.llm = FakeChatModel(responses=[FACTS, POEM])
+    graph = dynamic.build_graph(saver)
+    best = float("inf")
+    for trial in range(trials):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(runs):
+                graph.invoke(inputs(i), config=thread_config(f"sync-{trial}-{i}"))
+        best = min(best, time.perf_counter() - start)
+    writes = len(list(saver.list(thread_config("sync-0-0")))) if saver else 0
+    return best, writes
+
+
+async def time_async(saver, runs, trials=3):
+    graph = multi_agent.build_graph(FakeChatModel(), verbose=False, checkpointer=saver)
+    best = float("inf")
+    for trial in range(trials):
+        start = time.perf_counter()
+        for i in range(runs):
+            await graph.ainvoke(inputs(i), config=thread_config(f"async-{trial}-{i}"))
+        best = min(best, time.perf_counter() - start)
+    writes = len([c async for c in saver.alist(thread_config("async-0-0"))]) if saver else 0
+    return best, writes
+
+
+def report(label, timings, runs):
+    base = timings["none"][0]
+    print(f"\n--- {label} ({runs} runs) ---")
+    print(f"{'checkpointer':<10} {'per run':>10} {'writes/run':>11} {'per write':>12}")
+    for name, (elapsed, writes) in timings.items():
+        per_write = (elapsed - base) / (runs * writes) * 1e6 if writes else 0.0
+        print(f"{name:<10} {elapsed / runs * 1e3:8.2f}ms {writes:>11} {per_write:10.1f}us")
+
+
+def resume_demo(db):
+    query = inputs("resume")
+    # Without a checkpointer the whole run has to be repeated
+    dynamic.llm = llm = FlakyChatModel(fail_on={2})
+    graph = dynamic.build_graph()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2):
+            try:
+                graph.invoke(query)
+                break
+            except RuntimeError:
+                pass
+    restart_calls = llm.attempts
+
+    # With one, the retry starts at the node that failed
+    dynamic.llm = llm = FlakyChatModel(fail_on={2})
+    config = thread_config("resume-demo")
+    with checkpointer(db) as saver, contextlib.redirect_stdout(io.StringIO()):
+        graph = dynamic.build_graph(saver)
+        for _ in range(2):
+            try:
+                graph.invoke(resume_input(graph, query, config), config=config)
+                break
+            except RuntimeError:
+                pass
+        # A third invoke on the finished thread returns the saved result
+        graph.invoke(resume_input(graph, query, config), config=config)
+    print("\n--- Resume after a quota error on the writer call ---")
+    print(f"restart from scratch : {restart_calls} LLM calls")
+    print(f"resume from thread   : {llm.attempts} LLM calls (and none for a re-run of the finished thread)")
+
+
+async def main(runs):
+    # Warm up imports and LangGraph's lazy setup before timing anything
+    time_sync(None, 5, trials=1)
+    await time_async(None, 5, trials=1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sync_timings = {"none": time_sync(None, runs)}
+        with checkpointer(":memory:") as saver:
+            sync_timings["memory"] = time_sync(saver, runs)
+        with checkpointer(os.path.join(tmpdir, "sync.sqlite")) as saver:
+            sync_timings["sqlite"] = time_sync(saver, runs)
+        report("08_dynamic_multi_agent (SqliteSaver)", sync_timings, runs)
+
+        async_timings = {"none": await time_async(None, runs)}
+        async with async_checkpointer(":memory:") as saver:
+            async_timings["memory"] = await time_async(saver, runs)
+        async with async_checkpointer(os.path.join(tmpdir, "async.sqlite")) as saver:
+            async_timings["sqlite"] = await time_async(saver, runs)
+        report("07_multi_agent (AsyncSqliteSaver)", async_timings, runs)
+
+        resume_demo(os.path.join(tmpdir, "resume.sqlite"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
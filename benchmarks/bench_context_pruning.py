@@ -0,0 +1,102 @@
+"""
+Prompt size per model call in 08_dynamic_multi_agent.py as a run grows.
+
+Replays an endless researcher <-> writer loop (the loop guard is switched
+off) with a fake chat model that records the size of every prompt, once
+with plain `add_messages` and once with the compacting reducer plus the
+per-node token budget the prototype uses.
+
+    python benchmarks/bench_context_pruning.py --iterations 100
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sys
+from typing import Annotated, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototype builds a real LLM client at import time; the fake never uses it
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+dynamic = importlib.import_module("08_dynamic_multi_agent")
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from fakes import FakeChatModel
+from message_compaction import estimate_tokens
+
+FACTS = (
+    "1. Benjamin Franklin's 1752 kite experiment showed that lightning is electrical. "
+    "2. Alessandro Volta built the first battery, the voltaic pile, in 1800. "
+    "3. Michael Faraday discovered electromagnetic induction in 1831. RESEARCH_COMPLETE"
+)
+
+
+class RecordingChatModel(FakeChatModel):
+    """Fake model that remembers the estimated size of every prompt it gets."""
+
+    prompt_tokens: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompt_tokens.append(estimate_tokens(messages))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+class PlainState(dynamic.AgentState):
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+
+
+def build_graph(state_schema):
+    workflow = StateGraph(state_schema)
+    # Unannotated wrappers, so the prototype's AgentState hints don't override the schema
+    route = lambda state, config: dynamic.supervisor_router(state, config)
+    path = ["researcher", "writer", END]
+    workflow.add_node("researcher", lambda state: dynamic.researcher_node(state))
+    workflow.add_node("writer", lambda state: dynamic.writer_node(state))
+    workflow.add_conditional_edges(START, route, path)
+    workflow.add_conditional_edges("researcher", route, path)
+    workflow.add_conditional_edges("writer", route, path)
+    return workflow.compile()
+
+
+def run(graph, iterations, node_budget):
+    llm = RecordingChatModel(responses=[FACTS, "NEED_MORE_RESEARCH"], prompt_tokens=[])
+    dynamic.llm = llm
+    dynamic.NODE_TOKEN_BUDGET = node_budget
+    inputs = {"messages": [HumanMessage(content="Write a poem about the discovery of Electricity.")]}
+    config = {"recursion_limit": iterations * 2 + 1}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in graph.stream(inputs, config=config, stream_mode="updates"):
+            if llm.calls >= iterations * 2:
+                break
+    return llm.prompt_tokens
+
+
+def main(iterations, node_budget):
+    # Loop forever: no budget, no repeated-marker exit
+    dynamic.stop_reason = lambda state, budget=None, now=None: None
+
+    plain = run(build_graph(PlainState), iterations, 10**9)
+    compacted = run(dynamic.multi_agent_system, iterations, node_budget)
+
+    print(f"Prompt tokens per call over {iterations} researcher/writer iterations\n")
+    print(f"{'iteration':>9} {'add_messages':>13} {'compacted':>10}")
+    checkpoints = sorted({1, 2, 5, 10, 25, 50, 100, 250, 500, iterations} & set(range(1, iterations + 1)))
+    for i in checkpoints:
+        call = 2 * i - 1  # the writer call of iteration i
+        print(f"{i:>9} {plain[call]:>13,} {compacted[call]:>10,}")
+    print(f"{'total':>9} {sum(plain):>13,} {sum(compacted):>10,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--node-budget", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations, args.node_budget)
@@ -0,0 +1,110 @@
+"""
+Loop guard of 08_dynamic_multi_agent.py, replayed with scripted LLM answers.
+
+Each scenario feeds the graph a fixed sequence of researcher/writer replies
+(a fake chat model, no API calls) and reports how many steps and tokens the
+run used and why it stopped. The last scenario shows the same endless
+NEED_MORE_RESEARCH loop without the guard, where only LangGraph's recursion
+limit stops it.
+
+Then it asks several queries on one checkpointed thread, as `--thread`
+does, and checks that each gets its own budget and a fresh answer.
+
+    python benchmarks/bench_loop_guard.py
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototype builds a real LLM client at import time; the fake never uses it
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+dynamic = importlib.import_module("08_dynamic_multi_agent")
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.errors import GraphRecursionError
+
+from fakes import FakeChatModel
+
+FACTS = "1. Franklin flew a kite. 2. Volta built a battery. 3. Faraday found induction. RESEARCH_COMPLETE"
+POEM = "Sparks in the sky, a kite flying high,\nVolta and Faraday taught currents to fly."
+UNLIMITED = dynamic.RunBudget(max_steps=10**6, max_tokens=10**9, max_seconds=10**6)
+
+SCENARIOS = [
+    # name, scripted replies, budget, expected stop reason
+    ("straight through", [FACTS, POEM], dynamic.RunBudget(), "done"),
+    ("one bounce", [FACTS, "NEED_MORE_RESEARCH", FACTS, POEM], dynamic.RunBudget(), "done"),
+    ("endless bounce", [FACTS, "NEED_MORE_RESEARCH"], dynamic.RunBudget(), "repeated_marker"),
+    ("step budget", [FACTS, "NEED_MORE_RESEARCH", FACTS, POEM], dynamic.RunBudget(max_steps=3), "max_steps"),
+    ("token budget", [FACTS, "NEED_MORE_RESEARCH", FACTS, POEM], dynamic.RunBudget(max_tokens=100), "max_tokens"),
+    ("time budget", [FACTS, "NEED_MORE_RESEARCH", FACTS, POEM], dynamic.RunBudget(max_seconds=0.0), "max_seconds"),
+]
+
+
+def replay(replies, budget, recursion_limit=25):
+    dynamic.llm = FakeChatModel(responses=replies)
+    inputs = dynamic.new_run("Write a poem about the discovery of Electricity.")
+    config = {"configurable": {"budget": budget}, "recursion_limit": recursion_limit}
+    state = inputs
+    try:
+        # The nodes print progress lines; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for state in dynamic.multi_agent_system.stream(inputs, config=config, stream_mode="values"):
+                pass
+    except GraphRecursionError:
+        return {**dynamic.run_metrics(state, budget), "stop_reason": "recursion_limit"}
+    return dynamic.run_metrics(state, budget)
+
+
+def main(recursion_limit):
+    print(f"{'scenario':<18} {'steps':>5} {'tokens':>7} {'stop reason':<16} {'expected':<16}")
+    failures = 0
+    scenarios = SCENARIOS + [("endless, no guard", [FACTS, "NEED_MORE_RESEARCH"], None, "recursion_limit")]
+    for name, replies, budget, expected in scenarios:
+        if budget is None:
+            # Disable the guard entirely, including the repeated-marker exit
+            original, dynamic.stop_reason = dynamic.stop_reason, lambda state, budget=None, now=None: None
+            metrics = replay(replies, UNLIMITED, recursion_limit)
+            dynamic.stop_reason = original
+        else:
+            metrics = replay(replies, budget, recursion_limit)
+        ok = metrics["stop_reason"] == expected
+        failures += not ok
+        print(f"{name:<18} {metrics['steps']:>5} {metrics['tokens']:>7} {metrics['stop_reason']:<16} {expected:<16} {'✅' if ok else '❌'}")
+    failures += same_thread(queries=5)
+    sys.exit(1 if failures else 0)
+
+
+def same_thread(queries):
+    """Several queries on one checkpointed thread; each must get its own budget."""
+    dynamic.llm = FakeChatModel(responses=[FACTS, POEM])
+    graph = dynamic.build_graph(InMemorySaver(), verbose=False)
+    config = {"configurable": {"thread_id": "same-thread", "budget": dynamic.RunBudget(max_steps=3)}}
+    print(f"\n{queries} queries on one thread (max_steps=3)")
+    print(f"{'query':<18} {'steps':>5} {'tokens':>7} {'stop reason':<16} {'answer':<16}")
+    failures = 0
+    for i in range(queries):
+        calls = dynamic.llm.calls
+        state = graph.invoke(dynamic.new_run(f"Write a poem about electricity #{i}."), config=config)
+        metrics = dynamic.run_metrics(state, config["configurable"]["budget"])
+        last = state["messages"][-1]
+        answered = isinstance(last, AIMessage) and last.name == "Writer" and dynamic.llm.calls == calls + 2
+        ok = answered and metrics["steps"] == 2 and metrics["stop_reason"] == "done"
+        failures += not ok
+        print(f"query {i + 1:<12} {metrics['steps']:>5} {metrics['tokens']:>7} {metrics['stop_reason']:<16} "
+              f"{'poem' if answered else 'none':<16} {'✅' if ok else '❌'}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recursion-limit", type=int, default=25)
+    args = parser.parse_args()
+    main(args.recursion_limit)
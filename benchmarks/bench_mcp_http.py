@@ -0,0 +1,158 @@
+"""
+Load test of the Notes MCP server over streamable HTTP.
+
+Starts one `04_mcp/server.py --transport streamable-http` process (or uses
+a server already running at --url), connects `--sessions` concurrent
+ClientSessions to it and has each one do `--rounds` rounds of add_note
+followed by a read of the note://list resource. Reports throughput and
+p50/p95/p99 latency per operation, then checks from a fresh session that
+every note written by every session landed in the one shared store.
+
+    python benchmarks/bench_mcp_http.py --sessions 32 --rounds 50
+    python benchmarks/bench_mcp_http.py --store sqlite --stateless
+    python benchmarks/bench_mcp_http.py --url http://127.0.0.1:8000/mcp
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT, "04_mcp", "server.py")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, store, stateless, tmpdir):
+    env = dict(os.environ)
+    env.pop("NOTES_DB", None)
+    if store == "sqlite":
+        env["NOTES_DB"] = os.path.join(tmpdir, "notes.sqlite")
+    cmd = [sys.executable, SERVER_SCRIPT, "--transport", "streamable-http", "--port", str(port)]
+    if stateless:
+        cmd.append("--stateless")
+    server = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("server did not start listening within 30s")
+
+
+def structured(result):
+    return result.structuredContent or json.loads(result.content[0].text)
+
+
+async def client(url, index, rounds, tag, connected, go, latencies, errors):
+    async with streamable_http_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            connected.append(index)
+            # Everyone starts together, so the timing covers the full concurrency
+            await go.wait()
+            for n in range(rounds):
+                start = time.perf_counter()
+                result = await session.call_tool("add_note", {"content": f"{tag} session {index} note {n}"})
+                latencies["add_note"].append(time.perf_counter() - start)
+                errors["add_note"] += bool(result.isError)
+
+                start = time.perf_counter()
+                await session.read_resource("note://list")
+                latencies["read note://list"].append(time.perf_counter() - start)
+
+
+async def count_notes(url, tag) -> int:
+    """Page through list_notes from a new session and count this run's notes."""
+    async with streamable_http_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            count, cursor = 0, 0
+            while cursor is not None:
+                page = structured(await session.call_tool("list_notes", {"cursor": cursor, "limit": 100}))
+                count += sum(note["content"].startswith(tag + " ") for note in page["notes"])
+                cursor = page["next_cursor"]
+            return count
+
+
+async def load(url, sessions, rounds):
+    tag = f"load-{os.getpid()}-{time.time_ns()}"
+    latencies = {"add_note": [], "read note://list": []}
+    errors = {"add_note": 0, "read note://list": 0}
+    connected, go = [], asyncio.Event()
+    tasks = [asyncio.create_task(client(url, i, rounds, tag, connected, go, latencies, errors)) for i in range(sessions)]
+    while len(connected) < sessions:
+        failed = [t for t in tasks if t.done() and t.exception()]
+        if failed:
+            raise failed[0].exception()
+        await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    go.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    for result in results:
+        if isinstance(result, BaseException):
+            # A broken session: its remaining operations count as errors
+            errors["add_note"] += 1
+    return latencies, errors, elapsed, await count_notes(url, tag)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float("nan")
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = None
+        url = args.url
+        if not url:
+            port = free_port()
+            server = start_server(port, args.store, args.stateless, tmpdir)
+            url = f"http://127.0.0.1:{port}/mcp"
+        try:
+            where = url if args.url else f"{args.store} store, {'stateless' if args.stateless else 'stateful'}"
+            print(f"{args.sessions} sessions x {args.rounds} rounds of add_note + read note://list ({where})\n")
+            latencies, errors, elapsed, stored = asyncio.run(load(url, args.sessions, args.rounds))
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=10)
+
+    print(f"{'operation':<18} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for op, values in latencies.items():
+        print(f"{op:<18} {len(values):>6} {errors[op]:>6} {percentile(values, 0.5) * 1e3:8.2f} "
+              f"{percentile(values, 0.95) * 1e3:8.2f} {percentile(values, 0.99) * 1e3:8.2f}")
+    ops = sum(len(values) for values in latencies.values())
+    print(f"\nthroughput: {ops / elapsed:,.0f} ops/s ({ops} operations in {elapsed:.2f}s)")
+    expected = args.sessions * args.rounds
+    print(f"{'✅' if stored == expected else '❌'} {stored}/{expected} notes visible from a fresh session")
+    if stored != expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16, help="Concurrent client sessions")
+    parser.add_argument("--rounds", type=int, default=50, help="add_note + read rounds per session")
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--stateless", action="store_true", help="Start the server with --stateless")
+    parser.add_argument("--url", help="Use a running server instead of starting one")
+    main(parser.parse_args())
@@ -0,0 +1,89 @@
+"""
+Per-call latency of MCP tool calls: spawn-per-call vs. a warm session pool.
+
+Run from the repository root:
+    python benchmarks/bench_mcp_pool.py --calls 20 --pool-size 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from mcp_pool import MCPSessionPool
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04_mcp", "server.py")
+
+
+async def spawn_and_call(server_params, name, arguments, errlog):
+    """The old bridge path: fresh server process and handshake for every call."""
+    async with stdio_client(server_params, errlog=errlog) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.list_tools()
+            return await session.call_tool(name, arguments=arguments)
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{label:<28} mean={statistics.mean(samples) * 1000:8.2f} ms  "
+        f"p50={statistics.median(samples) * 1000:8.2f} ms  p95={p95 * 1000:8.2f} ms"
+    )
+
+
+async def main(calls, pool_size, concurrency):
+    server_params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT], env=None)
+    devnull = open(os.devnull, "w")
+
+    spawn = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await spawn_and_call(server_params, "add_note", {"content": f"note {i}"}, devnull)
+        spawn.append(time.perf_counter() - start)
+
+    pool_start = time.perf_counter()
+    pool = MCPSessionPool(server_params, size=pool_size, health_check_interval=0, errlog=devnull)
+    async with pool:
+        warmup = time.perf_counter() - pool_start
+
+        pooled = []
+        for i in range(calls):
+            start = time.perf_counter()
+            await pool.call_tool("add_note", {"content": f"note {i}"})
+            pooled.append(time.perf_counter() - start)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        concurrent = []
+
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                await pool.call_tool("add_note", {"content": f"note {i}"})
+                concurrent.append(time.perf_counter() - start)
+
+        wall = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(calls * 5)))
+        wall = time.perf_counter() - wall
+
+    print(f"--- MCP call latency ({calls} calls, pool size {pool_size}) ---")
+    report("spawn per call", spawn)
+    report("warm pool (sequential)", pooled)
+    report(f"warm pool (concurrency {concurrency})", concurrent)
+    print(f"pool warm-up: {warmup * 1000:.2f} ms, concurrent throughput: {calls * 5 / wall:.1f} calls/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.pool_size, args.concurrency))
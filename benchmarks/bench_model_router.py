@@ -0,0 +1,227 @@
+"""
+Quota-aware model routing (model_router.py) against a stub that injects 429s and slow answers.
+
+A local stub of the Gemini REST API enforces a quota of `--quota` requests
+per `--window` seconds for every (model, API key) pair, answering 429
+RESOURCE_EXHAUSTED with a retryDelay beyond it, and answers a `--slow-rate`
+fraction of calls after `--slow-latency` seconds instead of `--latency`.
+Real genai.Clients and ChatGoogleGenerativeAI models (no SDK retries) make
+`--calls` async calls to gemini-2.5-flash, `--concurrency` at a time:
+
+Quota (no slow answers):
+- "one model, one key":    the shared transport, no router
+- "router, 429s only":     2 models x 2 keys, learning the quota from 429s
+- "router, rpm known":     the same with each route's window set to the quota
+
+Slow tail (no quota):
+- "router":                2 models x 2 keys
+- "router, hedged":        the same, hedging calls after --hedge-after seconds
+
+Reported per variant: calls that succeeded and failed, 429s the stub sent,
+p50/p99 latency, wall time, and how the calls were spread over the models.
+
+    python benchmarks/bench_model_router.py --calls 200 --quota 10
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google import genai
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from model_router import ModelRouter, SlidingWindow
+from transport import SharedTransport, genai_http_options, langchain_options
+
+# The SDKs warn about every failed call
+logging.getLogger("google_genai").setLevel(logging.ERROR)
+
+MODEL = "gemini-2.5-flash"
+POOL = ["gemini-2.5-flash", "gemini-flash-latest"]
+KEYS = ["key-a", "key-b"]
+
+
+class QuotaStub(ThreadingHTTPServer):
+    """generateContent with a per-(model, key) quota and a slow tail."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, latency, quota, window, slow_rate, slow_latency):
+        super().__init__(("127.0.0.1", 0), QuotaHandler)
+        self.latency = latency
+        self.quota = quota
+        self.window = window
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.windows = collections.defaultdict(lambda: SlidingWindow(self.quota, self.window))
+            self.answered = collections.Counter()
+            self.rejected = 0
+
+    def admit(self, model, key):
+        """None if the call fits the quota, else the retryDelay in seconds."""
+        if not self.quota:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows[(model, key)]
+            wait = window.wait(now)
+            if wait:
+                self.rejected += 1
+                return wait
+            window.times.append(now)
+        return None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Hedged calls that lost hang up before their answer is written
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        model = re.search(r"/models/([^/:]+):", self.path).group(1)
+        wait = self.server.admit(model, self.headers.get("x-goog-api-key"))
+        if wait is not None:
+            self.reply(429, {"error": {"code": 429, "message": "Quota exceeded (stub)", "status": "RESOURCE_EXHAUSTED",
+                                       "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                                                    "retryDelay": f"{wait:.3f}s"}]}})
+            return
+        slow = random.random() < self.server.slow_rate
+        time.sleep(self.server.slow_latency if slow else self.server.latency)
+        with self.server.lock:
+            self.server.answered[model] += 1
+        self.reply(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "OK"}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 4, "candidatesTokenCount": 1, "totalTokenCount": 5},
+            "modelVersion": model,
+        })
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+async def workload(url, transport, calls, concurrency):
+    """(latencies of the calls that succeeded, number that failed)."""
+    clients = [genai.Client(api_key=KEYS[0], http_options={**genai_http_options(transport), "base_url": url})
+               for _ in range(2)]
+    model = ChatGoogleGenerativeAI(model=MODEL, google_api_key=KEYS[0], base_url=url, max_retries=0,
+                                   **langchain_options(transport))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failed = [], 0
+
+    async def one(i):
+        nonlocal failed
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if i % 3 == 2:
+                    await model.ainvoke("hi")
+                else:
+                    await clients[i % 2].aio.models.generate_content(model=MODEL, contents="hi")
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                failed += 1
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies, failed
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else float("nan")
+
+
+def run(label, stub, transport, args):
+    stub.reset()
+    start = time.perf_counter()
+    latencies, failed = asyncio.run(workload(stub.url, transport, args.calls, args.concurrency))
+    elapsed = time.perf_counter() - start
+    spread = ", ".join(f"{model} {n}" for model, n in sorted(stub.answered.items()))
+    print(f"{label:<22} {len(latencies):>4} {failed:>6} {stub.rejected:>5} {percentile(latencies, 0.5) * 1e3:8.0f} "
+          f"{percentile(latencies, 0.99) * 1e3:8.0f} {elapsed:7.2f}  {spread}")
+    if isinstance(transport, ModelRouter) and args.verbose:
+        for row in transport.stats():
+            print(f"    {row['route']:<28} sent {row['sent']:>4}  ok {row['ok']:>4}  429 {row['rate_limited']:>3}  "
+                  f"failed {row['failed']:>3}  hedges {row['hedges']:>3}")
+    return failed
+
+
+def router(shared, args, **kwargs):
+    return ModelRouter(POOL, KEYS, window=args.window, hold=args.window, error_hold=args.window,
+                       max_wait=30.0, transport=shared, **kwargs)
+
+
+def header(title):
+    print(f"\n{title}")
+    print(f"{'variant':<22} {'ok':>4} {'failed':>6} {'429s':>5} {'p50 ms':>8} {'p99 ms':>8} {'seconds':>7}  answered by")
+
+
+def main(args):
+    shared = SharedTransport(max_connections=100, max_keepalive=100)
+    print(f"{args.calls} async calls to {MODEL}, {args.concurrency} at a time; routes: {len(POOL)} models x {len(KEYS)} keys")
+
+    stub = QuotaStub(args.latency, args.quota, args.window, 0.0, 0.0)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    header(f"Quota: {args.quota} calls per {args.window:g}s per (model, key), {args.latency * 1e3:.0f} ms per call")
+    baseline_failed = run("one model, one key", stub, shared, args)
+    failed = run("router, 429s only", stub, router(shared, args), args)
+    failed += run("router, rpm known", stub, router(shared, args, rpm=args.quota), args)
+    stub.shutdown()
+
+    stub = QuotaStub(args.latency, 0, args.window, args.slow_rate, args.slow_latency)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    header(f"Slow tail: {args.slow_rate:.0%} of calls take {args.slow_latency:g}s")
+    failed += run("router", stub, router(shared, args), args)
+    failed += run(f"router, hedged {args.hedge_after:g}s", stub, router(shared, args, hedge_after=args.hedge_after), args)
+    stub.shutdown()
+
+    print(f"\n{'✅' if failed == 0 else '❌'} {failed} calls failed through the router "
+          f"({baseline_failed} without it)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub seconds per call")
+    parser.add_argument("--quota", type=int, default=10, help="Calls per window per (model, key) before a 429")
+    parser.add_argument("--window", type=float, default=1.0, help="Quota window in seconds (a minute, scaled down)")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Fraction of slow answers in the slow-tail part")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Seconds a slow answer takes")
+    parser.add_argument("--hedge-after", type=float, default=0.1, help="Seconds before the router hedges a call")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print counters per route")
+    main(parser.parse_args())
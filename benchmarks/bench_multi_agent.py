@@ -0,0 +1,64 @@
+"""
+Batch throughput of the 07_multi_agent.py graph with a fake LLM.
+
+Builds the researcher -> writer graph around a fake chat model that answers
+after `--latency` seconds and runs `--queries` queries through `run_batch`
+for every combination of concurrency and researcher fan-out.
+
+    python benchmarks/bench_multi_agent.py --queries 200 --latency 0.05 --concurrency 1 16 64 --fan-out 1 3
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The prototype builds a real LLM client at import time; the fake never uses it
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+multi_agent = importlib.import_module("07_multi_agent")
+
+from fakes import FakeChatModel
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(queries, concurrency, fan_out, latency):
+    llm = FakeChatModel(latency=latency)
+    graph = multi_agent.build_graph(llm, fan_out=fan_out, verbose=False)
+    start = time.perf_counter()
+    results = await multi_agent.run_batch(graph, queries, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    latencies = [r["latency"] for r in results]
+    errors = sum("error" in r for r in results)
+    print(
+        f"{concurrency:>11} {fan_out:>7} {elapsed:9.2f}s {len(queries) / elapsed:10.1f} q/s "
+        f"{statistics.median(latencies) * 1e3:9.1f} {percentile(latencies, 95) * 1e3:9.1f} "
+        f"{llm.calls:>9} {errors:>6}"
+    )
+
+
+def main(args):
+    queries = [f"Query {i}: what is LangChain?" for i in range(args.queries)]
+    print(f"{args.queries} queries, fake LLM latency {args.latency * 1e3:.0f} ms\n")
+    print(f"{'concurrency':>11} {'fan-out':>7} {'total':>10} {'throughput':>14} {'p50 ms':>9} {'p95 ms':>9} {'LLM calls':>9} {'errors':>6}")
+    for fan_out in args.fan_out:
+        for concurrency in args.concurrency:
+            asyncio.run(run(queries, concurrency, fan_out, args.latency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--fan-out", type=int, nargs="+", default=[1, 3])
+    main(parser.parse_args())
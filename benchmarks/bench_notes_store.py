@@ -0,0 +1,104 @@
+"""
+Notes storage engine at scale: load, get, paginate, search and delete.
+
+Fills each backend with `--notes` synthetic notes (default one million) and
+times the operations the MCP tools use, plus an add made while another
+thread keeps searching for a common term (the server's add_note next to
+a slow search_notes).
+
+    python benchmarks/bench_notes_store.py --notes 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04_mcp"))
+
+from notes_store import MemoryNotesStore, SQLiteNotesStore
+
+WORDS = (
+    "milk dog walk meeting budget review deploy agent graph prompt model token cache "
+    "server client notes python gemini langchain research writer poem electricity"
+).split()
+
+
+def synthetic_notes(n, seed=42):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield f"Note {i}: " + " ".join(rng.choices(WORDS, k=8))
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def add_during_search(store, repeat):
+    """Mean seconds an add takes while another thread runs common-term searches."""
+    stop = threading.Event()
+
+    def search():
+        while not stop.is_set():
+            store.search("gemini", 10)
+
+    searcher = threading.Thread(target=search)
+    searcher.start()
+    try:
+        total = 0.0
+        for _ in range(repeat):
+            time.sleep(0.001)
+            start = time.perf_counter()
+            store.add("one more note")
+            total += time.perf_counter() - start
+        return total / repeat
+    finally:
+        stop.set()
+        searcher.join()
+
+
+def bench(label, store, n, repeat):
+    start = time.perf_counter()
+    store.add_many(synthetic_notes(n))
+    load = time.perf_counter() - start
+
+    rng = random.Random(7)
+    ids = [rng.randint(1, n) for _ in range(repeat)]
+    it = iter(ids * 3)
+
+    results = {
+        "load": load,
+        "get": timed(lambda: store.get(next(it)), repeat),
+        "page": timed(lambda: store.page(after=next(it), limit=20), repeat),
+        "latest": timed(lambda: store.latest(100), repeat),
+        "search (common)": timed(lambda: store.search("gemini", 10), max(1, repeat // 20)),
+        "search (rare)": timed(lambda: store.search("12345", 10), repeat),
+        "add": timed(lambda: store.add("one more note"), repeat),
+        "add (searching)": add_during_search(store, max(1, repeat // 10)),
+        "delete": timed(lambda: store.delete(next(it)), repeat),
+    }
+    print(f"\n--- {label} ({n:,} notes) ---")
+    print(f"{'load':<16} {results.pop('load'):10.2f} s")
+    for op, seconds in results.items():
+        print(f"{op:<16} {seconds * 1e6:10.1f} us")
+
+
+def main(n, repeat):
+    bench("memory", MemoryNotesStore(), n, repeat)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SQLiteNotesStore(os.path.join(tmpdir, "notes.sqlite"))
+        bench("sqlite (WAL)", store, n, repeat)
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.notes, args.repeat)
@@ -0,0 +1,102 @@
+"""
+Rolling note summaries (04_mcp/notes_summary.py): summarizer calls and prompt size.
+
+Fills a store with `--notes` notes and renders the summarize_notes prompt
+with a stub summarizer that counts its calls (and sleeps `--latency`
+seconds, like a model would). Then it adds, deletes and re-renders, and
+checks after every step:
+
+- only chunks that changed and fit in the budget are re-summarized;
+- chunks older than the budget reaches are never summarized;
+- the rendered prompt stays within the token budget.
+
+Exits with status 1 if a check fails.
+
+    python benchmarks/bench_notes_summary.py --notes 200000 --store sqlite
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04_mcp"))
+
+from notes_store import MemoryNotesStore, SQLiteNotesStore
+from notes_summary import RollingSummarizer, estimate_tokens, extractive_summary
+
+
+class StubSummarizer:
+    """extractive_summary plus a call counter and a simulated model latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.chunks = []
+
+    def __call__(self, notes) -> str:
+        self.calls += 1
+        self.chunks.append(notes[0].id if notes else None)
+        if self.latency:
+            time.sleep(self.latency)
+        return extractive_summary(notes)
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SQLiteNotesStore(os.path.join(tmpdir, "notes.sqlite")) if args.store == "sqlite" else MemoryNotesStore()
+        store.add_many(f"Note {i}: remember to review the budget for project {i % 97}" for i in range(args.notes))
+        stub = StubSummarizer(args.latency)
+        summarizer = RollingSummarizer(summarize=stub, chunk_size=args.chunk_size, token_budget=args.token_budget)
+        total_chunks = len(store.chunk_stats(args.chunk_size))
+        newest = store.latest(1)[0].id
+        oldest = store.page(0, 1)[0].id
+
+        steps = [
+            ("first render", None, None),
+            ("render again, unchanged", None, 0),
+            ("add a note", lambda: store.add("A brand new note"), 1),
+            ("delete an old note (outside the budget)", lambda: store.delete(oldest), 0),
+            ("delete a recent note", lambda: store.delete(newest), 1),
+        ]
+        print(f"{args.notes} notes ({args.store}), {total_chunks} chunks of {args.chunk_size}, "
+              f"budget {args.token_budget} tokens\n")
+        print(f"{'step':<42} {'calls':>6} {'expected':>9} {'tokens':>7} {'ms':>8}")
+        failures = 0
+        for label, change, expected in steps:
+            if change:
+                change()
+            before = stub.calls
+            start = time.perf_counter()
+            prompt = summarizer.render(store)
+            elapsed = time.perf_counter() - start
+            calls = stub.calls - before
+            tokens = estimate_tokens(prompt)
+            body = [line for line in prompt.split("\n") if not line.startswith("(")]
+            if expected is None:
+                # First render: the chunks in the prompt, plus the one that didn't fit
+                expected = min(total_chunks, summarizer.included + 1)
+            # The omitted-groups line is a few tokens on top of the budget
+            ok = calls <= expected and estimate_tokens("\n".join(body)) <= args.token_budget
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {label:<40} {calls:>6} {'<= ' + str(expected):>9} {tokens:>7} {elapsed * 1e3:8.1f}")
+
+        oldest_chunk = (oldest - 1) // args.chunk_size
+        never = sum(1 for first in stub.chunks if first is not None and (first - 1) // args.chunk_size <= oldest_chunk)
+        ok = never == 0
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} oldest chunk summarized {never} times; "
+              f"{stub.calls} summarizer calls in total for {total_chunks} chunks")
+        store.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=200_000)
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--token-budget", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per stub summarizer call")
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Response cache: latency and hit rate on a repetitive prompt workload.
+
+Replays a workload with repeated prompts against a fake Gemini model and a
+fake LangChain chat model, once without a cache and once per backend.
+
+    python benchmarks/bench_response_cache.py --calls 200 --distinct 20 --latency 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.genai import types
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from fakes import FakeClient
+from response_cache import CachedModels, MemoryBackend, ResponseCache, SQLiteBackend, langchain_cache
+
+CONFIG = types.GenerateContentConfig(system_instruction="You are a helpful AI assistant explaining concepts simply.")
+
+
+def make_backends(tmpdir):
+    return {
+        "no cache": None,
+        "memory": ResponseCache(MemoryBackend()),
+        "sqlite": ResponseCache(SQLiteBackend(os.path.join(tmpdir, "responses.sqlite"))),
+    }
+
+
+def report(label, elapsed, calls, model_calls, cache):
+    stats = cache.stats() if cache else {"hit_rate": 0.0}
+    print(
+        f"{label:<22} total={elapsed:7.2f} s  per call={elapsed / calls * 1000:8.2f} ms  "
+        f"model calls={model_calls:4d}  hit rate={stats['hit_rate']:.0%}"
+    )
+
+
+def main(calls, distinct, latency):
+    prompts = [f"Explain concept number {random.randrange(distinct)}" for _ in range(calls)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"--- genai generate_content ({calls} calls, {distinct} distinct prompts) ---")
+        for label, cache in make_backends(tmpdir).items():
+            client = FakeClient(latency=latency)
+            models = CachedModels(client.models, cache)
+            start = time.perf_counter()
+            for prompt in prompts:
+                models.generate_content(model="fake", contents=prompt, config=CONFIG)
+            report(label, time.perf_counter() - start, calls, client.models.calls, cache)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"\n--- LangChain llm.invoke ({calls} calls, {distinct} distinct prompts) ---")
+        for label, cache in make_backends(tmpdir).items():
+            llm = FakeListChatModel(responses=["OK"], sleep=latency, cache=langchain_cache(cache) or False)
+            start = time.perf_counter()
+            for prompt in prompts:
+                llm.invoke(prompt)
+            model_calls = calls - (cache.hits if cache else 0)
+            report(label, time.perf_counter() - start, calls, model_calls, cache)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency in seconds")
+    args = parser.parse_args()
+    main(args.calls, args.distinct, args.latency)
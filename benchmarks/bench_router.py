@@ -0,0 +1,106 @@
+"""
+Supervisor routing: accuracy, wasted turns and overhead on recorded transcripts.
+
+Replays `benchmarks/data/routing_transcripts.jsonl` (conversation states
+labeled with the correct next node and the RouteDecision the model returned
+for them) through three strategies:
+
+- substring: the original `in` checks for the magic markers,
+- rules:     routing.rule_route, ending the run when it can't decide,
+- hybrid:    rules first, then the recorded structured-output decision
+             (replayed, no API calls), with decisions cached per state.
+
+A misrouted decision is a wasted turn: either an extra LLM round trip or a
+run that ends without an answer and has to be repeated.
+
+    python benchmarks/bench_router.py --repeat 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from routing import RouteDecision, Router, fingerprint
+
+DEFAULT_TRANSCRIPTS = os.path.join(ROOT, "benchmarks", "data", "routing_transcripts.jsonl")
+
+
+def substring_route(state) -> str:
+    """The router 08_dynamic_multi_agent.py used before routing.py."""
+    last_message = state["messages"][-1]
+    content = last_message.content.upper()
+    if "RESEARCH_COMPLETE" in content:
+        return "writer"
+    if "NEED_MORE_RESEARCH" in content:
+        return "researcher"
+    if isinstance(last_message, HumanMessage):
+        return "researcher"
+    return "__end__"
+
+
+def load_transcripts(path):
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            messages = [
+                HumanMessage(content=m["content"]) if m["type"] == "human"
+                else AIMessage(content=m["content"], name=m.get("name"))
+                for m in record["messages"]
+            ]
+            cases.append({**record, "state": {"messages": messages}})
+    return cases
+
+
+def evaluate(label, route, cases, repeat, extra=""):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            route(case["state"])
+    per_decision = (time.perf_counter() - start) / (repeat * len(cases))
+    wrong = [case["name"] for case in cases if route(case["state"]) != case["expected"]]
+    rate = len(wrong) / len(cases)
+    print(f"{label:<10} {len(cases) - len(wrong):>4}/{len(cases):<4} {rate:>10.0%} {per_decision * 1e6:>10.2f} {extra}")
+    return wrong
+
+
+def main(path, repeat):
+    cases = load_transcripts(path)
+    recorded = {fingerprint(case["state"]): case["model_route"] for case in cases}
+    model_calls = 0
+
+    def replay_model(state):
+        nonlocal model_calls
+        model_calls += 1
+        return RouteDecision(next=recorded[fingerprint(state)])
+
+    rules_only = Router()
+    hybrid = Router(fallback=replay_model)
+
+    print(f"{len(cases)} recorded states from {os.path.relpath(path, ROOT)}, {repeat} passes\n")
+    print(f"{'strategy':<10} {'correct':>9} {'wasted':>10} {'us/route':>10}")
+    misses = {
+        "substring": evaluate("substring", substring_route, cases, repeat),
+        "rules": evaluate("rules", lambda s: rules_only.route(s).next, cases, repeat),
+        "hybrid": evaluate("hybrid", lambda s: hybrid.route(s).next, cases, repeat),
+    }
+    print(f"\nhybrid: {model_calls} model calls for {hybrid.stats()['decisions']:,} decisions {hybrid.stats()}")
+    for strategy, names in misses.items():
+        if names:
+            print(f"{strategy} misroutes: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", default=DEFAULT_TRANSCRIPTS)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.transcripts, args.repeat)
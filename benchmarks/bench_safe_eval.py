@@ -0,0 +1,101 @@
+"""
+safe_eval vs. eval: throughput of the calculate tool's evaluator.
+
+Runs a mix of typical tool-call expressions through plain `eval`, through
+`safe_eval` with an empty cache (parse + validate every time), through
+`safe_eval` with warm compiled expressions and through `safe_eval_many`.
+Then checks that expressions built to hang the process are rejected
+within the time limit; exits with status 1 if one is not.
+
+    python benchmarks/bench_safe_eval.py --n 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safe_eval import TIME_LIMIT, SafeEvalError, compile_expression, safe_eval, safe_eval_many
+
+# Each would run for seconds to forever under plain eval
+HOSTILE = [
+    "9 ** 9 ** 9",
+    "2 << 10 ** 9",
+    "round(1, -10 ** 7)",
+    "round(1.5, 10 ** 8)",
+    "max(10 ** 1000, 3) ** 1000",
+    "(2 ** 1000) ** 1000",
+]
+
+
+def make_expressions(n, distinct, seed=42):
+    rng = random.Random(seed)
+    templates = [
+        "{a} + {b}",
+        "({a} + {b}) * {c}",
+        "{a} / {b} - {c}",
+        "{a} ** 2 + {b} ** 2",
+        "sqrt({a}) * pi",
+        "max({a}, {b}, {c}) % 7",
+    ]
+    pool = [
+        rng.choice(templates).format(a=rng.randint(1, 999), b=rng.randint(1, 999), c=rng.randint(1, 99))
+        for _ in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def run(label, fn, expressions, baseline=None):
+    start = time.perf_counter()
+    fn(expressions)
+    elapsed = time.perf_counter() - start
+    rate = len(expressions) / elapsed
+    ratio = f"{rate / baseline:6.2f}x eval" if baseline else ""
+    print(f"{label:<26} {elapsed * 1e3:9.1f} ms {rate:12,.0f} expr/s  {ratio}")
+    return rate
+
+
+def main(n, distinct):
+    expressions = make_expressions(n, distinct)
+    namespace = {"__builtins__": {}, "sqrt": __import__("math").sqrt, "pi": __import__("math").pi, "max": max}
+    print(f"{n:,} expressions, {distinct:,} distinct\n")
+
+    base = run("eval", lambda exprs: [eval(e, namespace) for e in exprs], expressions)
+
+    def cold(exprs):
+        for e in exprs:
+            compile_expression.cache_clear()
+            safe_eval(e)
+
+    run("safe_eval (no cache)", cold, expressions, base)
+    compile_expression.cache_clear()
+    run("safe_eval (warming cache)", lambda exprs: [safe_eval(e) for e in exprs], expressions, base)
+    run("safe_eval (warm)", lambda exprs: [safe_eval(e) for e in exprs], expressions, base)
+    run("safe_eval_many (warm)", safe_eval_many, expressions, base)
+    print(f"\n{compile_expression.cache_info()}")
+
+    print(f"\nHostile expressions (limit {TIME_LIMIT * 1e3:.0f} ms)")
+    failures = 0
+    for expression in HOSTILE:
+        start = time.perf_counter()
+        try:
+            outcome = f"returned {str(safe_eval(expression))[:20]}"
+            rejected = False
+        except SafeEvalError as e:
+            outcome, rejected = f"rejected: {e}", True
+        elapsed = time.perf_counter() - start
+        ok = rejected and elapsed <= TIME_LIMIT
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {expression:<28} {elapsed * 1e3:8.2f} ms  {outcome}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=500)
+    args = parser.parse_args()
+    main(args.n, args.distinct)
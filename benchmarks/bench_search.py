@@ -0,0 +1,83 @@
+"""
+Ranked note search: index build time and query latency vs. a naive scan.
+
+Compares the in-memory inverted index and SQLite FTS5 (both BM25-ranked)
+with what an agent had to do before: scan every note for the query words.
+
+    python benchmarks/bench_search.py --notes 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04_mcp"))
+
+from notes_index import InvertedIndex, tokenize
+from notes_store import SQLiteNotesStore
+
+WORDS = (
+    "milk dog walk meeting budget review deploy agent graph prompt model token cache "
+    "server client notes python gemini langchain research writer poem electricity"
+).split()
+QUERIES = ["gemini", "budget review", "electricity poem writer", "12345", "nonexistent"]
+
+
+def synthetic_notes(n, seed=42):
+    rng = random.Random(seed)
+    return [f"Note {i}: " + " ".join(rng.choices(WORDS, k=8)) for i in range(n)]
+
+
+def naive_search(notes, query, limit):
+    """Scan every note and rank by how many query words it contains."""
+    terms = set(tokenize(query))
+    scored = []
+    for note_id, content in enumerate(notes, start=1):
+        hits = sum(1 for t in tokenize(content) if t in terms)
+        if hits:
+            scored.append((hits, note_id))
+    scored.sort(reverse=True)
+    return scored[:limit]
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(n, limit):
+    notes = synthetic_notes(n)
+    print(f"--- {n:,} notes ---")
+
+    start = time.perf_counter()
+    index = InvertedIndex()
+    for note_id, content in enumerate(notes, start=1):
+        index.add(note_id, content)
+    print(f"inverted index build: {time.perf_counter() - start:8.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SQLiteNotesStore(os.path.join(tmpdir, "notes.sqlite"))
+        start = time.perf_counter()
+        # Triggers keep FTS5 in sync, so this includes the index build
+        store.add_many(notes)
+        print(f"sqlite + fts5 load:   {time.perf_counter() - start:8.2f} s")
+
+        print(f"\n{'query':<26} {'naive scan':>12} {'inverted idx':>14} {'fts5':>12}")
+        for query in QUERIES:
+            naive = timed(lambda: naive_search(notes, query, limit), repeat=1)
+            memory = timed(lambda: index.search(query, limit))
+            fts = timed(lambda: store.search(query, limit))
+            print(f"{query!r:<26} {naive * 1000:9.1f} ms {memory * 1000:11.2f} ms {fts * 1000:9.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    main(args.notes, args.limit)
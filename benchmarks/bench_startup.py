@@ -0,0 +1,125 @@
+"""
+Cold-start time of every entry point, from `python -X importtime`.
+
+Each module is imported in a fresh interpreter (`--runs` times, best run
+kept) with `-X importtime`. Reported per entry point: wall time of the
+process minus a bare interpreter, the total import time, the heaviest
+top-level imports, and which of the heavy SDKs (google-genai, LangChain's
+Gemini wrapper, LangGraph, MCP) were loaded just by importing it. Clients,
+models and graphs are built on first use (factory.py), so none of that
+work should show up here.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --save startup.json
+    python benchmarks/bench_startup.py --compare startup.json   # exit 1 on regressions
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    "01_basic_interaction",
+    "02_tool_calling",
+    "03_react_agent",
+    "05_mcp_gemini_bridge",
+    "06_langchain_agent",
+    "07_multi_agent",
+    "08_dynamic_multi_agent",
+    "api_server",
+]
+HEAVY = {
+    "google.genai": "genai",
+    "langchain_google_genai": "lc-genai",
+    "langgraph.graph": "langgraph",
+    "mcp": "mcp",
+}
+
+
+def run(code):
+    """(wall seconds, stderr) of one fresh interpreter running `code` with -X importtime."""
+    env = {**os.environ, "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "startup-benchmark"), "TRACING": "off"}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr):
+    """{module: cumulative us} for the top-level imports, plus the set of every module imported."""
+    top, seen = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        seen.add(name.strip())
+        # Nested imports are indented by two spaces per level
+        if not name[1:].startswith(" "):
+            top[name.strip()] = int(cumulative)
+    return top, seen
+
+
+def measure(module, runs, baseline):
+    best = None
+    for _ in range(runs):
+        elapsed, stderr = run(f"import importlib; importlib.import_module({module!r})")
+        if best is None or elapsed < best[0]:
+            best = (elapsed, stderr)
+    elapsed, stderr = best
+    top, seen = parse_importtime(stderr)
+    heaviest = sorted(((us, name) for name, us in top.items() if name != module), reverse=True)[:3]
+    return {
+        "wall_ms": (elapsed - baseline) * 1e3,
+        "import_ms": sum(top.values()) / 1e3,
+        "heavy": [label for name, label in HEAVY.items() if name in seen],
+        "top": [f"{name} {us / 1e3:.0f}ms" for us, name in heaviest],
+    }
+
+
+def main(args):
+    baseline = min(run("pass")[0] for _ in range(args.runs))
+    selected = [m for m in ENTRY_POINTS if not args.only or args.only in m]
+    print(f"Best of {args.runs} cold starts; bare interpreter {baseline * 1e3:.0f} ms (subtracted)\n")
+    print(f"{'entry point':<24} {'wall ms':>8} {'import ms':>10}  {'heavy SDKs loaded':<30} heaviest imports")
+    results = {}
+    for module in selected:
+        r = results[module] = measure(module, args.runs, baseline)
+        print(f"{module:<24} {r['wall_ms']:8.0f} {r['import_ms']:10.0f}  {', '.join(r['heavy']) or '-':<30} {', '.join(r['top'])}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before_all = json.load(f)["results"]
+        print(f"\nImport time vs. {args.compare} (tolerance {args.tolerance:.0%}):")
+        regressions = 0
+        for module, r in results.items():
+            if module not in before_all:
+                continue
+            before, after = before_all[module]["import_ms"], r["import_ms"]
+            change = (after - before) / before if before else 0.0
+            slower = change > args.tolerance
+            regressions += slower
+            print(f"{'❌' if slower else '✅'} {module:<24} {before:8.0f}ms -> {after:8.0f}ms ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per entry point (best one is kept)")
+    parser.add_argument("--only", help="Measure entry points whose name contains this string")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare import time with a saved run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed import time increase before --compare fails")
+    main(parser.parse_args())
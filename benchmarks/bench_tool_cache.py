@@ -0,0 +1,75 @@
+"""
+Tool result memoization: hit rate, time saved and lookup overhead.
+
+Simulates agent runs that call a slow tool (`--latency` seconds) with
+arguments drawn from a skewed distribution (a few popular cities, many rare
+ones, random casing and spacing), with and without `@memoize`, and times a
+cache hit on its own.
+
+    python benchmarks/bench_tool_cache.py --calls 2000 --latency 0.002
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool_cache import ToolCache, memoize
+
+CITIES = ["London", "Paris", "Tokyo", "New York", "Berlin", "Madrid", "Rome", "Sydney"] + [f"Town {i}" for i in range(200)]
+
+
+def make_tool(latency):
+    def get_weather(location: str, unit: str = "celsius"):
+        """Get the weather for a location."""
+        time.sleep(latency)
+        return f"{location}: 20 {unit}"
+    return get_weather
+
+
+def make_calls(n, seed=42):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(CITIES))]
+    calls = []
+    for city in rng.choices(CITIES, weights=weights, k=n):
+        variant = rng.choice([city, city.lower(), city.upper(), f" {city} "])
+        calls.append(((variant,), {}) if rng.random() < 0.5 else ((), {"location": variant, "unit": "celsius"}))
+    return calls
+
+
+def run(tool, calls):
+    start = time.perf_counter()
+    for args, kwargs in calls:
+        tool(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(n, latency):
+    calls = make_calls(n)
+    plain = run(make_tool(latency), calls)
+
+    cache = ToolCache()
+    cached_tool = memoize(make_tool(latency), ttl=600, casefold=True, cache=cache)
+    cached = run(cached_tool, calls)
+    stats = cache.stats()["get_weather"]
+
+    repeat = 100_000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cached_tool(location="Paris")
+    hit_us = (time.perf_counter() - start) / repeat * 1e6
+
+    print(f"{n} calls, tool latency {latency * 1e3:.1f} ms\n")
+    print(f"{'uncached':<10} {plain:8.2f}s")
+    print(f"{'memoized':<10} {cached:8.2f}s  ({plain / cached:.1f}x faster, hit rate {stats['hit_rate']:.0%}, {len(cache)} entries)")
+    print(f"\ncache hit: {hit_us:.2f} us per call (key normalization + LRU lookup)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+    main(args.calls, args.latency)
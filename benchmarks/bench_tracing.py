@@ -0,0 +1,123 @@
+"""
+Cost of tracing, off and on.
+
+Times an instant fake Gemini call and a fake LangChain chat model call
+(a) untraced, (b) through the tracing wrappers with tracing off, and
+(c) with tracing on, then exports the same calls' spans as JSONL and
+OTLP/JSON and prints the per-run summary. It also checks that a tracer
+keeps no more than TRACE_FLUSH_SPANS spans in memory, and that every model
+span in the summary has the fakes' token usage.
+
+    python benchmarks/bench_tracing.py --calls 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes import FakeChatModel, FakeModels
+from tracing import Tracer, traced, traced_models
+
+
+def per_call_us(fn, calls, trials=3):
+    """Best of `trials` timings."""
+    best = float("inf")
+    for _ in range(trials):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def tool(x: int):
+    return x + 1
+
+
+def block(tracer):
+    with tracer.span("block"):
+        pass
+
+
+def main(calls):
+    off, on = Tracer("off"), Tracer("summary", run_name="bench_tracing")
+    blocks = Tracer("summary")
+    models = FakeModels(responses=["OK"])
+    chat = FakeChatModel(responses=["OK"])
+    chat_calls = max(1, calls // 20)
+
+    cases = {
+        "gemini generate_content": {
+            "untraced": lambda: models.generate_content(model="fake", contents="hi"),
+            "tracing off": lambda m=traced_models(models, off): m.generate_content(model="fake", contents="hi"),
+            "tracing on": lambda m=traced_models(models, on): m.generate_content(model="fake", contents="hi"),
+        },
+        "tool function": {
+            "untraced": lambda: tool(1),
+            "tracing off": lambda f=traced(tool, tracer_=off): f(1),
+            "tracing on": lambda f=traced(tool, tracer_=on): f(1),
+        },
+        "span() block": {
+            "tracing off": lambda: block(off),
+            "tracing on": lambda: block(blocks),
+        },
+    }
+    chat_cases = {
+        "untraced": lambda: chat.invoke("hi"),
+        "tracing off": lambda: chat.invoke("hi", config={"callbacks": off.langchain_callbacks()}),
+        "tracing on": lambda: chat.invoke("hi", config={"callbacks": on.langchain_callbacks()}),
+    }
+
+    print(f"{'call':<26} {'variant':<12} {'us/call':>9} {'overhead':>9}")
+    for label, variants in [*cases.items(), ("langchain chat invoke", chat_cases)]:
+        n = chat_calls if variants is chat_cases else calls
+        base = None
+        for variant, fn in variants.items():
+            fn()  # warm up
+            us = per_call_us(fn, n)
+            base = us if base is None else base
+            print(f"{label:<26} {variant:<12} {us:9.2f} {us - base:+9.2f}")
+
+    recorded = sum(row["count"] for row in on.summary().values())
+    print(f"\n{recorded} spans recorded with tracing on, {len(on.spans)} kept in memory")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for mode in ("jsonl", "otlp"):
+            # Hold every span until the timed flush
+            exporter = Tracer(mode, path=os.path.join(tmpdir, f"traces.{mode}"), flush_every=calls + 1)
+            m = traced_models(models, exporter)
+            for _ in range(calls):
+                m.generate_content(model="fake", contents="hi")
+            start = time.perf_counter()
+            exporter.flush()
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(exporter.path)
+            print(f"{mode:<6} export: {elapsed * 1e3:7.1f} ms, {size / 1024:8.0f} KiB")
+
+        bounded = Tracer("jsonl", path=os.path.join(tmpdir, "bounded.jsonl"), flush_every=1000)
+        peak = 0
+        for _ in range(calls):
+            block(bounded)
+            peak = max(peak, len(bounded.spans))
+        bounded.flush()
+        with open(bounded.path) as f:
+            written = sum(1 for _ in f)
+        ok = peak < 1000 and written == calls
+        print(f"{'✅' if ok else '❌'} {calls} spans: at most {peak} in memory, {written} written")
+
+    print("\n" + on.report())
+    missing = [name for name, row in on.summary().items()
+               if row["kind"] == "llm" and not (row["prompt_tokens"] and row["output_tokens"])]
+    print(f"{'❌' if missing else '✅'} token usage recorded for every model span"
+          + (f" (missing: {', '.join(missing)})" if missing else ""))
+    if not ok or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.calls)
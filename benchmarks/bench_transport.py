@@ -0,0 +1,187 @@
+"""
+Connection reuse with and without the shared transport (transport.py).
+
+Runs a local stub of the Gemini REST API that counts TCP connections, and
+drives it the way the prototypes do in one process: several genai.Clients
+and ChatGoogleGenerativeAI models (01/02/03/05 and 07/08), each making
+sequential calls and then a burst of `--concurrency` async calls.
+
+- "own clients":   every client/model with its default HTTP setup
+- "shared":        every client/model through one SharedTransport
+- "shared, max N": the same with the pool capped at --max-connections
+
+Reported: model calls, connections the stub accepted, the most it had
+open at once, and wall time. Finally a call to a stub model that never
+answers checks that the per-call timeout fires for both SDKs.
+
+    python benchmarks/bench_transport.py --calls 20 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google import genai
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from transport import SharedTransport, genai_http_options, http2_enabled, langchain_options
+
+# The SDKs warn about every retried or timed-out call
+logging.getLogger("google_genai").setLevel(logging.ERROR)
+
+REPLY = json.dumps({
+    "candidates": [{"content": {"role": "model", "parts": [{"text": "OK"}]}, "finishReason": "STOP"}],
+    "usageMetadata": {"promptTokenCount": 4, "candidatesTokenCount": 1, "totalTokenCount": 5},
+}).encode()
+
+
+class StubServer(ThreadingHTTPServer):
+    """Answers every generateContent with "OK" after `latency`; the "hang" model never answers in time."""
+
+    daemon_threads = True
+    # The default backlog of 5 drops connects during a burst
+    request_queue_size = 256
+
+    def __init__(self, latency: float):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.round = 0
+        self.reset()
+
+    def reset(self):
+        """Start counting a new round; connections left over from the last one no longer count."""
+        with self.lock:
+            self.round += 1
+            self.connections = self.open = self.peak_open = self.requests = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and body go out in two writes; with Nagle on, every call waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    # One handler instance lives as long as its connection
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.round = self.server.round
+            self.server.connections += 1
+            self.server.open += 1
+            self.server.peak_open = max(self.server.peak_open, self.server.open)
+
+    def finish(self):
+        with self.server.lock:
+            if self.round == self.server.round:
+                self.server.open -= 1
+        super().finish()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(5 if "/models/hang:" in self.path else self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(REPLY)))
+        self.end_headers()
+        self.wfile.write(REPLY)
+
+    def log_message(self, *args):
+        pass
+
+
+def build(url, transport):
+    """Four genai clients and two LangChain models, like one process running the prototypes."""
+    if transport is None:
+        clients = [genai.Client(api_key="stub", http_options={"base_url": url}) for _ in range(4)]
+        models = [ChatGoogleGenerativeAI(model="stub", google_api_key="stub", base_url=url, max_retries=0) for _ in range(2)]
+    else:
+        clients = [genai.Client(api_key="stub", http_options={**genai_http_options(transport), "base_url": url})
+                   for _ in range(4)]
+        models = [ChatGoogleGenerativeAI(model="stub", google_api_key="stub", base_url=url, max_retries=0,
+                                         **langchain_options(transport)) for _ in range(2)]
+    return clients, models
+
+
+def workload(clients, models, calls, concurrency):
+    for _ in range(calls):
+        for client in clients:
+            client.models.generate_content(model="stub", contents="hi")
+        for model in models:
+            model.invoke("hi")
+
+    async def burst():
+        jobs = []
+        for i in range(concurrency):
+            if i % 3 == 2:
+                jobs.append(models[i % len(models)].ainvoke("hi"))
+            else:
+                jobs.append(clients[i % len(clients)].aio.models.generate_content(model="stub", contents="hi"))
+        await asyncio.gather(*jobs)
+
+    asyncio.run(burst())
+
+
+def check_timeouts(url, transport):
+    """A call to the "hang" model must fail after about the configured timeout."""
+    client = genai.Client(api_key="stub", http_options={**genai_http_options(transport, timeout=0.5), "base_url": url})
+    model = ChatGoogleGenerativeAI(model="hang", google_api_key="stub", base_url=url, max_retries=0,
+                                   **langchain_options(transport, timeout=0.5))
+    for label, call in [("genai", lambda: client.models.generate_content(model="hang", contents="hi")),
+                        ("langchain", lambda: model.invoke("hi"))]:
+        start = time.perf_counter()
+        try:
+            call()
+            outcome = "answered (no timeout!)"
+        except Exception as e:
+            outcome = type(e).__name__
+        print(f"  {label:<10} 0.5s timeout -> {outcome} after {time.perf_counter() - start:.2f}s")
+
+
+def main(args):
+    server = StubServer(args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    variants = {
+        "own clients": None,
+        "shared": SharedTransport(max_connections=100, max_keepalive=100, http2=http2_enabled()),
+        f"shared, max {args.max_connections}": SharedTransport(max_connections=args.max_connections,
+                                                               max_keepalive=args.max_connections, http2=http2_enabled()),
+    }
+    expected = 6 * args.calls + args.concurrency
+    print(f"6 clients x {args.calls} sequential calls + {args.concurrency} concurrent async calls "
+          f"({expected} calls), {args.latency * 1e3:.0f} ms stub latency, HTTP/2 {'on' if http2_enabled() else 'off (h2 not installed)'}\n")
+    print(f"{'variant':<18} {'calls':>6} {'connections':>12} {'peak open':>10} {'seconds':>8}")
+    for label, transport in variants.items():
+        server.reset()
+        clients, models = build(server.url, transport)
+        start = time.perf_counter()
+        workload(clients, models, args.calls, args.concurrency)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<18} {server.requests:>6} {server.connections:>12} {server.peak_open:>10} {elapsed:8.2f}")
+        for client in clients:
+            client.close()
+
+    print("\nPer-call timeout:")
+    check_timeouts(server.url, SharedTransport())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="Sequential calls per client")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent async calls in the burst")
+    parser.add_argument("--max-connections", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub seconds per call")
+    main(parser.parse_args())
@@ -0,0 +1,164 @@
+"""
+Long-lived Gemini chat sessions keyed by conversation ID.
+
+Creating a chat per question throws away the history and rebuilds the
+config every time. `ChatSessions` keeps one chat per conversation instead:
+
+- at most `max_sessions` chats stay live; the least recently used one is
+  evicted when a new conversation starts,
+- once a chat's history grows past `token_budget`, older turns are folded
+  into a summary (when a `summarize` callable is given) or dropped, and the
+  chat is recreated from the shorter history.
+
+The lock only guards the table of chats: creating a chat and summarizing
+(a model call) happen outside it, so one conversation being compacted
+doesn't hold up the others.
+"""
+import threading
+from collections import OrderedDict
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+def estimate_tokens(contents) -> int:
+    """Rough token count for a list of Contents (~4 characters per token)."""
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(str(part.function_call.args)) + len(part.function_call.name or "")
+            elif part.function_response:
+                chars += len(str(part.function_response.response))
+    return chars // 4 + 1
+
+
+def turn_starts(history) -> list[int]:
+    """Indexes where a new user turn begins (user text, not a function response)."""
+    return [
+        i for i, content in enumerate(history)
+        if content.role == "user" and any(part.text for part in content.parts or [])
+    ]
+
+
+def gemini_summarizer(client, model: str):
+    """A `summarize` callable that asks Gemini to condense the dropped turns."""
+    def summarize(contents) -> str:
+        transcript = "\n".join(
+            f"{content.role}: {part.text}"
+            for content in contents
+            for part in content.parts or []
+            if part.text
+        )
+        response = client.models.generate_content(
+            model=model,
+            contents="Summarize this conversation in a few sentences, keeping facts and numbers:\n\n" + transcript,
+        )
+        return response.text or ""
+    return summarize
+
+
+class ChatSessions:
+    """LRU of live chats with a per-chat history budget."""
+
+    def __init__(self, client, model: str, config=None, max_sessions: int = 100,
+                 token_budget: int = 8000, keep_turns: int = 4, summarize=None):
+        self.client = client
+        self.model = model
+        self.config = config
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summarize = summarize
+        self._chats = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.compacted = 0
+
+    def __len__(self):
+        return len(self._chats)
+
+    def __contains__(self, conversation_id):
+        return conversation_id in self._chats
+
+    def _create(self, history=None):
+        return self.client.chats.create(model=self.model, config=self.config, history=history)
+
+    def get(self, conversation_id="default"):
+        """Return the live chat for a conversation, creating it if needed."""
+        with self._lock:
+            chat = self._chats.get(conversation_id)
+            if chat is not None:
+                self._chats.move_to_end(conversation_id)
+                return chat
+        new_chat = self._create()
+        with self._lock:
+            # Another thread may have started the same conversation meanwhile
+            chat = self._chats.get(conversation_id)
+            if chat is not None:
+                self._chats.move_to_end(conversation_id)
+                return chat
+            self._chats[conversation_id] = new_chat
+            self.created += 1
+            while len(self._chats) > self.max_sessions:
+                self._chats.popitem(last=False)
+                self.evicted += 1
+            return new_chat
+
+    def drop(self, conversation_id):
+        with self._lock:
+            self._chats.pop(conversation_id, None)
+
+    def history_tokens(self, chat, usage_metadata=None) -> int:
+        """Prefer the token count the API reported for the last turn; estimate otherwise."""
+        if usage_metadata is not None and usage_metadata.total_token_count:
+            return usage_metadata.total_token_count
+        return estimate_tokens(chat.get_history(curated=True))
+
+    def compact(self, conversation_id, usage_metadata=None) -> bool:
+        """
+        Shrink the conversation's history if it is over the token budget.
+        Keeps the last `keep_turns` user turns (with their tool calls) and
+        replaces everything before them by a summary or drops it.
+        Returns True if the history was rewritten.
+        """
+        with self._lock:
+            chat = self._chats.get(conversation_id)
+        if chat is None or self.history_tokens(chat, usage_metadata) <= self.token_budget:
+            return False
+        history = chat.get_history(curated=True)
+        starts = turn_starts(history)
+        if len(starts) <= self.keep_turns:
+            return False
+        cut = starts[-self.keep_turns]
+        kept = history[cut:]
+        if self.summarize:
+            summary = self.summarize(history[:cut])
+            if summary:
+                from google.genai import types
+
+                kept = [
+                    types.Content(role="user", parts=[types.Part(text=f"{SUMMARY_PREFIX}\n{summary}")]),
+                    types.Content(role="model", parts=[types.Part(text="Understood.")]),
+                    *kept,
+                ]
+        new_chat = self._create(history=kept)
+        with self._lock:
+            # Skip the swap if the conversation was evicted, replaced or went
+            # on while summarizing; the next turn compacts it again
+            if self._chats.get(conversation_id) is not chat or len(chat.get_history(curated=True)) != len(history):
+                return False
+            self._chats[conversation_id] = new_chat
+            self.created += 1
+            self.compacted += 1
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "live": len(self._chats),
+            "created": self.created,
+            "evicted": self.evicted,
+            "compacted": self.compacted,
+        }
@@ -0,0 +1,93 @@
+"""
+Shared clients, chat models and the response cache, built on first use.
+
+Importing google-genai or langchain-google-genai takes about a second, and
+the prototypes used to pay for it (and build their `genai.Client`,
+`ChatGoogleGenerativeAI` and compiled graphs) at import time, before
+parsing their arguments and even when a module was only imported to reuse
+a tool. Now the SDK is imported and the object built the first time it is
+asked for, then shared by the whole process:
+
+    from factory import chat_model, genai_client
+    client = genai_client()                                   # google.genai imported here
+    llm = chat_model("gemini-2.5-flash", response_cache=True, traced=True)
+
+`once` does the same for anything else, e.g. a module's default graph.
+All clients send through one pooled HTTP transport (see transport.py),
+routed over a pool of models and API keys when one is configured (see
+model_router.py).
+Cold-start time per entry point is tracked by benchmarks/bench_startup.py.
+"""
+import functools
+import os
+import threading
+
+DEFAULT_MODEL = "gemini-flash-latest"
+
+
+def once(func):
+    """Build `func(*args)` once per distinct arguments; concurrent first calls wait for the same result."""
+    results = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            return results[key]
+        except KeyError:
+            pass
+        with lock:
+            if key not in results:
+                results[key] = func(*args, **kwargs)
+            return results[key]
+
+    wrapper.cache_clear = results.clear
+    return wrapper
+
+
+def default_api_key() -> str | None:
+    """GEMINI_API_KEY, else the first of GEMINI_API_KEYS (the router swaps in the others per call)."""
+    return os.getenv("GEMINI_API_KEY") or os.getenv("GEMINI_API_KEYS", "").split(",")[0].strip() or None
+
+
+@once
+def genai_client(api_key: str | None = None):
+    """The process-wide `genai.Client` (GEMINI_API_KEY unless a key is given)."""
+    from google import genai
+    from model_router import model_transport
+    from transport import genai_http_options
+
+    return genai.Client(api_key=api_key or default_api_key(),
+                        http_options=genai_http_options(model_transport()))
+
+
+@once
+def shared_response_cache():
+    """The response cache configured by RESPONSE_CACHE (see response_cache.py); None when it's off."""
+    from response_cache import cache_from_env
+
+    return cache_from_env()
+
+
+@once
+def chat_model(model: str = DEFAULT_MODEL, response_cache: bool = False, traced: bool = False):
+    """
+    A shared ChatGoogleGenerativeAI. `response_cache` answers repeated prompts
+    from the response cache (see response_cache.py); `traced` records every
+    call as a span when TRACING is on (see tracing.py).
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from model_router import model_transport
+    from transport import langchain_options
+
+    options = langchain_options(model_transport())
+    if response_cache:
+        from response_cache import langchain_cache
+
+        options["cache"] = langchain_cache(shared_response_cache())
+    if traced:
+        from tracing import tracer
+
+        options["callbacks"] = tracer.langchain_callbacks()
+    return ChatGoogleGenerativeAI(model=model, google_api_key=default_api_key(), **options)
@@ -0,0 +1,267 @@
+"""
+Offline stand-ins for the Gemini SDK.
+
+The benchmarks need a model that answers instantly (or with a configurable
+delay) without an API key or network access. `FakeClient` mimics the parts
+of `genai.Client` the prototypes use and replays scripted answers in order;
+`FakeChatModel` does the same for the LangChain/LangGraph prototypes.
+
+`FakeGemini` goes one level lower: it answers the Gemini REST API through an
+httpx transport, so a real `genai.Client` or `ChatGoogleGenerativeAI` runs
+its full code path (automatic function calling, chats, SSE streaming, tool
+call parsing) against scripted replies, including function calls.
+"""
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+from google import genai
+from google.genai import errors, types
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+def rate_limit_error() -> errors.ClientError:
+    """The error the SDK raises on a 429 RESOURCE_EXHAUSTED response."""
+    return errors.ClientError(
+        429, {"error": {"code": 429, "message": "Quota exceeded (fake)", "status": "RESOURCE_EXHAUSTED"}}
+    )
+
+
+def fake_tokens(text) -> int:
+    """Rough token count (~4 characters per token) reported as the fakes' usage."""
+    return len(str(text)) // 4 + 1
+
+
+def text_response(text: str, prompt=None) -> types.GenerateContentResponse:
+    """A GenerateContentResponse with a single text part and usage_metadata."""
+    prompt_tokens, output_tokens = fake_tokens(prompt or ""), fake_tokens(text)
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        ),
+    )
+
+
+class FakeModels:
+    """Replays `responses` (strings or ready-made responses) in a loop."""
+
+    def __init__(self, responses=("OK",), latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._responses = itertools.cycle(responses)
+
+    def _next(self, contents=None):
+        self.calls += 1
+        response = next(self._responses)
+        return text_response(response, contents) if isinstance(response, str) else response
+
+    def generate_content(self, *, model, contents, config=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._next(contents)
+
+
+class FakeAsyncModels(FakeModels):
+    """Async variant; `error_rate` is the fraction of calls that fail with a 429."""
+
+    def __init__(self, responses=("OK",), latency: float = 0.0, error_rate: float = 0.0):
+        super().__init__(responses, latency)
+        self.error_rate = error_rate
+        self.rate_limited = 0
+
+    async def generate_content(self, *, model, contents, config=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.rate_limited += 1
+            raise rate_limit_error()
+        return self._next(contents)
+
+
+class FakeClient:
+    """
+    Minimal `genai.Client` replacement: `client.models.generate_content(...)`
+    and `await client.aio.models.generate_content(...)`.
+    """
+
+    def __init__(self, responses=("OK",), latency: float = 0.0, error_rate: float = 0.0):
+        self.models = FakeModels(responses, latency)
+        self.aio = SimpleNamespace(models=FakeAsyncModels(responses, latency, error_rate))
+
+
+class FakeChatModel(BaseChatModel):
+    """LangChain chat model that replays `responses` after `latency` seconds."""
+
+    responses: list = ["OK"]
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _result(self, messages) -> ChatResult:
+        text = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        prompt_tokens, output_tokens = fake_tokens("".join(str(m.content) for m in messages)), fake_tokens(text)
+        usage = {"input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                 "total_tokens": prompt_tokens + output_tokens}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+# --- Scripted Gemini REST backend ---
+
+def call(name: str, **args) -> dict:
+    """A scripted function call part, e.g. call("get_weather", location="Paris")."""
+    return {"functionCall": {"name": name, "args": args}}
+
+
+def _parts(reply) -> list:
+    if isinstance(reply, str):
+        return [{"text": reply}]
+    if isinstance(reply, dict):
+        return [reply]
+    return [part for item in reply for part in _parts(item)]
+
+
+class FakeGemini(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Gemini REST API stand-in, plugged in as the httpx transport.
+
+    Each generateContent request gets the next reply from `script` (looping):
+    a string (text), `call(...)` (a function call), a list of those (one turn
+    with several parts) or a callable taking the request body and returning
+    one of those. Replies arrive after `latency` seconds; streamed replies are
+    split into `chunk_chars`-sized chunks `chunk_latency` seconds apart.
+    `waiting` is the wall time during which at least one caller was waiting
+    on that simulated latency, so concurrent calls aren't counted twice.
+    """
+
+    def __init__(self, script=("OK",), latency: float = 0.0, chunk_latency: float = 0.0, chunk_chars: int = 16):
+        self.script = list(script)
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+        self.waiting = 0.0
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._since = 0.0
+
+    # --- Clients wired to this backend ---
+
+    def client(self) -> genai.Client:
+        options = types.HttpOptions(client_args={"transport": self}, async_client_args={"transport": self})
+        return genai.Client(api_key="fake", http_options=options)
+
+    def chat_model(self, model: str = "gemini-2.5-flash", **kwargs):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model, google_api_key="fake", client_args={"transport": self}, **kwargs)
+
+    # --- Simulated latency ---
+
+    def _enter(self):
+        with self._lock:
+            if self._in_flight == 0:
+                self._since = time.perf_counter()
+            self._in_flight += 1
+
+    def _exit(self):
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self.waiting += time.perf_counter() - self._since
+
+    def _sleep(self, seconds):
+        self._enter()
+        try:
+            time.sleep(seconds)
+        finally:
+            self._exit()
+
+    async def _asleep(self, seconds):
+        self._enter()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._exit()
+
+    # --- Replies ---
+
+    def _reply(self, body: dict) -> list:
+        with self._lock:
+            reply = self.script[self.calls % len(self.script)]
+            self.calls += 1
+        return _parts(reply(body) if callable(reply) else reply)
+
+    def _payload(self, request: httpx.Request):
+        """(JSON body, None) for generateContent, or (None, list of SSE chunks) for the stream."""
+        body = json.loads(request.content or b"{}")
+        parts = self._reply(body)
+        prompt_tokens = len(json.dumps(body.get("contents", ""))) // 4
+        output_tokens = sum(len(json.dumps(part)) for part in parts) // 4
+        usage = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+                 "totalTokenCount": prompt_tokens + output_tokens}
+
+        def response(response_parts, last=True):
+            candidate = {"content": {"role": "model", "parts": response_parts}, "index": 0}
+            return {"candidates": [{**candidate, "finishReason": "STOP"}], "usageMetadata": usage} if last else {"candidates": [candidate]}
+
+        if ":streamGenerateContent" not in request.url.path:
+            return response(parts), None
+        pieces = []
+        for part in parts:
+            text = part.get("text")
+            if text:
+                pieces += [{"text": text[i:i + self.chunk_chars]} for i in range(0, len(text), self.chunk_chars)]
+            else:
+                pieces.append(part)
+        pieces = pieces or [{"text": ""}]
+        return None, [response([piece], last=i == len(pieces) - 1) for i, piece in enumerate(pieces)]
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            self._sleep(self.latency)
+        payload, chunks = self._payload(request)
+        if chunks is None:
+            return httpx.Response(200, json=payload)
+
+        def events():
+            for i, chunk in enumerate(chunks):
+                if i and self.chunk_latency:
+                    self._sleep(self.chunk_latency)
+                yield f"data: {json.dumps(chunk)}\r\n\r\n".encode()
+        return httpx.Response(200, content=events(), headers={"content-type": "text/event-stream"})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await self._asleep(self.latency)
+        payload, chunks = self._payload(request)
+        if chunks is None:
+            return httpx.Response(200, json=payload)
+
+        async def events():
+            for i, chunk in enumerate(chunks):
+                if i and self.chunk_latency:
+                    await self._asleep(self.chunk_latency)
+                yield f"data: {json.dumps(chunk)}\r\n\r\n".encode()
+        return httpx.Response(200, content=events(), headers={"content-type": "text/event-stream"})
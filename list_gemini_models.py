@@ -1,17 +1,16 @@
-import os
 from dotenv import load_dotenv
-from google import genai
+from factory import default_api_key, genai_client
 
 load_dotenv()
 
 def list_models():
-    api_key = os.getenv("GEMINI_API_KEY")
+    api_key = default_api_key()
     if not api_key:
-        print("GEMINI_API_KEY not found in .env")
+        print("GEMINI_API_KEY (or GEMINI_API_KEYS) not found in .env")
         return
 
     try:
-        client = genai.Client(api_key=api_key)
+        client = genai_client(api_key)
         print("Listing available models:")
         models = client.models.list()
         for model in models:
@@ -0,0 +1,253 @@
+"""
+A pool of warm MCP client sessions.
+
+Launching the server subprocess and running the initialize/list_tools
+handshake costs more than the tool call itself. The pool keeps a few
+long-lived server processes around, pings them, restarts the ones that
+die and spreads `call_tool` requests over them.
+
+    async with MCPSessionPool(server_params, size=2) as pool:
+        result = await pool.call_tool("add_note", {"content": "hi"})
+
+`server_params` can also be the URL of a server already running with the
+streamable HTTP transport (e.g. "http://127.0.0.1:8000/mcp"); the members
+are then connections to that one shared server instead of processes.
+
+A call that fails because its server crashed is only sent again when it
+can't run twice: when it never left (the connection was already closed),
+or when the tool is idempotent. By default that means the tools the
+server annotates readOnlyHint or idempotentHint; pass `idempotent_tools`
+to decide per name instead.
+"""
+import asyncio
+import itertools
+import sys
+
+import anyio
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+
+# Raised when writing to a closed connection, i.e. before the request went out
+NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class PooledSession:
+    """One long-lived server process (or HTTP connection) and its initialized ClientSession."""
+
+    def __init__(self, index: int, server_params: StdioServerParameters | str, errlog=sys.stderr):
+        self.index = index
+        self.server_params = server_params
+        self.errlog = errlog
+        self.session = None
+        self.tools = None
+        self.in_flight = 0
+        self.calls = 0
+        self.restarts = 0
+        self._task = None
+        self._ready = None
+        self._stop = None
+        self._restart_lock = asyncio.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Spawn the server and wait until the handshake is done."""
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        # The stdio/session context managers must be entered and exited in the
+        # same task, so each server lives inside its own background task.
+        self._task = asyncio.create_task(self._run())
+        ready = asyncio.create_task(self._ready.wait())
+        await asyncio.wait({self._task, ready}, return_when=asyncio.FIRST_COMPLETED)
+        if not self._ready.is_set():
+            ready.cancel()
+            self._task.result()  # Re-raise the startup error
+            raise RuntimeError(f"MCP server #{self.index} exited during startup")
+
+    def _transport(self):
+        if isinstance(self.server_params, str):
+            return streamable_http_client(self.server_params)
+        return stdio_client(self.server_params, errlog=self.errlog)
+
+    async def _run(self):
+        try:
+            async with self._transport() as (read, write, *_):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.tools = await session.list_tools()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        finally:
+            self.session = None
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        except Exception:
+            # A crashed server has nothing left to clean up
+            pass
+        self._task = None
+
+    async def ensure_alive(self, ping_timeout: float) -> bool:
+        """Restart the server unless it answers a ping. Returns True if restarted."""
+        async with self._restart_lock:
+            # Another caller may have restarted it while we waited for the lock
+            if await self.ping(ping_timeout):
+                return False
+            await self.stop()
+            await self.start()
+            self.restarts += 1
+            return True
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+
+class MCPSessionPool:
+    """Round-robin or least-busy dispatch over a fixed set of warm sessions."""
+
+    STRATEGIES = ("round_robin", "least_busy")
+
+    def __init__(
+        self,
+        server_params: StdioServerParameters | str,
+        size: int = 2,
+        strategy: str = "round_robin",
+        health_check_interval: float = 10.0,
+        ping_timeout: float = 5.0,
+        errlog=sys.stderr,
+        idempotent_tools=None,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {self.STRATEGIES}")
+        self.server_params = server_params
+        self.strategy = strategy
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.idempotent_tools = set(idempotent_tools) if idempotent_tools is not None else None
+        self.members = [PooledSession(i, server_params, errlog) for i in range(size)]
+        self._cursor = itertools.count()
+        self._health_task = None
+
+    @property
+    def tools(self):
+        """The tool list captured during the handshake (no extra round trip)."""
+        return self.members[0].tools
+
+    def is_idempotent(self, name: str) -> bool:
+        """Whether a call to `name` may be sent twice: listed, or hinted by the server."""
+        if self.idempotent_tools is not None:
+            return name in self.idempotent_tools
+        for tool in self.tools.tools if self.tools else []:
+            if tool.name == name:
+                hints = tool.annotations
+                return bool(hints and (hints.readOnlyHint or hints.idempotentHint))
+        return False
+
+    async def start(self):
+        await asyncio.gather(*(member.start() for member in self.members))
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+        return self
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(member.stop() for member in self.members))
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _pick(self) -> PooledSession:
+        if self.strategy == "least_busy":
+            return min(self.members, key=lambda m: (not m.alive, m.in_flight))
+        for _ in range(len(self.members)):
+            member = self.members[next(self._cursor) % len(self.members)]
+            if member.alive:
+                return member
+        return member
+
+    async def health_check(self):
+        """Ping every member and restart the ones that don't answer."""
+        restarted = await asyncio.gather(*(m.ensure_alive(self.ping_timeout) for m in self.members))
+        for member, was_restarted in zip(self.members, restarted):
+            if was_restarted:
+                print(f"DEBUG [MCP Pool]: server #{member.index} was unhealthy and has been restarted")
+        return sum(restarted)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                print(f"DEBUG [MCP Pool]: health check failed: {e}")
+
+    async def call_tool(self, name: str, arguments: dict | None = None, idempotent: bool | None = None):
+        """`idempotent` overrides is_idempotent(name) for this call."""
+        member = self._pick()
+        if not member.alive:
+            await member.ensure_alive(self.ping_timeout)
+        try:
+            return await self._call(member, name, arguments)
+        except Exception as e:
+            # Tool errors come back as results, so an exception here means the
+            # transport broke. Restart the server if it crashed, and retry once
+            # on the fresh process only if the call can't end up running twice.
+            restarted = await member.ensure_alive(self.ping_timeout)
+            if idempotent is None:
+                idempotent = self.is_idempotent(name)
+            if not (isinstance(e, NOT_SENT) or (restarted and idempotent)):
+                raise
+            return await self._call(member, name, arguments)
+
+    async def _call(self, member: PooledSession, name: str, arguments: dict | None):
+        session = member.session
+        if session is None:
+            # The server died after it was picked; nothing was sent
+            raise anyio.ClosedResourceError
+        member.in_flight += 1
+        member.calls += 1
+        try:
+            return await session.call_tool(name, arguments=arguments)
+        finally:
+            member.in_flight -= 1
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "server": m.index,
+                "alive": m.alive,
+                "calls": m.calls,
+                "in_flight": m.in_flight,
+                "restarts": m.restarts,
+            }
+            for m in self.members
+        ]
+
@@ -0,0 +1,180 @@
+"""
+Translate MCP tool definitions into Gemini function declarations.
+
+Every MCP tool carries a JSON Schema (`inputSchema`). Gemini wants
+`types.FunctionDeclaration` objects with its own `types.Schema` subset, so
+instead of hand-writing a declaration per tool we convert the whole
+`list_tools()` result. Building the pydantic objects is the expensive part,
+so `ToolRegistry` keeps the compiled result keyed by a hash of the tool list
+and only rebuilds it when the server's tools change.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+# JSON Schema type name -> Gemini Schema type
+JSON_TYPES = {
+    "string": "STRING",
+    "number": "NUMBER",
+    "integer": "INTEGER",
+    "boolean": "BOOLEAN",
+    "array": "ARRAY",
+    "object": "OBJECT",
+    "null": "NULL",
+}
+
+# JSON Schema keyword -> Gemini Schema field, copied over as-is
+PASSTHROUGH = {
+    "description": "description",
+    "title": "title",
+    "format": "format",
+    "pattern": "pattern",
+    "default": "default",
+    "minimum": "minimum",
+    "maximum": "maximum",
+    "minItems": "min_items",
+    "maxItems": "max_items",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minProperties": "min_properties",
+    "maxProperties": "max_properties",
+}
+
+MAX_REF_DEPTH = 8
+
+
+def json_schema_to_gemini(schema: dict, defs: dict | None = None, depth: int = 0) -> types.Schema:
+    """Convert one JSON Schema node (as produced by MCP servers) into a Gemini Schema."""
+    # Imported on first use: google-genai takes most of a second to import
+    from google.genai import types
+
+    if defs is None:
+        defs = {**schema.get("$defs", {}), **schema.get("definitions", {})}
+
+    ref = schema.get("$ref")
+    if ref:
+        target = defs.get(ref.rsplit("/", 1)[-1])
+        if target is None or depth >= MAX_REF_DEPTH:
+            # Unresolvable or recursive reference: fall back to a free-form object
+            return types.Schema(type="OBJECT", description=schema.get("description"))
+        merged = {**target, **{k: v for k, v in schema.items() if k != "$ref"}}
+        return json_schema_to_gemini(merged, defs, depth + 1)
+
+    fields = {gemini: schema[key] for key, gemini in PASSTHROUGH.items() if key in schema}
+
+    json_type = schema.get("type")
+    if isinstance(json_type, list):
+        # ["string", "null"] is how JSON Schema spells an optional value
+        non_null = [t for t in json_type if t != "null"]
+        if len(non_null) < len(json_type):
+            fields["nullable"] = True
+        json_type = non_null[0] if len(non_null) == 1 else None
+        if len(non_null) > 1:
+            fields["any_of"] = [json_schema_to_gemini({"type": t}, defs, depth) for t in non_null]
+    if json_type:
+        fields["type"] = JSON_TYPES.get(json_type, "STRING")
+
+    variants = schema.get("anyOf") or schema.get("oneOf")
+    if variants:
+        non_null = [v for v in variants if v.get("type") != "null"]
+        if len(non_null) < len(variants):
+            fields["nullable"] = True
+        if len(non_null) == 1:
+            # Optional[X] collapses into X with nullable=True
+            inner = json_schema_to_gemini(non_null[0], defs, depth)
+            for key, value in inner.model_dump(exclude_none=True).items():
+                fields.setdefault(key, value)
+        else:
+            fields["any_of"] = [json_schema_to_gemini(v, defs, depth) for v in non_null]
+
+    if "enum" in schema:
+        # Gemini only accepts string enums
+        fields["enum"] = [str(v) for v in schema["enum"]]
+        fields["type"] = "STRING"
+
+    if "items" in schema and isinstance(schema["items"], dict):
+        fields["items"] = json_schema_to_gemini(schema["items"], defs, depth)
+        fields.setdefault("type", "ARRAY")
+
+    if "properties" in schema:
+        fields["properties"] = {
+            name: json_schema_to_gemini(prop, defs, depth) for name, prop in schema["properties"].items()
+        }
+        fields.setdefault("type", "OBJECT")
+        if schema.get("required"):
+            fields["required"] = list(schema["required"])
+
+    return types.Schema(**fields)
+
+
+def mcp_tool_to_declaration(tool) -> types.FunctionDeclaration:
+    """Convert a single `mcp.types.Tool` into a FunctionDeclaration."""
+    from google.genai import types
+
+    schema = tool.inputSchema or {}
+    parameters = None
+    # Gemini rejects OBJECT parameters without properties, so no-arg tools get none
+    if schema.get("properties"):
+        parameters = json_schema_to_gemini(schema)
+    return types.FunctionDeclaration(
+        name=tool.name,
+        description=tool.description or "",
+        parameters=parameters,
+    )
+
+
+def fingerprint_tools(mcp_tools) -> str:
+    """Stable hash of a `list_tools()` result (names, descriptions and schemas)."""
+    payload = [(t.name, t.description, t.inputSchema) for t in mcp_tools.tools]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ToolRegistry:
+    """Compiled Gemini tools, cached per tool-list fingerprint."""
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self._compiled = OrderedDict()
+        self._last = (None, None)
+        self.builds = 0
+        self.hits = 0
+
+    def compile(self, mcp_tools) -> list[types.Tool]:
+        from google.genai import types
+
+        return [types.Tool(function_declarations=[mcp_tool_to_declaration(t) for t in mcp_tools.tools])]
+
+    def get(self, mcp_tools) -> list[types.Tool]:
+        """Return Gemini tools for `mcp_tools`, rebuilding only if the list changed."""
+        # Same result object as last time (e.g. the pool's cached handshake):
+        # skip even the hashing.
+        last_input, last_tools = self._last
+        if mcp_tools is last_input:
+            self.hits += 1
+            return last_tools
+
+        key = fingerprint_tools(mcp_tools)
+        tools = self._compiled.get(key)
+        if tools is not None:
+            self._compiled.move_to_end(key)
+            self._last = (mcp_tools, tools)
+            self.hits += 1
+            return tools
+
+        tools = self.compile(mcp_tools)
+        self.builds += 1
+        self._compiled[key] = tools
+        if len(self._compiled) > self.maxsize:
+            self._compiled.popitem(last=False)
+        self._last = (mcp_tools, tools)
+        return tools
+
+    def clear(self):
+        self._compiled.clear()
+        self._last = (None, None)
@@ -0,0 +1,99 @@
+"""
+Keep LangGraph message state from growing without bound.
+
+With plain `add_messages` every researcher/writer bounce appends to the
+state and every node sends the whole history back to the model, so prompt
+size grows linearly per call and total cost quadratically per run.
+
+- `compact_messages` is a drop-in reducer for `add_messages`: it keeps the
+  user's messages and the latest message from each agent, and folds older
+  agent turns into one short running summary.
+- `fit_to_budget` trims a prompt to a per-node token budget before the call.
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph.message import add_messages
+
+SUMMARY_NAME = "Summary"
+SUMMARY_HEADER = "Summary of earlier turns:"
+
+
+def estimate_tokens(messages) -> int:
+    """Rough token count (~4 characters per token) for a list of messages."""
+    return sum(len(str(m.content)) for m in messages) // 4 + 1
+
+
+def _summary_lines(message) -> list[str]:
+    if getattr(message, "name", None) == SUMMARY_NAME:
+        return message.content.splitlines()[1:]
+    text = " ".join(str(message.content).split())
+    return [f"- {message.name or message.type}: {text}"]
+
+
+def make_compacting_reducer(keep_latest=("Researcher", "Writer"), line_chars: int = 160, summary_chars: int = 800):
+    """
+    Build a reducer that merges like `add_messages`, then keeps human
+    messages, the newest message of each agent in `keep_latest` and a
+    summary of everything else (newest lines first to fit `summary_chars`).
+    """
+    def compact(left, right):
+        merged = add_messages(left, right)
+        latest = {}
+        for index, message in enumerate(merged):
+            name = getattr(message, "name", None)
+            if name in keep_latest:
+                latest[name] = index
+
+        kept, older = [], []
+        for index, message in enumerate(merged):
+            if isinstance(message, HumanMessage) or index in latest.values():
+                kept.append(message)
+            else:
+                older.append(message)
+        if not older:
+            return merged
+
+        lines = []
+        for message in older:
+            for line in _summary_lines(message):
+                lines.append(line if len(line) <= line_chars else line[:line_chars - 1] + "…")
+        # Newest lines win when the summary is over its size cap
+        used, selected = 0, []
+        for line in reversed(lines):
+            if used + len(line) > summary_chars and selected:
+                break
+            selected.append(line)
+            used += len(line)
+        summary = AIMessage(
+            content="\n".join([SUMMARY_HEADER, *reversed(selected)]),
+            name=SUMMARY_NAME,
+            id="summary",
+        )
+        # The summary sits right after the first human message, in place of the turns it replaces
+        position = 1 if kept and isinstance(kept[0], HumanMessage) else 0
+        return kept[:position] + [summary] + kept[position:]
+    return compact
+
+
+compact_messages = make_compacting_reducer()
+
+
+def fit_to_budget(messages, max_tokens: int) -> list:
+    """
+    Trim a prompt to about `max_tokens`: the first message (system prompt)
+    always stays, then the newest messages that fit; if even the newest one
+    is too big its content is cut.
+    """
+    if estimate_tokens(messages) <= max_tokens:
+        return list(messages)
+    head, rest = messages[0], list(messages[1:])
+    budget = max_tokens - estimate_tokens([head])
+    kept = []
+    for message in reversed(rest):
+        cost = estimate_tokens([message])
+        if cost > budget:
+            if not kept:
+                kept.append(message.model_copy(update={"content": str(message.content)[:max(0, budget) * 4]}))
+            break
+        kept.append(message)
+        budget -= cost
+    return [head, *reversed(kept)]
@@ -0,0 +1,444 @@
+"""
+Quota-aware routing of Gemini calls over several models and API keys.
+
+The scripts each hard-code one model (07/08 `gemini-2.5-flash` for its
+higher limits, the rest `gemini-flash-latest`) and one API key, and the
+first 429 ends the run. `ModelRouter` sits between the SDK and the shared
+HTTP transport (transport.py) and sends every generateContent call to one
+(model, key) route of a pool:
+
+- each route counts its requests in sliding windows (per minute and,
+  optionally, per day) and is skipped while a window is full, so calls
+  are spread over the keys instead of bursting into a quota;
+- the requested model is preferred; when all of its routes are full or
+  failing, the call falls back to the next model of the pool;
+- a 429 puts the route on hold for the server's retryDelay, a 5xx or a
+  timeout for a few seconds, and the call is retried on another route;
+- with `hedge_after`, a call still unanswered after that many seconds is
+  sent again on another free route and the first answer wins.
+
+factory.py builds every google-genai and LangChain client on it when a
+pool is configured:
+    MODEL_POOL=gemini-2.5-flash:10,gemini-flash-latest:15
+                          fallback models in order, each with an optional
+                          requests-per-minute limit
+    GEMINI_API_KEYS=k1,k2 keys to spread calls over (default GEMINI_API_KEY)
+    MODEL_RPM=10          per-minute limit for models listed without one
+    MODEL_RPD=250         per-day limit of every route (optional)
+    HEDGE_AFTER=8         seconds before a slow call is hedged (off if unset)
+    ROUTER_MAX_WAIT=60    seconds a call may wait for a route to free up
+    ROUTER_THREADS=256    sync attempts in flight at once when hedging
+
+benchmarks/bench_model_router.py runs it against a stub that injects 429s
+and slow answers.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import re
+import threading
+import time
+
+import httpx
+
+from factory import once
+from transport import shared_transport
+
+# Only content generation is routed; embeddings, model listing etc. go straight through
+MODEL_PATH = re.compile(r"/models/([^/:]+):(generateContent|streamGenerateContent)$")
+# Answers that send the call on to another route
+FALLBACK_CODES = {429, 500, 502, 503, 504}
+
+
+class SlidingWindow:
+    """Timestamps of the requests sent in the last `seconds`; full at `limit`."""
+
+    def __init__(self, limit: int, seconds: float):
+        self.limit = limit
+        self.seconds = seconds
+        self.times = collections.deque()
+
+    def count(self, now: float) -> int:
+        while self.times and self.times[0] <= now - self.seconds:
+            self.times.popleft()
+        return len(self.times)
+
+    def wait(self, now: float) -> float:
+        """Seconds until one more request fits (0 if it fits now)."""
+        if self.count(now) < self.limit:
+            return 0.0
+        return self.times[len(self.times) - self.limit] + self.seconds - now
+
+
+class Route:
+    """One (model, API key) pair: its windows, hold and counters."""
+
+    def __init__(self, model: str, key: str, label: str, windows: list):
+        self.model = model
+        self.key = key
+        self.label = label
+        self.windows = windows
+        self.hold_until = 0.0
+        self.sent = self.ok = self.rate_limited = self.failed = self.hedges = 0
+
+    def wait(self, now: float) -> float:
+        return max([self.hold_until - now, 0.0] + [window.wait(now) for window in self.windows])
+
+    def load(self, now: float) -> int:
+        return self.windows[0].count(now) if self.windows else self.sent
+
+
+def retry_delay(response: httpx.Response, default: float) -> float:
+    """The retryDelay of a 429 RESOURCE_EXHAUSTED body ("23s"), else `default`."""
+    try:
+        details = json.loads(response.content)["error"].get("details", [])
+        for detail in details:
+            if "retryDelay" in detail:
+                return float(detail["retryDelay"].rstrip("s"))
+    except (ValueError, KeyError, AttributeError, TypeError):
+        pass
+    return default
+
+
+def exhausted() -> httpx.Response:
+    """The 429 returned when no route frees up in time, so the SDKs raise their usual error."""
+    body = {"error": {"code": 429, "message": "All model routes are at their rate limit", "status": "RESOURCE_EXHAUSTED"}}
+    return httpx.Response(429, json=body)
+
+
+def _buffered(response: httpx.Response, content: bytes) -> httpx.Response:
+    # The content is already decoded, so drop the headers describing the wire format
+    headers = [(k, v) for k, v in response.headers.items()
+               if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+    return httpx.Response(response.status_code, headers=headers, content=content)
+
+
+class ModelRouter(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport that routes generateContent calls over models x keys.
+
+    `models` are the fallbacks in order of preference (a requested model
+    outside the pool gets routes of its own on first use). `rpm` limits
+    every route to that many requests per `window` seconds, `model_rpm`
+    overrides it per model and `rpd` adds a per-day window. With hedging,
+    sync attempts run on a pool of `threads` threads (started on demand),
+    which caps how many sync calls are in flight. Like the shared
+    transport, closing it is left to `shutdown()` on the inner one.
+    """
+
+    def __init__(self, models, keys, rpm: int | None = None, model_rpm: dict | None = None, rpd: int | None = None,
+                 hedge_after: float | None = None, hold: float = 30.0, error_hold: float = 5.0,
+                 max_wait: float = 60.0, window: float = 60.0, threads: int = 256, transport=None):
+        self.models = list(models)
+        self.keys = list(keys)
+        if not self.keys:
+            raise ValueError("ModelRouter needs at least one API key")
+        self.rpm = rpm
+        self.model_rpm = model_rpm or {}
+        self.rpd = rpd
+        self.hedge_after = hedge_after
+        self.hold = hold
+        self.error_hold = error_hold
+        self.max_wait = max_wait
+        self.window = window
+        self.threads = threads
+        self.transport = transport or shared_transport()
+        self.requests = self.fallbacks = self.hedges = self.hedge_wins = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+        self.routes = {}
+        for model in self.models:
+            self._add_model(model)
+
+    @classmethod
+    def from_env(cls, transport=None):
+        models, model_rpm = [], {}
+        for entry in os.getenv("MODEL_POOL", "").split(","):
+            name, _, limit = entry.strip().partition(":")
+            if name:
+                models.append(name)
+                if limit:
+                    model_rpm[name] = int(limit)
+        keys = os.getenv("GEMINI_API_KEYS") or os.getenv("GEMINI_API_KEY", "")
+        hedge_after = os.getenv("HEDGE_AFTER")
+        return cls(
+            models,
+            [key.strip() for key in keys.split(",") if key.strip()],
+            rpm=int(os.environ["MODEL_RPM"]) if os.getenv("MODEL_RPM") else None,
+            model_rpm=model_rpm,
+            rpd=int(os.environ["MODEL_RPD"]) if os.getenv("MODEL_RPD") else None,
+            hedge_after=float(hedge_after) if hedge_after else None,
+            max_wait=float(os.getenv("ROUTER_MAX_WAIT", "60")),
+            threads=int(os.getenv("ROUTER_THREADS", "256")),
+            transport=transport,
+        )
+
+    def _add_model(self, model):
+        limit = self.model_rpm.get(model, self.rpm)
+        routes = []
+        for i, key in enumerate(self.keys):
+            windows = []
+            if limit:
+                windows.append(SlidingWindow(limit, self.window))
+            if self.rpd:
+                windows.append(SlidingWindow(self.rpd, 86400.0))
+            # Labels name the key by position so stats never print it
+            routes.append(Route(model, key, f"{model}/key{i + 1}", windows))
+        self.routes[model] = routes
+        return routes
+
+    # --- Choosing a route ---
+
+    def _pick(self, model, tried):
+        """
+        (route, 0) with a slot reserved on the least loaded free route,
+        preferring `model`; else (None, seconds until one frees up), or
+        (None, None) once every route has been tried.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if model not in self.routes:
+                self._add_model(model)
+            soonest = None
+            for name in [model] + [m for m in self.models if m != model]:
+                candidates = [r for r in self.routes[name] if r not in tried]
+                free = [r for r in candidates if r.wait(now) == 0]
+                if free:
+                    route = min(free, key=lambda r: r.load(now))
+                    for window in route.windows:
+                        window.times.append(now)
+                    route.sent += 1
+                    return route, 0.0
+                for r in candidates:
+                    soonest = r.wait(now) if soonest is None else min(soonest, r.wait(now))
+            return None, soonest
+
+    def _next_route(self, model, tried, deadline):
+        while True:
+            route, wait = self._pick(model, tried)
+            if route is not None or wait is None or time.monotonic() + wait > deadline:
+                return route
+            self._count(waited=wait)
+            time.sleep(wait)
+
+    async def _anext_route(self, model, tried, deadline):
+        while True:
+            route, wait = self._pick(model, tried)
+            if route is not None or wait is None or time.monotonic() + wait > deadline:
+                return route
+            self._count(waited=wait)
+            await asyncio.sleep(wait)
+
+    def _settle(self, route, response, error) -> bool:
+        """Record how an attempt went; True if its answer goes back to the caller."""
+        now = time.monotonic()
+        with self._lock:
+            if error is None and response.status_code not in FALLBACK_CODES:
+                route.ok += 1
+                return True
+            if error is None and response.status_code == 429:
+                route.rate_limited += 1
+                route.hold_until = now + retry_delay(response, self.hold)
+            else:
+                route.failed += 1
+                route.hold_until = now + self.error_hold
+            return False
+
+    def _count(self, **counters):
+        with self._lock:
+            for name, n in counters.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    @staticmethod
+    def _give_up(failure):
+        if isinstance(failure, Exception):
+            raise failure
+        return failure if failure is not None else exhausted()
+
+    # --- Sending ---
+
+    def _request(self, request, route, body):
+        """`request` rewritten for the route's model and key."""
+        path = MODEL_PATH.sub(lambda m: f"/models/{route.model}:{m.group(2)}", request.url.path)
+        url = request.url.copy_with(path=path)
+        if "key" in url.params:
+            url = url.copy_set_param("key", route.key)
+        headers = request.headers.copy()
+        headers["x-goog-api-key"] = route.key
+        return httpx.Request(request.method, url, headers=headers, content=body, extensions=request.extensions)
+
+    def _send(self, route, request, body):
+        """(response, error) of one attempt; answers that fall back come back fully read."""
+        try:
+            response = self.transport.handle_request(self._request(request, route, body))
+            if response.status_code in FALLBACK_CODES:
+                try:
+                    response = _buffered(response, response.read())
+                finally:
+                    response.close()
+            return response, None
+        except httpx.TransportError as e:
+            return None, e
+
+    async def _asend(self, route, request, body):
+        try:
+            response = await self.transport.handle_async_request(self._request(request, route, body))
+            if response.status_code in FALLBACK_CODES:
+                try:
+                    response = _buffered(response, await response.aread())
+                finally:
+                    await response.aclose()
+            return response, None
+        except httpx.TransportError as e:
+            return None, e
+
+    def _start(self, route, request, body):
+        # Without hedging the attempt runs on the caller's thread
+        if self.hedge_after is None:
+            future = concurrent.futures.Future()
+            future.set_result(self._send(route, request, body))
+            return future
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(self.threads, thread_name_prefix="model-router")
+        return self._executor.submit(self._send, route, request, body)
+
+    def handle_request(self, request):
+        match = MODEL_PATH.search(request.url.path)
+        if match is None:
+            return self.transport.handle_request(request)
+        body = request.read()
+        self._count(requests=1)
+        deadline = time.monotonic() + self.max_wait
+        tried, pending, failure, hedge, hedged = set(), {}, None, None, False
+        try:
+            while True:
+                if not pending:
+                    route = self._next_route(match.group(1), tried, deadline)
+                    if route is None:
+                        return self._give_up(failure)
+                    self._count(fallbacks=bool(tried))
+                    tried.add(route)
+                    pending[self._start(route, request, body)] = route
+                hedging = self.hedge_after is not None and not hedged and len(pending) == 1
+                done, _ = concurrent.futures.wait(pending, timeout=self.hedge_after if hedging else None,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                if not done:
+                    # Hedge only onto a route that is free right now, and only once
+                    hedged = True
+                    hedge, _ = self._pick(match.group(1), tried)
+                    if hedge is not None:
+                        hedge.hedges += 1
+                        self._count(hedges=1)
+                        tried.add(hedge)
+                        pending[self._start(hedge, request, body)] = hedge
+                    continue
+                winner = None
+                for future in done:
+                    route = pending.pop(future)
+                    response, error = future.result()
+                    usable = self._settle(route, response, error)
+                    if usable and winner is None:
+                        winner = response
+                        self._count(hedge_wins=route is hedge)
+                    elif usable:
+                        # Both attempts answered at once; keep one
+                        response.close()
+                    else:
+                        failure = error or response
+                if winner is not None:
+                    return winner
+        finally:
+            for future in pending:
+                future.add_done_callback(_close_sync)
+
+    async def handle_async_request(self, request):
+        match = MODEL_PATH.search(request.url.path)
+        if match is None:
+            return await self.transport.handle_async_request(request)
+        body = await request.aread()
+        self._count(requests=1)
+        deadline = time.monotonic() + self.max_wait
+        tried, pending, failure, hedge, hedged = set(), {}, None, None, False
+        try:
+            while True:
+                if not pending:
+                    route = await self._anext_route(match.group(1), tried, deadline)
+                    if route is None:
+                        return self._give_up(failure)
+                    self._count(fallbacks=bool(tried))
+                    tried.add(route)
+                    pending[asyncio.create_task(self._asend(route, request, body))] = route
+                hedging = self.hedge_after is not None and not hedged and len(pending) == 1
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_after if hedging else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    hedge, _ = self._pick(match.group(1), tried)
+                    if hedge is not None:
+                        hedge.hedges += 1
+                        self._count(hedges=1)
+                        tried.add(hedge)
+                        pending[asyncio.create_task(self._asend(hedge, request, body))] = hedge
+                    continue
+                winner = None
+                for task in done:
+                    route = pending.pop(task)
+                    response, error = task.result()
+                    usable = self._settle(route, response, error)
+                    if usable and winner is None:
+                        winner = response
+                        self._count(hedge_wins=route is hedge)
+                    elif usable:
+                        # Both attempts answered at once; keep one
+                        await response.aclose()
+                    else:
+                        failure = error or response
+                if winner is not None:
+                    return winner
+        finally:
+            # The losing attempts: stop them, or close what they already got
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_close_async)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> list[dict]:
+        """Counters per route, in pool order."""
+        with self._lock:
+            return [{"route": r.label, "sent": r.sent, "ok": r.ok, "rate_limited": r.rate_limited,
+                     "failed": r.failed, "hedges": r.hedges}
+                    for routes in self.routes.values() for r in routes]
+
+
+def _close_sync(future):
+    response, _ = future.result()
+    if response is not None:
+        response.close()
+
+
+def _close_async(task):
+    if not task.cancelled():
+        response, _ = task.result()
+        if response is not None:
+            asyncio.ensure_future(response.aclose())
+
+
+@once
+def model_transport():
+    """
+    The transport factory.py builds clients on: a ModelRouter when
+    MODEL_POOL or GEMINI_API_KEYS is set, otherwise the shared transport.
+    """
+    if os.getenv("MODEL_POOL") or os.getenv("GEMINI_API_KEYS"):
+        return ModelRouter.from_env()
+    return shared_transport()
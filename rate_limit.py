@@ -0,0 +1,76 @@
+"""
+Client-side rate limiting helpers.
+
+- `TokenBucket` spaces requests out so a batch stays under a requests-per-
+  minute quota instead of bursting into it.
+- `retry_with_backoff` retries rate-limited and transient failures with
+  exponential backoff and full jitter.
+"""
+import asyncio
+import random
+import time
+
+# HTTP status codes worth retrying: rate limited or temporarily unavailable
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: float | None = None):
+        return cls(requests_per_minute / 60.0, burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        # The lock makes waiters queue up in order instead of racing for refills
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for 429/5xx API errors and network timeouts."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError))
+
+
+async def retry_with_backoff(
+    fn,
+    *args,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    on_retry=None,
+    **kwargs,
+):
+    """Await `fn(*args, **kwargs)`, retrying retryable errors with exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if on_retry:
+                on_retry(e, attempt + 1, delay)
+            await asyncio.sleep(delay)
@@ -0,0 +1,352 @@
+"""
+Response cache for Gemini and LangChain model calls.
+
+The prototypes send the same prompts on every run. This module caches the
+responses so repeated runs are answered locally:
+
+- `CachedModels` wraps `client.models` and caches `generate_content`
+  (`CachedAsyncModels` does the same for `client.aio.models`).
+- `langchain_cache()` plugs the same store into LangChain chat models via
+  their standard `cache=` argument, so `llm.invoke(...)` is cached too.
+
+Two backends are available: an in-memory LRU (`MemoryBackend`) and an
+on-disk SQLite file (`SQLiteBackend`) that survives restarts. Both support
+a TTL and a maximum number of entries. The cache is configured through
+environment variables, see `cache_from_env()`.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+
+# --- Backends ---
+
+class MemoryBackend:
+    """Thread-safe in-memory LRU store of (value, expires_at) entries."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: str, expires_at: float | None):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """On-disk store. Least recently used rows are evicted past `max_entries`."""
+
+    def __init__(self, path: str = ".cache/responses.sqlite", max_entries: int = 10_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+            return row
+
+    def set(self, key: str, value: str, expires_at: float | None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# --- Cache front-end ---
+
+class ResponseCache:
+    """TTL handling and hit/miss counters on top of a backend."""
+
+    def __init__(self, backend=None, ttl: float | None = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key: str) -> str | None:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            self.backend.delete(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self.backend.set(key, value, expires_at)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.backend.evictions,
+            "entries": len(self.backend),
+        }
+
+
+def cache_from_env() -> ResponseCache | None:
+    """
+    Build the cache configured by the environment:
+
+    RESPONSE_CACHE=memory|sqlite|off (default: memory)
+    RESPONSE_CACHE_PATH=.cache/responses.sqlite
+    RESPONSE_CACHE_TTL=<seconds> (default: no expiry)
+    RESPONSE_CACHE_MAX_ENTRIES=<n>
+    """
+    kind = os.getenv("RESPONSE_CACHE", "memory").lower()
+    if kind in ("off", "none", "0", "false"):
+        return None
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL", "0")) or None
+    max_entries = os.getenv("RESPONSE_CACHE_MAX_ENTRIES")
+    if kind == "sqlite":
+        backend = SQLiteBackend(
+            os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite"),
+            max_entries=int(max_entries or 10_000),
+        )
+    elif kind == "memory":
+        backend = MemoryBackend(max_entries=int(max_entries or 1024))
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE backend '{kind}', expected memory, sqlite or off")
+    return ResponseCache(backend, ttl=ttl)
+
+
+# --- Key building ---
+
+def _canonical(obj):
+    """Reduce SDK objects, dicts and Python tool functions to plain JSON data."""
+    if isinstance(obj, BaseModel):
+        return _canonical(obj.model_dump(exclude_none=True))
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, bytes):
+        return hashlib.sha256(obj).hexdigest()
+    if callable(obj):
+        # Python tools are identified by name, signature and docstring
+        try:
+            signature = str(inspect.signature(obj))
+        except (TypeError, ValueError):
+            signature = ""
+        name = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+        return {"callable": name, "signature": signature, "doc": inspect.getdoc(obj) or ""}
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    return repr(obj)
+
+
+def make_key(**parts) -> str:
+    payload = json.dumps(_canonical(parts), sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- google-genai wrapper ---
+
+class CachedModels:
+    """Drop-in for `client.models` whose `generate_content` is cached."""
+
+    def __init__(self, models, cache: ResponseCache | None):
+        self._models = models
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+    def generate_content(self, *, model, contents, config=None, **kwargs):
+        if self.cache is None:
+            return self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+
+        from google.genai import types
+
+        key = self.key_for(model, contents, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return types.GenerateContentResponse.model_validate_json(cached)
+
+        response = self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        # Only successful answers are worth keeping
+        if response.candidates:
+            self.cache.set(key, response.model_dump_json(exclude_none=True))
+        return response
+
+    @staticmethod
+    def key_for(model, contents, config) -> str:
+        config_data, system_instruction, tools = {}, None, None
+        if config is not None:
+            if isinstance(config, BaseModel):
+                system_instruction, tools = config.system_instruction, config.tools
+                config_data = config.model_dump(exclude_none=True, exclude={"system_instruction", "tools"})
+            else:
+                config_data = dict(config)
+                system_instruction = config_data.pop("system_instruction", None)
+                tools = config_data.pop("tools", None)
+        return make_key(
+            model=model,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            config=config_data,
+        )
+
+
+class CachedAsyncModels(CachedModels):
+    """Same as CachedModels, for `client.aio.models`."""
+
+    async def generate_content(self, *, model, contents, config=None, **kwargs):
+        if self.cache is None:
+            return await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+
+        from google.genai import types
+
+        key = self.key_for(model, contents, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return types.GenerateContentResponse.model_validate_json(cached)
+
+        response = await self._models.generate_content(model=model, contents=contents, config=config, **kwargs)
+        if response.candidates:
+            self.cache.set(key, response.model_dump_json(exclude_none=True))
+        return response
+
+
+# --- LangChain integration ---
+
+def langchain_cache(cache: ResponseCache | None):
+    """
+    Adapter that lets LangChain chat models use a `ResponseCache`:
+
+        llm = ChatGoogleGenerativeAI(..., cache=langchain_cache(cache))
+
+    The model name, bound tools and call parameters are part of `llm_string`,
+    so they end up in the key together with the serialized messages.
+    Returns None (LangChain's "no cache") when caching is off.
+    """
+    if cache is None:
+        return None
+
+    # Imported here so the genai-only scripts don't pay for LangChain
+    from langchain_core.caches import BaseCache
+    from langchain_core.messages import message_to_dict, messages_from_dict
+    from langchain_core.outputs import ChatGeneration, Generation
+
+    def dump(generations):
+        return json.dumps([
+            {
+                "text": g.text,
+                "message": message_to_dict(g.message) if isinstance(g, ChatGeneration) else None,
+                "generation_info": g.generation_info,
+            }
+            for g in generations
+        ], default=str)
+
+    def load(payload):
+        generations = []
+        for g in json.loads(payload):
+            if g["message"] is not None:
+                message = messages_from_dict([g["message"]])[0]
+                generations.append(ChatGeneration(message=message, generation_info=g["generation_info"]))
+            else:
+                generations.append(Generation(text=g["text"], generation_info=g["generation_info"]))
+        return generations
+
+    class LangChainCache(BaseCache):
+        def lookup(self, prompt, llm_string):
+            cached = cache.get(make_key(prompt=prompt, llm_string=llm_string))
+            return load(cached) if cached is not None else None
+
+        def update(self, prompt, llm_string, return_val):
+            cache.set(make_key(prompt=prompt, llm_string=llm_string), dump(return_val))
+
+        def clear(self, **kwargs):
+            cache.clear()
+
+        def stats(self):
+            return cache.stats()
+
+    return LangChainCache()
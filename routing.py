@@ -0,0 +1,149 @@
+"""
+Pluggable routing for the supervisor graph.
+
+Substring checks for magic markers break as soon as the model writes
+"Research complete." instead of RESEARCH_COMPLETE, and every misroute costs
+at least one wasted LLM turn. `Router` decides in layers:
+
+1. `rule_route`: tolerant regex rules for the markers and obvious cases,
+   microseconds and no API call,
+2. a cache of earlier decisions keyed by a fingerprint of the routing-relevant
+   state (the last message),
+3. a fallback (e.g. `structured_route`, which asks the model for a typed
+   `RouteDecision`) for the messages the rules can't classify,
+4. a default that matches the original behavior if all else fails.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Literal
+
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field
+
+Route = Literal["researcher", "writer", "__end__"]
+
+RESEARCH_COMPLETE_RE = re.compile(r"research[\s_-]*complete", re.IGNORECASE)
+NEED_MORE_RESEARCH_RE = re.compile(r"need[\s_-]*more[\s_-]*research", re.IGNORECASE)
+# Phrases that suggest the writer is asking for facts without using the marker
+ASKS_FOR_FACTS_RE = re.compile(r"\b(no|missing|more|need|insufficient)\b.{0,40}\b(facts|research|information)\b", re.IGNORECASE)
+
+
+class RouteDecision(BaseModel):
+    """Where the supervisor sends the conversation next."""
+    next: Route = Field(description="researcher to gather facts, writer to write the answer, __end__ when the answer is done")
+    reason: str = Field(default="", description="One short sentence explaining the choice")
+
+
+# Rule decisions are constants; building a pydantic model per call would dominate the fast path
+NEW_QUERY = RouteDecision(next="researcher", reason="new user query")
+MORE_RESEARCH = RouteDecision(next="researcher", reason="writer asked for more research")
+RESEARCH_DONE = RouteDecision(next="writer", reason="research complete")
+ANSWER_DONE = RouteDecision(next="__end__", reason="writer produced the answer")
+NO_SIGNAL = RouteDecision(next="__end__", reason="no routing signal")
+
+
+def rule_route(state) -> RouteDecision | None:
+    """Deterministic fast path; None when the last message is ambiguous."""
+    last_message = state["messages"][-1]
+    # If it's a Human query, we always start with Research
+    if isinstance(last_message, HumanMessage):
+        return NEW_QUERY
+    content = str(last_message.content)
+    if NEED_MORE_RESEARCH_RE.search(content):
+        return MORE_RESEARCH
+    if RESEARCH_COMPLETE_RE.search(content):
+        return RESEARCH_DONE
+    if getattr(last_message, "name", None) == "Writer" and not ASKS_FOR_FACTS_RE.search(content):
+        return ANSWER_DONE
+    return None
+
+
+def default_route(state) -> RouteDecision:
+    """What the original substring router did with an unmarked message: stop."""
+    return NO_SIGNAL
+
+
+def fingerprint(state) -> str:
+    """Hash of what routing depends on: the last message's type, author and text."""
+    last_message = state["messages"][-1]
+    key = f"{last_message.type}\x00{getattr(last_message, 'name', None)}\x00{last_message.content}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+ROUTER_PROMPT = (
+    "You route messages in a team of a Researcher and a Writer. The Researcher lists facts; "
+    "the Writer turns facts into a short poem. Given the latest message, choose the next step: "
+    "'writer' if it contains research facts ready to be written up, 'researcher' if facts are "
+    "missing or more research was requested, '__end__' if it is the finished answer."
+)
+
+
+def structured_route(llm, state) -> RouteDecision:
+    """Ask the model for a typed RouteDecision about the last message."""
+    last_message = state["messages"][-1]
+    author = getattr(last_message, "name", None) or last_message.type
+    router_llm = llm.with_structured_output(RouteDecision)
+    return router_llm.invoke([
+        ("system", ROUTER_PROMPT),
+        ("human", f"Latest message (from {author}):\n{last_message.content}"),
+    ])
+
+
+class Router:
+    """Rules first, then cached decisions, then the fallback, then the default."""
+
+    def __init__(self, rules=rule_route, fallback=None, default=default_route, cache_size: int = 1024):
+        self.rules = rules
+        self.fallback = fallback
+        self.default = default
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {"rules": 0, "cache": 0, "fallback": 0, "default": 0, "errors": 0}
+        self.seconds = 0.0
+
+    def route(self, state) -> RouteDecision:
+        start = time.perf_counter()
+        try:
+            return self._route(state)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def _route(self, state) -> RouteDecision:
+        decision = self.rules(state) if self.rules else None
+        if decision is not None:
+            self.counts["rules"] += 1
+            return decision
+        key = fingerprint(state)
+        with self._lock:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+                self.counts["cache"] += 1
+                return decision
+        if self.fallback is not None:
+            try:
+                decision = self.fallback(state)
+            except Exception:
+                self.counts["errors"] += 1
+                decision = None
+        if decision is None:
+            self.counts["default"] += 1
+            return self.default(state)
+        self.counts["fallback"] += 1
+        with self._lock:
+            self._cache[key] = decision
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return decision
+
+    def stats(self) -> dict:
+        decisions = sum(self.counts.values()) - self.counts["errors"]
+        return {
+            **self.counts,
+            "decisions": decisions,
+            "avg_us": round(self.seconds / decisions * 1e6, 1) if decisions else 0.0,
+        }
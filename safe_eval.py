@@ -0,0 +1,219 @@
+"""
+Safe arithmetic evaluator for the `calculate` tools.
+
+`eval()` on a model-generated string can run arbitrary code, and even plain
+arithmetic like `9**9**9` can hang the process. `safe_eval` instead:
+
+- parses the expression with `ast` and accepts only numbers, arithmetic and
+  comparison operators and a small set of math functions/constants,
+- compiles the tree into nested closures once and keeps the result in an
+  LRU cache, so repeated expressions skip parsing entirely,
+- refuses results larger than `MAX_BITS`, exponents (and `round` digits)
+  above `MAX_EXPONENT` and evaluations running longer than `TIME_LIMIT` seconds.
+
+`safe_eval_many` evaluates a batch of expressions in one call, computing
+each distinct expression once, and returns errors in place instead of raising.
+"""
+import ast
+import math
+import operator
+import time
+from functools import lru_cache
+
+MAX_LENGTH = 1000        # characters in an expression
+MAX_NODES = 200          # AST nodes in an expression
+MAX_BITS = 4096          # size of any integer operand or result
+MAX_EXPONENT = 1000      # largest allowed exponent / shift
+TIME_LIMIT = 0.1         # seconds per evaluation
+CACHE_SIZE = 1024        # compiled expressions kept
+
+
+class SafeEvalError(ValueError):
+    """The expression is not allowed or broke one of the limits."""
+
+
+def _check_number(value):
+    if isinstance(value, int) and value.bit_length() > MAX_BITS:
+        raise SafeEvalError(f"number too large (over {MAX_BITS} bits)")
+    return value
+
+
+def _pow(base, exponent):
+    if isinstance(exponent, (int, float)) and abs(exponent) > MAX_EXPONENT:
+        raise SafeEvalError(f"exponent too large (over {MAX_EXPONENT})")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if max(1, abs(base).bit_length() - 1) * exponent > MAX_BITS:
+            raise SafeEvalError(f"number too large (over {MAX_BITS} bits)")
+    return base ** exponent
+
+
+def _lshift(value, shift):
+    if shift > MAX_EXPONENT:
+        raise SafeEvalError(f"shift too large (over {MAX_EXPONENT})")
+    return value << shift
+
+
+def _round(number, ndigits=None):
+    # round(1, -10**8) computes 10**(10**8) before anything could time it out
+    if isinstance(ndigits, int) and abs(ndigits) > MAX_EXPONENT:
+        raise SafeEvalError(f"round digits too large (over {MAX_EXPONENT})")
+    return round(number, ndigits)
+
+
+BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+    ast.LShift: _lshift,
+    ast.RShift: operator.rshift,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+}
+
+UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Invert: operator.invert,
+    ast.Not: operator.not_,
+}
+
+COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+FUNCTIONS = {
+    "abs": abs,
+    "round": _round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+
+def _compile(node, state):
+    """Turn an AST node into a closure `f(deadline)`, rejecting anything not whitelisted."""
+    state["nodes"] += 1
+    if state["nodes"] > MAX_NODES:
+        raise SafeEvalError(f"expression too long (over {MAX_NODES} nodes)")
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+            raise SafeEvalError(f"unsupported constant: {value!r}")
+        _check_number(value)
+        return lambda deadline: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in CONSTANTS:
+            raise SafeEvalError(f"unknown name: {node.id}")
+        value = CONSTANTS[node.id]
+        return lambda deadline: value
+
+    if isinstance(node, ast.BinOp):
+        op = BIN_OPS.get(type(node.op))
+        if op is None:
+            raise SafeEvalError(f"unsupported operator: {type(node.op).__name__}")
+        left, right = _compile(node.left, state), _compile(node.right, state)
+
+        def binop(deadline):
+            a = left(deadline)
+            b = right(deadline)
+            if time.perf_counter() > deadline:
+                raise SafeEvalError("evaluation timed out")
+            return _check_number(op(a, b))
+        return binop
+
+    if isinstance(node, ast.UnaryOp):
+        op = UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise SafeEvalError(f"unsupported operator: {type(node.op).__name__}")
+        operand = _compile(node.operand, state)
+        return lambda deadline: op(operand(deadline))
+
+    if isinstance(node, ast.Compare):
+        ops = []
+        for op_node in node.ops:
+            op = COMPARE_OPS.get(type(op_node))
+            if op is None:
+                raise SafeEvalError(f"unsupported comparison: {type(op_node).__name__}")
+            ops.append(op)
+        operands = [_compile(n, state) for n in [node.left, *node.comparators]]
+
+        def compare(deadline):
+            left = operands[0](deadline)
+            for op, operand in zip(ops, operands[1:]):
+                right = operand(deadline)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+        return compare
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise SafeEvalError(f"unsupported function call: {ast.unparse(node.func)}")
+        func = FUNCTIONS[node.func.id]
+        args = [_compile(arg, state) for arg in node.args]
+        return lambda deadline: _check_number(func(*(arg(deadline) for arg in args)))
+
+    raise SafeEvalError(f"unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression: str):
+    """Parse and validate an expression once; returns a callable `f(deadline)`."""
+    if len(expression) > MAX_LENGTH:
+        raise SafeEvalError(f"expression too long (over {MAX_LENGTH} characters)")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise SafeEvalError(f"invalid expression: {e.msg}") from None
+    return _compile(tree.body, {"nodes": 0})
+
+
+def safe_eval(expression: str, time_limit: float = TIME_LIMIT):
+    """Evaluate an arithmetic expression, raising SafeEvalError if it is not allowed."""
+    evaluate = compile_expression(expression)
+    try:
+        return evaluate(time.perf_counter() + time_limit)
+    except (ArithmeticError, ValueError, TypeError) as e:
+        if isinstance(e, SafeEvalError):
+            raise
+        raise SafeEvalError(str(e)) from None
+
+
+def safe_eval_many(expressions, time_limit: float = TIME_LIMIT) -> list:
+    """
+    Evaluate a batch of expressions in one call. The expressions are pure
+    arithmetic, so each distinct one is compiled and evaluated only once;
+    failures come back as SafeEvalError instances in place.
+    """
+    results = {}
+    for expression in expressions:
+        if expression in results:
+            continue
+        try:
+            results[expression] = safe_eval(expression, time_limit)
+        except SafeEvalError as e:
+            results[expression] = e
+    return [results[expression] for expression in expressions]
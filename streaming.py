@@ -0,0 +1,106 @@
+"""
+Print streamed Gemini responses as they arrive.
+
+`print_stream` / `aprint_stream` consume the chunks returned by
+`generate_content_stream` (or `chat.send_message_stream`), print text as
+soon as it arrives, report function-call parts the moment they show up and
+measure time-to-first-token next to the total latency.
+"""
+import sys
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StreamResult:
+    text: str = ""
+    parts: list = field(default_factory=list)
+    function_calls: list = field(default_factory=list)
+    time_to_first_token: float | None = None
+    total_time: float = 0.0
+    usage_metadata: object = None
+
+    def timing(self) -> str:
+        ttft = f"{self.time_to_first_token:.2f}s" if self.time_to_first_token is not None else "n/a"
+        return f"⏱️  time to first token: {ttft} | total: {self.total_time:.2f}s"
+
+
+class _Discard:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+# out=DISCARD streams (and still calls on_text/on_function_call) without printing
+DISCARD = _Discard()
+
+
+class StreamPrinter:
+    """Feeds chunks one at a time; shared by the sync and async helpers."""
+
+    def __init__(self, prefix: str = "AI: ", on_function_call=None, on_text=None, out=None, start: float | None = None):
+        self.prefix = prefix
+        self.on_function_call = on_function_call
+        # Called with every text delta, e.g. to forward tokens to a client
+        self.on_text = on_text
+        self.out = out or sys.stdout
+        self.result = StreamResult()
+        # Pass `start` when the request went out before the chunks are consumed
+        self._start = start if start is not None else time.perf_counter()
+        self._text = []
+        self._printed_prefix = False
+
+    def feed(self, chunk):
+        if chunk.usage_metadata is not None:
+            self.result.usage_metadata = chunk.usage_metadata
+        if not chunk.candidates or not chunk.candidates[0].content:
+            return
+        for part in chunk.candidates[0].content.parts or []:
+            self.result.parts.append(part)
+            if part.function_call:
+                self._first_token()
+                self.result.function_calls.append(part.function_call)
+                self.out.write(f"\n🛠️  Tool call: {part.function_call.name}({part.function_call.args})\n")
+                self.out.flush()
+                self._printed_prefix = False
+                if self.on_function_call:
+                    self.on_function_call(part.function_call)
+            elif part.text and not part.thought:
+                self._first_token()
+                if not self._printed_prefix:
+                    self.out.write(self.prefix)
+                    self._printed_prefix = True
+                self._text.append(part.text)
+                self.out.write(part.text)
+                self.out.flush()
+                if self.on_text:
+                    self.on_text(part.text)
+
+    def _first_token(self):
+        if self.result.time_to_first_token is None:
+            self.result.time_to_first_token = time.perf_counter() - self._start
+
+    def finish(self) -> StreamResult:
+        self.result.total_time = time.perf_counter() - self._start
+        self.result.text = "".join(self._text)
+        if self._printed_prefix:
+            self.out.write("\n")
+        return self.result
+
+
+def print_stream(chunks, **kwargs) -> StreamResult:
+    """Print a sync stream of chunks; the clock starts now unless `start` is given."""
+    printer = StreamPrinter(**kwargs)
+    for chunk in chunks:
+        printer.feed(chunk)
+    return printer.finish()
+
+
+async def aprint_stream(chunks, **kwargs) -> StreamResult:
+    """Same as print_stream for async iterators (client.aio)."""
+    printer = StreamPrinter(**kwargs)
+    async for chunk in chunks:
+        printer.feed(chunk)
+    return printer.finish()
@@ -0,0 +1,191 @@
+"""
+Memoize tool results so repeated tool calls are answered locally.
+
+Agents often call the same tool with the same arguments several times in
+one run, and again across runs. `@memoize` wraps a tool function and keeps
+its results in a shared, thread-safe LRU (`TOOL_CACHE`):
+
+- each tool declares whether it is `pure` (same arguments, same result, so
+  results never go stale) or needs a `ttl` in seconds,
+- keys are built from the bound, normalized arguments, so `f("Paris")`,
+  `f(location=" Paris ")` and (with `casefold=True`) `f("paris")` hit the
+  same entry,
+- `TOOL_CACHE.stats()` reports hits, misses and hit rate per tool.
+
+Works on plain functions and coroutines (Gemini function tools keep their
+signature and docstring), and on LangChain tools, either by decorating the
+function under `@tool` or by passing an existing tool object.
+
+Configure with `TOOL_CACHE=off` and `TOOL_CACHE_MAX_ENTRIES` in `.env`.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class ToolCache:
+    """Thread-safe LRU of tool results with per-entry expiry and per-tool counters."""
+
+    def __init__(self, max_entries: int = 1024, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _count(self, tool: str, field: str):
+        counts = self._stats.setdefault(tool, {"hits": 0, "misses": 0, "expired": 0})
+        counts[field] += 1
+
+    def get(self, tool: str, key: str):
+        """Return (True, value) on a fresh hit, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get((tool, key))
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end((tool, key))
+                    self._count(tool, "hits")
+                    return True, value
+                del self._entries[(tool, key)]
+                self._count(tool, "expired")
+            self._count(tool, "misses")
+            return False, None
+
+    def set(self, tool: str, key: str, value, ttl: float | None = None):
+        with self._lock:
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[(tool, key)] = (expires_at, value)
+            self._entries.move_to_end((tool, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, tool: str | None = None):
+        with self._lock:
+            if tool is None:
+                self._entries.clear()
+                self._stats.clear()
+                return
+            for key in [k for k in self._entries if k[0] == tool]:
+                del self._entries[key]
+            self._stats.pop(tool, None)
+
+    def stats(self) -> dict:
+        """tool -> {"hits", "misses", "expired", "hit_rate"}."""
+        with self._lock:
+            report = {}
+            for tool, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                report[tool] = {**counts, "hit_rate": round(counts["hits"] / lookups, 3) if lookups else 0.0}
+            return report
+
+    def summary(self) -> str:
+        """One line per tool, for printing at the end of a demo."""
+        return "\n".join(
+            f"{tool}: {s['hits']} hits / {s['hits'] + s['misses']} calls ({s['hit_rate']:.0%})"
+            for tool, s in self.stats().items()
+        )
+
+
+def cache_from_env() -> ToolCache:
+    return ToolCache(
+        max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024")),
+        enabled=os.getenv("TOOL_CACHE", "on").lower() != "off",
+    )
+
+
+TOOL_CACHE = cache_from_env()
+
+
+def _normalize(value, casefold: bool):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.casefold() if casefold else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, casefold) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, casefold) for v in value]
+    return value
+
+
+def make_key(signature: inspect.Signature, args, kwargs, casefold: bool = False) -> str:
+    """Canonical key for a call: bound arguments with defaults applied, normalized, as JSON."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    normalized = {name: _normalize(value, casefold) for name, value in bound.arguments.items()}
+    return json.dumps(normalized, sort_keys=True, default=repr, ensure_ascii=False)
+
+
+def memoize(func=None, *, ttl: float | None = None, pure: bool = False, casefold: bool = False,
+            cache_if=None, cache: ToolCache | None = None, name: str | None = None):
+    """
+    Cache a tool's results.
+
+    pure:      results depend only on the arguments; they never expire unless a ttl is given.
+    ttl:       seconds a result stays valid; required for tools that aren't pure.
+    casefold:  treat string arguments case-insensitively.
+    cache_if:  predicate on the result; results it rejects (e.g. error strings) aren't stored.
+    """
+    if not pure and ttl is None:
+        raise ValueError("memoize: tools that aren't pure need a ttl")
+
+    def decorate(target):
+        # LangChain tool objects: wrap the function(s) they call
+        if hasattr(target, "func") and hasattr(target, "args_schema"):
+            tool_name = name or target.name
+            if target.func is not None:
+                target.func = wrap(target.func, tool_name)
+            if getattr(target, "coroutine", None) is not None:
+                target.coroutine = wrap(target.coroutine, tool_name)
+            return target
+        return wrap(target, name or target.__name__)
+
+    def wrap(fn, tool_name):
+        store = cache if cache is not None else TOOL_CACHE
+        signature = inspect.signature(fn)
+
+        def lookup(args, kwargs):
+            if not store.enabled:
+                return None, False, None
+            key = make_key(signature, args, kwargs, casefold)
+            hit, value = store.get(tool_name, key)
+            return key, hit, value
+
+        def remember(key, result):
+            if key is not None and (cache_if is None or cache_if(result)):
+                store.set(tool_name, key, result, ttl)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                key, hit, value = lookup(args, kwargs)
+                if hit:
+                    return value
+                result = await fn(*args, **kwargs)
+                remember(key, result)
+                return result
+            wrapper = async_wrapper
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                key, hit, value = lookup(args, kwargs)
+                if hit:
+                    return value
+                result = fn(*args, **kwargs)
+                remember(key, result)
+                return result
+
+        wrapper.cache = store
+        wrapper.tool_name = tool_name
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
@@ -0,0 +1,457 @@
+"""
+Latency and token tracing shared by all prototypes.
+
+Every model and tool call can be wrapped in a span that records wall time,
+time-to-first-token for streams, prompt/output tokens from `usage_metadata`
+and any error. Spans nest (a tool call inside an agent run points at the
+run's span) and are summarized per run or exported.
+
+Configure with `TRACING` in `.env`:
+    off (default)   nothing is recorded; wrappers are not even installed
+    summary         print a per-run summary table at exit
+    jsonl           also append one JSON object per span to TRACE_PATH
+    otlp            also write an OTLP/JSON file (OpenTelemetry collector
+                    `otlpjsonfile` receiver format) to TRACE_PATH
+
+Spans are folded into the summary as they finish; only the ones not yet
+exported are kept, and they are written out every TRACE_FLUSH_SPANS
+(default 1000) spans, so a long-running server stays at a bounded size.
+
+Entry points:
+    tracer.span(name, kind)      context manager for any block of code
+    traced_models(models)        wraps (async) `generate_content[_stream]`
+    traced                       decorator for tool functions
+    tracer.langchain_callbacks() callback handlers for LangChain/LangGraph
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, fields
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    # W3C trace-context sizes: 128-bit trace IDs, 64-bit span IDs
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: _new_id(64))
+    parent_id: str | None = None
+    start: float = field(default_factory=time.time)
+    duration: float = 0.0
+    ttft: float | None = None
+    prompt_tokens: int | None = None
+    output_tokens: int | None = None
+    total_tokens: int | None = None
+    error: str | None = None
+    attributes: dict = field(default_factory=dict)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def first_token(self, ttft: float | None = None):
+        """Mark the first streamed token (only the first call counts), or record a measured TTFT."""
+        if self.ttft is None:
+            self.ttft = ttft if ttft is not None else time.perf_counter() - self._t0
+
+    def record_usage(self, usage):
+        """Read token counts from a genai usage_metadata object or a LangChain usage dict."""
+        if usage is None:
+            return
+        if isinstance(usage, dict):
+            prompt, output, total = usage.get("input_tokens"), usage.get("output_tokens"), usage.get("total_tokens")
+        else:
+            prompt = getattr(usage, "prompt_token_count", None)
+            output = getattr(usage, "candidates_token_count", None)
+            total = getattr(usage, "total_token_count", None)
+        self.prompt_tokens = (self.prompt_tokens or 0) + (prompt or 0)
+        self.output_tokens = (self.output_tokens or 0) + (output or 0)
+        self.total_tokens = (self.total_tokens or 0) + (total or (prompt or 0) + (output or 0))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _EXPORTED_FIELDS}
+
+
+_EXPORTED_FIELDS = [f.name for f in fields(Span) if not f.name.startswith("_")]
+
+
+class _NoopSpan:
+    """Shared stand-in used when tracing is off; every method does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+    def first_token(self, ttft=None):
+        pass
+
+    def record_usage(self, usage):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self):
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self.token)
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self.span)
+        return False
+
+
+class Tracer:
+    def __init__(self, mode: str = "off", path: str | None = None, run_name: str | None = None,
+                 flush_every: int = 1000):
+        self.mode = mode
+        self.enabled = mode != "off"
+        self.path = path
+        self.run_name = run_name or os.path.basename(sys.argv[0] or "python")
+        self.exporting = mode in ("jsonl", "otlp") and bool(path)
+        self.flush_every = flush_every
+        # Spans finished but not yet written (always empty in summary mode)
+        self.spans = []
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self, name: str, kind: str = "internal", parent: Span | None = None, **attributes) -> Span:
+        parent = parent or _current_span.get()
+        return Span(
+            name=name,
+            kind=kind,
+            trace_id=parent.trace_id if parent else _new_id(128),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+
+    def finish(self, span: Span):
+        span.duration = time.perf_counter() - span._t0
+        pending = None
+        with self._lock:
+            self._aggregate(span)
+            if self.exporting:
+                self.spans.append(span)
+                if len(self.spans) >= self.flush_every:
+                    pending, self.spans = self.spans, []
+        if pending:
+            self._write(pending)
+
+    def _aggregate(self, span: Span):
+        row = self._rows.get(span.name)
+        if row is None:
+            row = self._rows[span.name] = {
+                "kind": span.kind, "count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0,
+                "ttft_s": 0.0, "ttft_count": 0, "prompt_tokens": 0, "output_tokens": 0,
+            }
+        row["count"] += 1
+        row["errors"] += span.error is not None
+        row["total_s"] += span.duration
+        row["max_s"] = max(row["max_s"], span.duration)
+        if span.ttft is not None:
+            row["ttft_s"] += span.ttft
+            row["ttft_count"] += 1
+        row["prompt_tokens"] += span.prompt_tokens or 0
+        row["output_tokens"] += span.output_tokens or 0
+
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """`with tracer.span("llm.generate_content", "llm") as span:` ... span.record_usage(...)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanContext(self, self.start(name, kind, **attributes))
+
+    def langchain_callbacks(self) -> list:
+        """Callback handlers to pass to LangChain models/graphs; empty when tracing is off."""
+        return [TracingCallbackHandler(self)] if self.enabled else []
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        """name -> count, total/avg/max seconds, avg TTFT and token totals."""
+        with self._lock:
+            rows = {name: dict(row) for name, row in self._rows.items()}
+        for row in rows.values():
+            ttft_s, ttft_count = row.pop("ttft_s"), row.pop("ttft_count")
+            row["avg_s"] = row["total_s"] / row["count"]
+            row["avg_ttft_s"] = ttft_s / ttft_count if ttft_count else None
+        return rows
+
+    def report(self) -> str:
+        rows = self.summary()
+        if not rows:
+            return "📈 Trace: no spans recorded"
+        lines = [
+            f"📈 Trace summary ({self.run_name})",
+            f"{'span':<36} {'kind':<6} {'calls':>5} {'avg ms':>9} {'max ms':>9} {'ttft ms':>8} {'tokens in':>10} {'out':>7}",
+        ]
+        for name, row in sorted(rows.items(), key=lambda item: -item[1]["total_s"]):
+            ttft = f"{row['avg_ttft_s'] * 1e3:8.0f}" if row["avg_ttft_s"] is not None else f"{'-':>8}"
+            errors = f"  ({row['errors']} errors)" if row["errors"] else ""
+            lines.append(
+                f"{name[:36]:<36} {row['kind'][:6]:<6} {row['count']:>5} {row['avg_s'] * 1e3:9.1f} "
+                f"{row['max_s'] * 1e3:9.1f} {ttft} {row['prompt_tokens']:>10} {row['output_tokens']:>7}{errors}"
+            )
+        return "\n".join(lines)
+
+    def flush(self):
+        """Write spans recorded since the last flush (jsonl / otlp modes)."""
+        with self._lock:
+            pending, self.spans = self.spans, []
+        if pending:
+            self._write(pending)
+
+    def _write(self, pending: list):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as f:
+            if self.mode == "jsonl":
+                for span in pending:
+                    f.write(json.dumps({"run": self.run_name, **span.to_dict()}, default=str) + "\n")
+            else:
+                f.write(json.dumps(to_otlp(pending, self.run_name)) + "\n")
+
+    def close(self):
+        if not self.enabled:
+            return
+        self.flush()
+        print("\n" + self.report(), file=sys.stderr)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans, service_name: str) -> dict:
+    """OTLP/JSON `ExportTraceServiceRequest` for a list of spans (GenAI semantic convention keys)."""
+    otlp_spans = []
+    for span in spans:
+        attributes = {**span.attributes, "span.kind": span.kind}
+        if span.prompt_tokens is not None:
+            attributes["gen_ai.usage.input_tokens"] = span.prompt_tokens
+            attributes["gen_ai.usage.output_tokens"] = span.output_tokens
+        if span.ttft is not None:
+            attributes["gen_ai.response.time_to_first_token"] = span.ttft
+        start_ns = int(span.start * 1e9)
+        otlp_spans.append({
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+            "name": span.name,
+            "kind": 3 if span.kind == "llm" else 1,  # CLIENT for model calls, INTERNAL otherwise
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(start_ns + int(span.duration * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{"scope": {"name": "ai-agents-prototypes.tracing"}, "spans": otlp_spans}],
+    }]}
+
+
+def tracer_from_env() -> Tracer:
+    mode = os.getenv("TRACING", "off").lower()
+    default_path = os.path.join(".cache", "traces.otlp.json" if mode == "otlp" else "traces.jsonl")
+    return Tracer(mode=mode, path=os.getenv("TRACE_PATH", default_path),
+                  flush_every=int(os.getenv("TRACE_FLUSH_SPANS", "1000")))
+
+
+tracer = tracer_from_env()
+atexit.register(tracer.close)
+
+
+# --- Gemini SDK wrappers ---
+
+def _model_attrs(kwargs) -> dict:
+    return {"model": kwargs.get("model")}
+
+
+class TracedModels:
+    """Proxy for `client.models` (or CachedModels) that traces generate_content calls."""
+
+    def __init__(self, models, tracer):
+        self._models = models
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+    def generate_content(self, **kwargs):
+        with self._tracer.span("gemini.generate_content", "llm", **_model_attrs(kwargs)) as span:
+            response = self._models.generate_content(**kwargs)
+            span.record_usage(getattr(response, "usage_metadata", None))
+            return response
+
+    def generate_content_stream(self, **kwargs):
+        span = self._tracer.start("gemini.generate_content_stream", "llm", **_model_attrs(kwargs))
+        with _SpanContext(self._tracer, span):
+            usage = None
+            for chunk in self._models.generate_content_stream(**kwargs):
+                span.first_token()
+                usage = chunk.usage_metadata or usage
+                yield chunk
+            span.record_usage(usage)
+
+
+class TracedAsyncModels(TracedModels):
+    """Same for `client.aio.models`."""
+
+    async def generate_content(self, **kwargs):
+        with self._tracer.span("gemini.generate_content", "llm", **_model_attrs(kwargs)) as span:
+            response = await self._models.generate_content(**kwargs)
+            span.record_usage(getattr(response, "usage_metadata", None))
+            return response
+
+    async def generate_content_stream(self, **kwargs):
+        # Started before the request goes out so TTFT includes the round trip
+        span = self._tracer.start("gemini.generate_content_stream", "llm", **_model_attrs(kwargs))
+        try:
+            stream = await self._models.generate_content_stream(**kwargs)
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            self._tracer.finish(span)
+            raise
+
+        async def traced_stream():
+            with _SpanContext(self._tracer, span):
+                usage = None
+                async for chunk in stream:
+                    span.first_token()
+                    usage = chunk.usage_metadata or usage
+                    yield chunk
+                span.record_usage(usage)
+        return traced_stream()
+
+
+def traced_models(models, tracer_=None):
+    """Wrap `models` if tracing is on; return it unchanged (no overhead) if it's off."""
+    tracer_ = tracer_ or tracer
+    if not tracer_.enabled:
+        return models
+    is_async = inspect.iscoroutinefunction(getattr(models, "generate_content", None))
+    return (TracedAsyncModels if is_async else TracedModels)(models, tracer_)
+
+
+def traced(func=None, *, name: str | None = None, kind: str = "tool", tracer_=None):
+    """Decorator recording a span per call; returns the function untouched when tracing is off."""
+    def decorate(fn):
+        t = tracer_ or tracer
+        if not t.enabled:
+            return fn
+        span_name = name or f"tool.{fn.__name__}"
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with t.span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with t.span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+# --- LangChain ---
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:  # LangChain isn't needed for the Gemini-only prototypes
+    BaseCallbackHandler = object
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records LLM and tool runs from LangChain/LangGraph callbacks as spans."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._open = {}
+
+    def _start(self, run_id, parent_run_id, name, kind, **attributes):
+        parent = self._open.get(parent_run_id) or _current_span.get()
+        self._open[run_id] = self.tracer.start(name, kind, parent=parent, **attributes)
+
+    def _end(self, run_id, error=None):
+        span = self._open.pop(run_id, None)
+        if span is not None:
+            if error is not None:
+                span.error = f"{type(error).__name__}: {error}"
+            self.tracer.finish(span)
+        return span
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name")
+        self._start(run_id, parent_run_id, "langchain.chat_model", "llm", model=model)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "langchain.llm", "llm")
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        if span is not None:
+            span.first_token()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        if span is None:
+            return
+        # Before _end: finishing folds the span into the summary (and may export it)
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                span.record_usage(getattr(message, "usage_metadata", None))
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, parent_run_id, f"tool.{name}", "tool")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
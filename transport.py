@@ -0,0 +1,133 @@
+"""
+One pooled HTTP transport for every Gemini call in the process.
+
+Left alone, every `genai.Client` and every `ChatGoogleGenerativeAI` opens
+its own HTTP clients, each with a private connection pool, and google-genai
+sends requests without any timeout. `SharedTransport` holds the connection
+pools instead, and every client built by factory.py sends through it:
+
+- keep-alive connections are reused across clients, graph nodes and
+  requests of the API server;
+- the number of open connections is capped (further requests wait for a
+  free connection, up to their timeout);
+- HTTP/2 is used when the `h2` package is installed, so concurrent calls
+  share one connection;
+- every model call gets a timeout (HTTP_TIMEOUT), overridable per call
+  with `config=GenerateContentConfig(http_options={"timeout": ms})` for
+  google-genai or `llm.invoke(..., timeout=seconds)` for LangChain.
+
+    genai.Client(api_key=..., http_options=genai_http_options())
+    ChatGoogleGenerativeAI(model=..., **langchain_options())
+
+Configure with environment variables:
+    HTTP_MAX_CONNECTIONS=20     open connections per pool
+    HTTP_MAX_KEEPALIVE=10       idle connections kept open
+    HTTP_KEEPALIVE_EXPIRY=30    seconds before an idle connection is closed
+    HTTP2=auto                  auto (if h2 is installed), on or off
+    HTTP_TIMEOUT=60             seconds per model call
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+
+import httpx
+
+from factory import once
+
+
+class SharedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    Sync and async connection pools behind one transport object.
+
+    LangChain hands the same `client_args` to its sync and async httpx
+    clients, so a single object has to serve both. Connections can't move
+    between event loops, so there is one async pool per loop. Clients
+    closing their transport leave the shared pools open; `shutdown()`
+    closes them.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive: int = 10, keepalive_expiry: float = 30.0,
+                 http2: bool = False):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                                   keepalive_expiry=keepalive_expiry)
+        self.http2 = http2
+        self.requests = 0
+        self._sync = None
+        self._async = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _pool(self, cls):
+        # retries=1: reconnect once if a kept-alive connection was closed by the server
+        return cls(limits=self.limits, http2=self.http2, retries=1)
+
+    def handle_request(self, request):
+        if self._sync is None:
+            with self._lock:
+                if self._sync is None:
+                    self._sync = self._pool(httpx.HTTPTransport)
+        self.requests += 1
+        return self._sync.handle_request(request)
+
+    async def handle_async_request(self, request):
+        loop = asyncio.get_running_loop()
+        pool = self._async.get(loop)
+        if pool is None:
+            pool = self._async[loop] = self._pool(httpx.AsyncHTTPTransport)
+        self.requests += 1
+        return await pool.handle_async_request(request)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    def shutdown(self):
+        """Close the sync pool and drop the async ones (their sockets close when collected)."""
+        with self._lock:
+            if self._sync is not None:
+                self._sync.close()
+                self._sync = None
+            self._async.clear()
+
+
+def http2_enabled(setting: str | None = None) -> bool:
+    setting = (setting or os.getenv("HTTP2", "auto")).lower()
+    if setting == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return setting == "on"
+
+
+def request_timeout() -> float:
+    return float(os.getenv("HTTP_TIMEOUT", "60"))
+
+
+@once
+def shared_transport() -> SharedTransport:
+    """The process-wide transport, configured from the environment."""
+    return SharedTransport(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        http2=http2_enabled(),
+    )
+
+
+def genai_http_options(transport: httpx.BaseTransport | None = None, timeout: float | None = None) -> dict:
+    """`http_options` for genai.Client: the shared pools (sync and async) and a per-call timeout."""
+    transport = transport or shared_transport()
+    timeout = request_timeout() if timeout is None else timeout
+    return {
+        "client_args": {"transport": transport},
+        "async_client_args": {"transport": transport},
+        # google-genai takes milliseconds
+        "timeout": int(timeout * 1000),
+    }
+
+
+def langchain_options(transport: httpx.BaseTransport | None = None, timeout: float | None = None) -> dict:
+    """Keyword arguments for ChatGoogleGenerativeAI: the shared pools and a per-call timeout."""
+    transport = transport or shared_transport()
+    return {"client_args": {"transport": transport}, "timeout": request_timeout() if timeout is None else timeout}